@@ -2,12 +2,17 @@
 FastAPI application configuration.
 """
 
+import asyncio
 import logging
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+
+from monitoring import METRICS_REGISTRY, start_span, current_trace, server_timing, parse_traceparent, set_exporter, create_exporter
 
 # Import routes from the routes module
-from .routes import router
+from .routes import router, embedding_batcher, qdrant_pool, job_queue, chain_registry
 
 # Configure logging
 logging.basicConfig(
@@ -34,8 +39,56 @@ app.add_middleware(
 # Include the router
 app.include_router(router)
 
+# Export request traces: none, log or otlp-file
+set_exporter(create_exporter(
+    os.environ.get("TRACE_EXPORTER", "none"),
+    os.environ.get("TRACE_FILE", "traces.jsonl")
+))
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace each request and report its stage durations in a Server-Timing header."""
+    trace_id, parent_id = parse_traceparent(request.headers.get("traceparent"))
+    with start_span(
+        f"{request.method} {request.url.path}",
+        trace_id=trace_id,
+        parent_id=parent_id,
+        **{"http.method": request.method, "http.target": request.url.path}
+    ) as span:
+        response = await call_next(request)
+        
+        # Name the span after the route template rather than the concrete path
+        route = request.scope.get("route")
+        if route is not None:
+            span.name = f"{request.method} {route.path}"
+        span.attributes["http.status_code"] = response.status_code
+        
+        # Streamed responses only report the stages finished before streaming starts
+        response.headers["Server-Timing"] = server_timing(current_trace(), root=span)
+    return response
+
+@app.on_event("startup")
+async def startup():
+    """Start running queued ingestion jobs, including those left over from a previous run."""
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release shared resources when the server stops."""
+    # Running jobs are interrupted and queued again for the next start
+    await asyncio.to_thread(job_queue.stop)
+    await embedding_batcher.stop()
+    await chain_registry.aclose()
+    qdrant_pool.close_all()
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
     """Simple health check endpoint."""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+# Prometheus metrics endpoint
+@app.get("/metrics")
+def metrics():
+    """Expose pipeline metrics in the Prometheus text format."""
+    return Response(content=generate_latest(METRICS_REGISTRY), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
@@ -1,14 +1,19 @@
 import os
+import json
+import asyncio
 import uuid
-import tempfile
+import dataclasses
 import logging
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Optional, Dict, Any
+import threading
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional, Dict, Any, Tuple, Union
 
-from database import QdrantDB
-from models import EmbeddingModel
-from processors import load_qa_into_qdrant
+from database import QdrantPool, LocalVectorDB, VectorStorage
+from models import EmbeddingModel, EmbeddingBatcher, EmbeddingCache, DiskEmbeddingStore
+from processors import load_qa_into_qdrant, upsert_qa_pair
+from monitoring import record_answer, track_stage, current_trace, server_timing, set_token_models
+from jobs import JobQueue, JobStore
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,12 +23,232 @@ router = APIRouter(prefix="/api/v1")
 
 # Initialize embedding model and database client
 import os
-embedding_model = EmbeddingModel()
-qdrant_db = QdrantDB(url=os.environ.get("QDRANT_URL", "http://localhost:6333"))
+embedding_cache = EmbeddingCache(
+    max_size=int(os.environ.get("EMBED_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("EMBED_CACHE_TTL", "0")) or None
+)
+embedding_store_path = os.environ.get("EMBED_STORE_PATH")
+embedding_backend = os.environ.get("EMBED_BACKEND", "torch")
+embedding_model = EmbeddingModel(
+    cache=embedding_cache,
+    # Queries only read the store; ingestion jobs are the only writers
+    store=DiskEmbeddingStore(
+        embedding_store_path,
+        EmbeddingModel.DEFAULT_MODEL_NAME,
+        backend=embedding_backend,
+        read_only=True
+    ) if embedding_store_path else None,
+    backend=embedding_backend
+)
+embedding_batcher = EmbeddingBatcher(
+    embedding_model,
+    max_batch_size=int(os.environ.get("EMBED_BATCH_MAX_SIZE", "32")),
+    max_wait_ms=float(os.environ.get("EMBED_BATCH_MAX_WAIT_MS", "5"))
+)
+qdrant_pool = QdrantPool(
+    timeout=int(os.environ.get("QDRANT_TIMEOUT", "0")) or None,
+    prefer_grpc=os.environ.get("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes"),
+    grpc_port=int(os.environ.get("QDRANT_GRPC_PORT", "6334")),
+    oversampling=float(os.environ.get("QDRANT_OVERSAMPLING", "0")) or None,
+    rescore=os.environ.get("QDRANT_RESCORE", "true").lower() in ("1", "true", "yes")
+)
+qdrant_url = os.environ.get("QDRANT_URL", "http://localhost:6333")
+
+# Jobs and other server workers record collection changes here; the generations
+# are read before the default database is opened so no change is missed
+job_store = JobStore(
+    os.environ.get("JOB_DB_PATH", "ingest_jobs.sqlite3"),
+    stale_after=float(os.environ.get("JOB_STALE_AFTER", "60"))
+)
+_seen_generations: Dict[Tuple[str, str], int] = job_store.generations()
+_generations_lock = threading.Lock()
+
+# Pinned so request-supplied URLs can never evict the default client
+qdrant_db = qdrant_pool.get(qdrant_url, pin=True)
 
 from llm import LLMClient
-from rag import RagChain
-# Add this endpoint to the existing router
+from rag import RagChain, SemanticCache, ChainRegistry, hash_api_key
+
+semantic_cache = SemanticCache(
+    max_entries=int(os.environ.get("SEMANTIC_CACHE_SIZE", "1000")),
+    threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+)
+chain_registry = ChainRegistry(
+    max_clients=int(os.environ.get("LLM_CLIENT_CACHE_SIZE", "16")),
+    max_chains=int(os.environ.get("RAG_CHAIN_CACHE_SIZE", "64")),
+    context_max_tokens=int(os.environ.get("CONTEXT_MAX_TOKENS", "0")) or None,
+    context_min_score=float(os.environ.get("CONTEXT_MIN_SCORE", "0")) or None,
+    context_max_similarity=float(os.environ.get("CONTEXT_MAX_SIMILARITY", "0")) or None,
+    llm_base_url=os.environ.get("LLM_BASE_URL") or None
+)
+
+# Token metrics are labelled with the default LLM and the comma-separated LLM_MODELS;
+# any other model named in a request is counted as "other"
+set_token_models(
+    [os.environ.get("LLM_MODEL", "meta-llama/Llama-3.2-3B-Instruct")]
+    + [name.strip() for name in os.environ.get("LLM_MODELS", "").split(",") if name.strip()]
+)
+
+# Top-hit score above which the stored answer is returned without calling the LLM,
+# with per-collection overrides given as JSON, e.g. {"qa_collection": 0.92}
+direct_answer_threshold = float(os.environ.get("DIRECT_ANSWER_THRESHOLD", "0")) or None
+direct_answer_thresholds = json.loads(os.environ.get("DIRECT_ANSWER_THRESHOLDS", "{}"))
+direct_answer_margin = float(os.environ.get("DIRECT_ANSWER_MARGIN", "0"))
+
+
+def _check_db_url(db_url: Optional[str]):
+    """
+    Reject request-supplied database URLs that open a local index.
+    
+    A local index is a directory on this server, so it may only come from
+    server configuration (QDRANT_URL).
+    
+    Args:
+        db_url (Optional[str]): URL given with the request
+        
+    Raises:
+        HTTPException: 400 for a local index URL other than the configured one
+    """
+    if db_url and db_url.startswith(LocalVectorDB.URL_SCHEME) and db_url != qdrant_url:
+        raise HTTPException(status_code=400, detail="Local index URLs are only accepted from server configuration")
+
+
+def _get_db(db_url: Optional[str]):
+    """
+    Get the database client for a request.
+    
+    Args:
+        db_url (Optional[str]): URL given with the request, None for the default one
+        
+    Returns:
+        Union[QdrantDB, LocalVectorDB]: Pooled database client
+    """
+    _check_db_url(db_url)
+    return qdrant_pool.get(db_url) if db_url else qdrant_db
+
+
+def _get_rag_chain(
+    collection: str,
+    db_url: Optional[str],
+    provider: str,
+    api_key: Optional[str],
+    llm: str,
+    top_k: int
+) -> RagChain:
+    """
+    Get a warm RAG chain from the registry.
+    
+    Building a chain may load a tokenizer, so run this off the event loop.
+    
+    Args:
+        collection (str): Name of the collection to query
+        db_url (Optional[str]): URL of the Qdrant server, None for the default one
+        provider (str): Hugging Face provider
+        api_key (Optional[str]): Hugging Face API key
+        llm (str): Name of the LLM model
+        top_k (int): Number of documents to retrieve
+        
+    Returns:
+        RagChain: Shared RAG chain
+    """
+    db = _get_db(db_url)
+    return chain_registry.get_chain(
+        db=db,
+        embedding_model=embedding_batcher,  # Batch query embeddings across concurrent requests
+        provider=provider,
+        api_key=api_key,
+        model_name=llm,
+        collection_name=collection,
+        top_k=top_k,
+        db_url=db_url,
+        direct_answer_threshold=direct_answer_thresholds.get(collection, direct_answer_threshold),
+        direct_answer_margin=direct_answer_margin
+    )
+
+
+def _refresh_collection(db_url: Optional[str], collection: str):
+    """
+    Pick up changes other processes made to a collection before serving it.
+    
+    Ingestion jobs and other server workers bump the generation of a collection
+    in the job store whenever they change it. On a new generation the local
+    index is re-read and the cached answers of the collection are dropped.
+    
+    Args:
+        db_url (Optional[str]): URL of the vector database, None for the default one
+        collection (str): Name of the collection
+    """
+    key = (db_url or qdrant_url, collection)
+    generation = job_store.generation(*key)
+    with _generations_lock:
+        if _seen_generations.get(key, 0) == generation:
+            return
+        db = _get_db(db_url)
+        # The change was written by another process
+        if isinstance(db, LocalVectorDB):
+            db.reload()
+        semantic_cache.invalidate(collection)
+        _seen_generations[key] = generation
+        logger.info(f"Collection {collection} changed (generation {generation}), reloaded it")
+
+
+def _collection_changed(db_url: Optional[str], collection: str):
+    """
+    Record a change this process made to a collection, so every server worker picks it up.
+    
+    Args:
+        db_url (Optional[str]): URL of the vector database, None for the default one
+        collection (str): Name of the collection
+    """
+    key = (db_url or qdrant_url, collection)
+    generation = job_store.bump_generation(*key)
+    with _generations_lock:
+        # This process already sees its own change unless others changed the collection too
+        if _seen_generations.get(key, 0) == generation - 1:
+            semantic_cache.invalidate(collection)
+            _seen_generations[key] = generation
+            return
+    _refresh_collection(db_url, collection)
+
+
+def _answer_settings(collection: str, provider: str, api_key: Optional[str], top_k: int) -> Tuple:
+    """
+    Get the settings besides collection and model that a cached answer depends on.
+    
+    These match the settings of the RAG chain from `_get_rag_chain`, so an
+    answer is only reused for requests that would get it from the same chain.
+    
+    Args:
+        collection (str): Name of the collection to query
+        provider (str): Hugging Face provider
+        api_key (Optional[str]): Hugging Face API key, only kept as a hash
+        top_k (int): Number of documents to retrieve
+        
+    Returns:
+        Tuple: Settings for the semantic cache
+    """
+    return (
+        provider,
+        hash_api_key(api_key),
+        top_k,
+        direct_answer_thresholds.get(collection, direct_answer_threshold),
+        direct_answer_margin
+    )
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """
+    Format a Server-Sent Event.
+    
+    Args:
+        event (str): Event name
+        data (Any): JSON-serializable payload
+        
+    Returns:
+        str: Encoded event
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
 @router.post("/rag/answer")
 async def rag_answer(
@@ -48,8 +273,11 @@ async def rag_answer(
         top_k (Optional[int]): Number of documents to retrieve
         
     Returns:
-        Dict[str, Any]: Answer and metadata
+        Dict[str, Any]: Answer and metadata, with the path that served it as "source":
+            "cache", "direct" (stored answer of a confident hit), "llm" or "error"
     """
+    _check_db_url(db_url)
+    
     try:
         # Check if query text is provided
         if "text" not in query:
@@ -63,29 +291,45 @@ async def rag_answer(
         provider = hf_provider or os.environ.get("HF_PROVIDER", "novita")
         api_key = hf_api_key or os.environ.get("HF_API_KEY")
         llm = model_name or os.environ.get("LLM_MODEL", "meta-llama/Llama-3.2-3B-Instruct")
+        settings = _answer_settings(collection, provider, api_key, top_k)
         
-        # Initialize components
-        db = QdrantDB(url=db_url) if db_url else qdrant_db
-        model = embedding_model  # Use the global embedding model
-        llm_client = LLMClient(provider=provider, api_key=api_key, model_name=llm)
-        
-        # Create RAG chain
-        rag_chain = RagChain(
-            db=db,
-            embedding_model=model,
-            llm_client=llm_client,
-            collection_name=collection,
-            top_k=top_k
-        )
+        await asyncio.to_thread(_refresh_collection, db_url, collection)
         
-        # Generate answer
-        answer = rag_chain.answer(query_text)
+        # Serve paraphrases of already answered queries from the semantic cache.
+        # Answers from a custom Qdrant server are not cached since collection
+        # names are only unique per server.
+        use_cache = db_url is None
+        if use_cache:
+            with track_stage("query_embed"):
+                query_vector = await embedding_batcher.embed(query_text)
+            cached = semantic_cache.lookup(collection, llm, query_vector, settings)
+            if cached is not None:
+                record_answer("cache")
+                return {
+                    "query": query_text,
+                    "answer": cached["answer"],
+                    "collection": collection,
+                    "model": llm,
+                    "cached": True,
+                    "source": "cache"
+                }
+        
+        # Reuse a warm chain (and its LLM client) for these settings
+        rag_chain = await asyncio.to_thread(_get_rag_chain, collection, db_url, provider, api_key, llm, top_k)
+        
+        # Generate answer without blocking the event loop
+        result = await rag_chain.aanswer_with_source(query_text, query_vector=query_vector if use_cache else None)
+        
+        if use_cache and result["source"] != RagChain.SOURCE_ERROR:
+            semantic_cache.store(collection, llm, query_text, query_vector, result["answer"], settings)
         
         return {
             "query": query_text,
-            "answer": answer,
+            "answer": result["answer"],
             "collection": collection,
-            "model": llm
+            "model": llm,
+            "cached": False,
+            "source": result["source"]
         }
         
     except Exception as e:
@@ -93,115 +337,289 @@ async def rag_answer(
         raise HTTPException(status_code=500, detail=f"Error answering query: {str(e)}")
 
 
-# Track background tasks
-background_tasks_status = {}
+@router.post("/rag/answer/stream")
+async def rag_answer_stream(
+    query: Dict[str, str],
+    collection_name: Optional[str] = None,
+    db_url: Optional[str] = None,
+    hf_provider: Optional[str] = None,
+    hf_api_key: Optional[str] = None,
+    model_name: Optional[str] = None,
+    top_k: Optional[int] = 3
+):
+    """
+    Answer a question using RAG, streaming the answer as Server-Sent Events.
+    
+    Emits a "metadata" event with the retrieved contexts and the serving path
+    ("source") first, then one "token" event per generated text fragment and
+    a final "done" event carrying the stage durations in Server-Timing format.
+    If answering fails, an "error" event with the fallback message comes
+    before "done".
+    
+    Args:
+        query (Dict[str, str]): Dictionary containing the query text
+        collection_name (Optional[str]): Name of the collection to query
+        db_url (Optional[str]): URL of the Qdrant server
+        hf_provider (Optional[str]): Hugging Face provider
+        hf_api_key (Optional[str]): Hugging Face API key
+        model_name (Optional[str]): Name of the LLM model
+        top_k (Optional[int]): Number of documents to retrieve
+        
+    Returns:
+        StreamingResponse: Event stream with metadata and answer tokens
+    """
+    _check_db_url(db_url)
+    
+    # Check if query text is provided
+    if "text" not in query:
+        raise HTTPException(status_code=400, detail="Query text is required")
+    
+    # Get query text
+    query_text = query["text"]
+    
+    # Use provided parameters or defaults
+    collection = collection_name or os.environ.get("QDRANT_COLLECTION", "qa_collection")
+    provider = hf_provider or os.environ.get("HF_PROVIDER", "novita")
+    api_key = hf_api_key or os.environ.get("HF_API_KEY")
+    llm = model_name or os.environ.get("LLM_MODEL", "meta-llama/Llama-3.2-3B-Instruct")
+    settings = _answer_settings(collection, provider, api_key, top_k)
+    use_cache = db_url is None
+    
+    async def event_stream():
+        metadata = {"query": query_text, "collection": collection, "model": llm}
+        try:
+            await asyncio.to_thread(_refresh_collection, db_url, collection)
+            query_vector = None
+            if use_cache:
+                with track_stage("query_embed"):
+                    query_vector = await embedding_batcher.embed(query_text)
+                cached = semantic_cache.lookup(collection, llm, query_vector, settings)
+                if cached is not None:
+                    record_answer("cache")
+                    yield _sse_event("metadata", {**metadata, "cached": True, "source": "cache", "contexts": []})
+                    yield _sse_event("token", cached["answer"])
+                    yield _sse_event("done", {})
+                    return
+            
+            rag_chain = await asyncio.to_thread(_get_rag_chain, collection, db_url, provider, api_key, llm, top_k)
+            
+            tokens = []
+            failed = False
+            async for event in rag_chain.astream_answer(query_text, query_vector=query_vector):
+                if event["type"] == "contexts":
+                    yield _sse_event("metadata", {
+                        **metadata,
+                        "cached": False,
+                        "source": event["source"],
+                        "contexts": event["contexts"]
+                    })
+                elif event["type"] == "error":
+                    # Tokens already sent stay on screen; the client shows the error after them
+                    failed = True
+                    yield _sse_event("error", {"detail": event["text"]})
+                else:
+                    tokens.append(event["text"])
+                    yield _sse_event("token", event["text"])
+            
+            # A failed stream is never cached
+            if use_cache and not failed:
+                semantic_cache.store(collection, llm, query_text, query_vector, "".join(tokens), settings)
+            
+            # Stages run while streaming are past the Server-Timing header, so report them here
+            yield _sse_event("done", {"server_timing": server_timing(current_trace())})
+            
+        except Exception as e:
+            logger.error(f"Error streaming RAG answer: {str(e)}")
+            yield _sse_event("error", {"detail": f"Error answering query: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
-async def process_file_in_background(
-    file_path: str,
-    collection_name: str,
-    task_id: str,
-    db_url: Optional[str] = None
+@router.post("/rag/answer/batch")
+async def rag_answer_batch(
+    request: Dict[str, Any],
+    collection_name: Optional[str] = None,
+    db_url: Optional[str] = None,
+    hf_provider: Optional[str] = None,
+    hf_api_key: Optional[str] = None,
+    model_name: Optional[str] = None,
+    top_k: Optional[int] = 3,
+    max_concurrency: Optional[int] = None
 ):
     """
-    Process a file in the background and update task status.
+    Answer many questions using RAG in one request.
+    
+    Queries are embedded in one batched pass and searched with a single Qdrant
+    batch search; LLM calls run concurrently up to `max_concurrency`.
     
     Args:
-        file_path (str): Path to the uploaded file
-        collection_name (str): Name of the Qdrant collection
-        task_id (str): ID of the background task
+        request (Dict[str, Any]): Dictionary containing a "queries" list of texts
+        collection_name (Optional[str]): Name of the collection to query
         db_url (Optional[str]): URL of the Qdrant server
+        hf_provider (Optional[str]): Hugging Face provider
+        hf_api_key (Optional[str]): Hugging Face API key
+        model_name (Optional[str]): Name of the LLM model
+        top_k (Optional[int]): Number of documents to retrieve
+        max_concurrency (Optional[int]): Maximum number of concurrent LLM calls
+        
+    Returns:
+        Dict[str, Any]: One result per query, in order, each with an answer or an error
     """
+    _check_db_url(db_url)
+    
+    queries = request.get("queries")
+    if not isinstance(queries, list):
+        raise HTTPException(status_code=400, detail="A list of queries is required")
+    
     try:
-        # Update status to processing
-        background_tasks_status[task_id] = {"status": "processing", "progress": 0}
-        
-        # Initialize database client if URL provided
-        db = QdrantDB(url=db_url) if db_url else qdrant_db
-        
-        # Process the file
-        count, info = load_qa_into_qdrant(
-            json_file_path=file_path,
-            db=db,
-            model=embedding_model,
-            collection_name=collection_name
-        )
+        # Use provided parameters or defaults
+        collection = collection_name or os.environ.get("QDRANT_COLLECTION", "qa_collection")
+        provider = hf_provider or os.environ.get("HF_PROVIDER", "novita")
+        api_key = hf_api_key or os.environ.get("HF_API_KEY")
+        llm = model_name or os.environ.get("LLM_MODEL", "meta-llama/Llama-3.2-3B-Instruct")
+        concurrency = max_concurrency or int(os.environ.get("RAG_BATCH_CONCURRENCY", "8"))
         
-        # Update status to completed
-        background_tasks_status[task_id] = {
-            "status": "completed",
-            "vectors_count": count,
-            "collection_info": {
-                "name": info.name,
-                "vectors_count": info.vectors_count
-            }
-        }
+        # Only well-formed queries are sent through the chain
+        results = [
+            {"query": text, "answer": None, "source": None, "error": None if isinstance(text, str) and text.strip() else "Query text is required"}
+            for text in queries
+        ]
+        valid = [i for i, result in enumerate(results) if result["error"] is None]
+        
+        if valid:
+            await asyncio.to_thread(_refresh_collection, db_url, collection)
+            texts = [queries[i] for i in valid]
+            with track_stage("query_embed"):
+                query_vectors = await embedding_batcher.embed_many(texts)
+            rag_chain = await asyncio.to_thread(_get_rag_chain, collection, db_url, provider, api_key, llm, top_k)
+            answers = await rag_chain.aanswer_batch(texts, query_vectors=query_vectors, max_concurrency=concurrency)
+            for i, answer in zip(valid, answers):
+                results[i].update(answer)
         
-        # Delete temporary file
-        os.unlink(file_path)
+        return {
+            "results": results,
+            "collection": collection,
+            "model": llm
+        }
         
     except Exception as e:
-        logger.error(f"Error processing file: {str(e)}")
-        background_tasks_status[task_id] = {"status": "failed", "error": str(e)}
-        # Delete temporary file
-        if os.path.exists(file_path):
-            os.unlink(file_path)
+        logger.error(f"Error answering RAG batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error answering queries: {str(e)}")
+
+
+# Size of the chunks used to copy uploaded files to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Uploaded files wait here until their job has run
+job_upload_dir = os.path.abspath(os.environ.get("JOB_UPLOAD_DIR", "ingest_uploads"))
+os.makedirs(job_upload_dir, exist_ok=True)
+
+
+def _on_job_finished(job: Dict[str, Any], params: Dict[str, Any]):
+    """
+    Make a finished load visible to queries served by this process right away.
+    
+    The job store bumped the generation of the collection when the job
+    finished, so other server workers pick the change up on their next query.
+    
+    Args:
+        job (Dict[str, Any]): The finished job
+        params (Dict[str, Any]): Parameters of the job
+    """
+    db_url = params["db_url"]
+    _refresh_collection(None if db_url == qdrant_url else db_url, params["collection_name"])
+
+
+job_queue = JobQueue(
+    job_store,
+    max_concurrent=int(os.environ.get("INGEST_MAX_CONCURRENT", "1")),
+    cancel_grace=float(os.environ.get("JOB_CANCEL_GRACE", "30")),
+    retention=float(os.environ.get("JOB_RETENTION_HOURS", "168")) * 3600,
+    db_options=dict(
+        timeout=qdrant_pool.timeout,
+        prefer_grpc=qdrant_pool.prefer_grpc,
+        grpc_port=qdrant_pool.grpc_port
+    ),
+    embed_store_path=embedding_store_path,
+    embed_backend=embedding_backend,
+    num_threads=int(os.environ.get("INGEST_THREADS", "0")) or None,
+    niceness=int(os.environ.get("INGEST_NICENESS", "10")),
+    on_finished=_on_job_finished
+)
 
 
 @router.post("/vectordb/load")
 async def load_json_to_vectordb(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     collection_name: str = Form("qa_collection"),
-    db_url: Optional[str] = Form(None)
+    db_url: Optional[str] = Form(None),
+    sync: bool = Form(False),
+    workers: Optional[int] = Form(None),
+    quantization: str = Form("none"),
+    on_disk: bool = Form(False)
 ):
     """
-    Upload a JSON file and load QA pairs into Qdrant vector database.
+    Upload a JSON or JSON Lines file and queue a job loading its QA pairs into Qdrant.
+    
+    Jobs are persisted and run in separate processes, at most
+    INGEST_MAX_CONCURRENT at a time across all server workers.
     
     Args:
-        background_tasks: BackgroundTasks for async processing
-        file: The uploaded JSON file
+        file: The uploaded JSON or JSON Lines file
         collection_name: Name for the Qdrant collection
         db_url: Optional URL for the Qdrant server
+        sync: Update the existing collection incrementally instead of recreating it
+        workers: Number of embedding processes, INGEST_WORKERS if not given
+        quantization: Vector quantization of new collections: none, scalar or binary
+        on_disk: Keep the original vectors of new collections on disk
         
     Returns:
         JSONResponse: Task ID and status
     """
+    _check_db_url(db_url)
+    
     # Validate file type
-    if not file.filename.endswith('.json'):
-        raise HTTPException(status_code=400, detail="Only JSON files are supported")
+    if not file.filename.endswith(('.json', '.jsonl')):
+        raise HTTPException(status_code=400, detail="Only JSON and JSON Lines files are supported")
     
     try:
-        # Create a temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.json')
-        temp_file_path = temp_file.name
-        temp_file.close()
-        
-        # Write uploaded file content to the temporary file
-        with open(temp_file_path, 'wb') as f:
-            f.write(await file.read())
-        
-        # Generate task ID
-        task_id = str(uuid.uuid4())
-        
-        # Start background task
-        background_tasks.add_task(
-            process_file_in_background,
-            temp_file_path,
-            collection_name,
-            task_id,
-            db_url
-        )
+        storage = VectorStorage(quantization=quantization, on_disk=on_disk)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Keep the upload until its job has run, which may be after a restart
+        suffix = os.path.splitext(file.filename)[1]
+        file_path = os.path.join(job_upload_dir, f"{uuid.uuid4()}{suffix}")
         
-        # Set initial task status
-        background_tasks_status[task_id] = {"status": "queued"}
+        # Copy the upload to disk in chunks to keep memory flat
+        with open(file_path, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+        
+        task_id = await asyncio.to_thread(job_queue.submit, {
+            "file_path": file_path,
+            "delete_file": True,
+            "collection_name": collection_name,
+            "db_url": db_url or qdrant_url,
+            "sync": sync,
+            "workers": workers or int(os.environ.get("INGEST_WORKERS", "1")),
+            "storage": dataclasses.asdict(storage)
+        })
         
         return JSONResponse(
             status_code=202,
             content={
                 "task_id": task_id,
                 "status": "queued",
-                "message": "File upload successful. Processing started in the background."
+                "message": "File upload successful. Processing is queued."
             }
         )
         
@@ -210,10 +628,25 @@ async def load_json_to_vectordb(
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
+@router.get("/vectordb/tasks")
+async def list_tasks(status: Optional[str] = None, limit: int = 50):
+    """
+    List the most recent ingestion jobs.
+    
+    Args:
+        status (Optional[str]): Only list jobs with this status
+        limit (int): Maximum number of jobs
+        
+    Returns:
+        Dict[str, Any]: Jobs, newest first
+    """
+    return {"tasks": await asyncio.to_thread(job_queue.store.list_jobs, status, limit)}
+
+
 @router.get("/vectordb/task/{task_id}")
 async def get_task_status(task_id: str):
     """
-    Get the status of a background task.
+    Get the status, progress and throughput of an ingestion job.
     
     Args:
         task_id (str): ID of the task
@@ -221,10 +654,32 @@ async def get_task_status(task_id: str):
     Returns:
         Dict[str, Any]: Task status and details
     """
-    if task_id not in background_tasks_status:
+    task = await asyncio.to_thread(job_queue.store.get, task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail=f"Task ID {task_id} not found")
     
-    return background_tasks_status[task_id]
+    return task
+
+
+@router.post("/vectordb/task/{task_id}/cancel")
+async def cancel_task(task_id: str):
+    """
+    Cancel an ingestion job.
+    
+    A queued job is cancelled at once. A running job stops at its next
+    batch and, for a full load, its unfinished collection version is discarded.
+    
+    Args:
+        task_id (str): ID of the task
+        
+    Returns:
+        Dict[str, Any]: Task status and details
+    """
+    task = await asyncio.to_thread(job_queue.cancel, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Task ID {task_id} not found")
+    
+    return task
 
 
 @router.get("/vectordb/collections")
@@ -238,16 +693,18 @@ async def list_collections(db_url: Optional[str] = None):
     Returns:
         Dict[str, Any]: List of collections
     """
+    _check_db_url(db_url)
+    
     try:
         # Use the provided DB URL or the default one
-        db = QdrantDB(url=db_url) if db_url else qdrant_db
+        db = _get_db(db_url)
         
         # Get collections
-        collections = db.client.get_collections().collections
+        collections = await asyncio.to_thread(db.list_collections)
         
         return {
             "collections": [
-                {"name": collection.name} for collection in collections
+                {"name": name} for name in collections
             ]
         }
         
@@ -268,12 +725,14 @@ async def get_collection_info(collection_name: str, db_url: Optional[str] = None
     Returns:
         Dict[str, Any]: Collection information
     """
+    _check_db_url(db_url)
+    
     try:
         # Use the provided DB URL or the default one
-        db = QdrantDB(url=db_url) if db_url else qdrant_db
+        db = _get_db(db_url)
         
         # Get collection info
-        info = db.get_collection_info(collection_name)
+        info = await asyncio.to_thread(db.get_collection_info, collection_name)
         
         return {
             "name": info.name,
@@ -286,6 +745,140 @@ async def get_collection_info(collection_name: str, db_url: Optional[str] = None
         raise HTTPException(status_code=500, detail=f"Error getting collection info: {str(e)}")
 
 
+@router.get("/vectordb/collection/{collection_name}/versions")
+async def list_collection_versions(collection_name: str, db_url: Optional[str] = None):
+    """
+    List the versions behind a collection alias.
+    
+    Args:
+        collection_name (str): Name of the collection alias
+        db_url (Optional[str]): URL of the Qdrant server
+        
+    Returns:
+        Dict[str, Any]: Active version and all available versions, oldest first
+    """
+    _check_db_url(db_url)
+    
+    try:
+        # Use the provided DB URL or the default one
+        db = _get_db(db_url)
+        
+        active = await asyncio.to_thread(db.resolve_alias, collection_name)
+        versions = await asyncio.to_thread(db.list_versions, collection_name)
+        
+        return {
+            "name": collection_name,
+            "active": active,
+            "versions": versions
+        }
+        
+    except Exception as e:
+        logger.error(f"Error listing collection versions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error listing collection versions: {str(e)}")
+
+
+@router.post("/vectordb/collection/{collection_name}/rollback")
+async def rollback_collection(collection_name: str, db_url: Optional[str] = None):
+    """
+    Point a collection alias back at its previous version.
+    
+    Args:
+        collection_name (str): Name of the collection alias
+        db_url (Optional[str]): URL of the Qdrant server
+        
+    Returns:
+        Dict[str, Any]: Version the alias now points to
+    """
+    _check_db_url(db_url)
+    
+    # Use the provided DB URL or the default one
+    db = _get_db(db_url)
+    
+    try:
+        active = await asyncio.to_thread(db.rollback, collection_name)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rolling back collection: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error rolling back collection: {str(e)}")
+    
+    await asyncio.to_thread(_collection_changed, db_url, collection_name)
+    return {"name": collection_name, "active": active}
+
+
+@router.put("/vectordb/collection/{collection_name}/qa")
+async def upsert_qa(
+    collection_name: str,
+    qa: Dict[str, str],
+    db_url: Optional[str] = None
+):
+    """
+    Insert or update a single QA pair.
+    
+    Args:
+        collection_name (str): Name of the collection
+        qa (Dict[str, str]): Dictionary containing the question and answer
+        db_url (Optional[str]): URL of the Qdrant server
+        
+    Returns:
+        Dict[str, Any]: Point ID of the QA pair
+    """
+    _check_db_url(db_url)
+    
+    if not qa.get("question") or not qa.get("answer"):
+        raise HTTPException(status_code=400, detail="Question and answer are required")
+    
+    try:
+        # Use the provided DB URL or the default one
+        db = _get_db(db_url)
+        
+        # Embed through the batcher, whose single worker thread owns the shared model
+        embedding = (await embedding_batcher.embed_many([qa["question"]]))[0]
+        point_id = await asyncio.to_thread(
+            upsert_qa_pair, db, None, collection_name, qa["question"], qa["answer"], embedding
+        )
+        await asyncio.to_thread(_collection_changed, db_url, collection_name)
+        
+        return {"id": point_id, "status": "upserted"}
+        
+    except Exception as e:
+        logger.error(f"Error upserting QA pair: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error upserting QA pair: {str(e)}")
+
+
+@router.delete("/vectordb/collection/{collection_name}/qa/{point_id}")
+async def delete_qa(
+    collection_name: str,
+    point_id: Union[int, str],
+    db_url: Optional[str] = None
+):
+    """
+    Delete a single QA pair by its point ID.
+    
+    Args:
+        collection_name (str): Name of the collection
+        point_id (Union[int, str]): Point ID of the QA pair, a UUID or an unsigned integer
+        db_url (Optional[str]): URL of the Qdrant server
+        
+    Returns:
+        Dict[str, Any]: Point ID of the deleted QA pair
+    """
+    _check_db_url(db_url)
+    
+    try:
+        # Use the provided DB URL or the default one
+        db = _get_db(db_url)
+        
+        await asyncio.to_thread(db.delete_points, collection_name, [point_id])
+        await asyncio.to_thread(_collection_changed, db_url, collection_name)
+        
+        return {"id": point_id, "status": "deleted"}
+        
+    except Exception as e:
+        logger.error(f"Error deleting QA pair: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error deleting QA pair: {str(e)}")
+
+
 @router.post("/vectordb/search/{collection_name}")
 async def search_collection(
     collection_name: str,
@@ -303,6 +896,8 @@ async def search_collection(
     Returns:
         Dict[str, Any]: Search results
     """
+    _check_db_url(db_url)
+    
     try:
         # Check if query text is provided
         if "text" not in query:
@@ -313,13 +908,15 @@ async def search_collection(
         limit = query.get("limit", 3)
         
         # Use the provided DB URL or the default one
-        db = QdrantDB(url=db_url) if db_url else qdrant_db
+        db = _get_db(db_url)
         
         # Generate embedding for the query text
-        query_vector = embedding_model.get_embedding(text)
+        with track_stage("query_embed"):
+            query_vector = await embedding_batcher.embed(text)
         
         # Search the collection
-        results = db.search(collection_name, query_vector, limit=limit)
+        await asyncio.to_thread(_refresh_collection, db_url, collection_name)
+        results = await asyncio.to_thread(db.search, collection_name, query_vector, limit=limit)
         
         # Format the response
         formatted_results = []
@@ -335,4 +932,97 @@ async def search_collection(
         
     except Exception as e:
         logger.error(f"Error searching collection: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error searching collection: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error searching collection: {str(e)}")
+
+
+@router.post("/vectordb/search/batch/{collection_name}")
+async def search_collection_batch(
+    collection_name: str,
+    request: Dict[str, Any],
+    db_url: Optional[str] = None
+):
+    """
+    Search for similar vectors for many queries in one request.
+    
+    Args:
+        collection_name (str): Name of the collection
+        request (Dict[str, Any]): Dictionary containing a "queries" list of texts and an optional "limit"
+        db_url (Optional[str]): URL of the Qdrant server
+        
+    Returns:
+        Dict[str, Any]: One result per query, in order, each with hits or an error
+    """
+    _check_db_url(db_url)
+    
+    queries = request.get("queries")
+    if not isinstance(queries, list):
+        raise HTTPException(status_code=400, detail="A list of queries is required")
+    
+    try:
+        limit = request.get("limit", 3)
+        
+        # Use the provided DB URL or the default one
+        db = _get_db(db_url)
+        
+        results = [
+            {"query": text, "results": [], "error": None if isinstance(text, str) and text.strip() else "Query text is required"}
+            for text in queries
+        ]
+        valid = [i for i, result in enumerate(results) if result["error"] is None]
+        
+        if valid:
+            # Embed all queries in one pass and search them in one request
+            with track_stage("query_embed"):
+                query_vectors = await embedding_batcher.embed_many([queries[i] for i in valid])
+            await asyncio.to_thread(_refresh_collection, db_url, collection_name)
+            batch_hits = await asyncio.to_thread(db.search_batch, collection_name, query_vectors, limit)
+            
+            for i, hits in zip(valid, batch_hits):
+                results[i]["results"] = [
+                    {
+                        "score": hit.score,
+                        "question": hit.payload.get("question"),
+                        "answer": hit.payload.get("answer"),
+                        "id": hit.payload.get("id")
+                    }
+                    for hit in hits
+                ]
+        
+        return {"results": results}
+        
+    except Exception as e:
+        logger.error(f"Error searching collection in batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching collection: {str(e)}")
+
+
+@router.get("/embeddings/cache")
+async def get_embedding_cache_stats():
+    """
+    Get statistics for the query embedding cache.
+    
+    Returns:
+        Dict[str, Any]: Cache size, hit and miss counters
+    """
+    return embedding_cache.stats()
+
+
+@router.get("/embeddings/padding")
+async def get_embedding_padding_stats():
+    """
+    Get padding efficiency of batched embedding.
+    
+    Returns:
+        Dict[str, Any]: Real and padded token counts and their ratio
+    """
+    return embedding_model.padding_stats()
+
+
+@router.get("/rag/cache")
+async def get_semantic_cache_stats():
+    """
+    Get statistics for the semantic answer cache.
+    
+    Returns:
+        Dict[str, Any]: Cache size, threshold, hit and miss counters
+    """
+    return semantic_cache.stats()
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Benchmarks subpackage for AI Core.
+"""
+
+from .quantization import quantization_report, ReportConfig, DEFAULT_CONFIGS
+from .load_test import run_load_test, SCENARIOS
+
+__all__ = ["quantization_report", "ReportConfig", "DEFAULT_CONFIGS", "run_load_test", "SCENARIOS"]
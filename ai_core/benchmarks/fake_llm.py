@@ -0,0 +1,140 @@
+"""
+OpenAI-compatible stand-in for the remote LLM with configurable latency and token rate.
+
+Run it from the ai_core directory with `python -m benchmarks.fake_llm --port 8081`
+and point LLM_BASE_URL at it.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Text the fake model repeats to build its answers
+ANSWER_WORDS = (
+    "Thank you for your question. Based on the retrieved information, "
+    "here is what you need to know about your account and our banking services."
+).split()
+
+
+def _answer_tokens(count: int):
+    """Build an answer of `count` word tokens."""
+    return [ANSWER_WORDS[i % len(ANSWER_WORDS)] + " " for i in range(count)]
+
+
+def create_fake_llm_app(latency_ms: float = 300.0, tokens_per_second: float = 50.0, answer_tokens: int = 60) -> FastAPI:
+    """
+    Create the fake LLM server.
+
+    Args:
+        latency_ms (float): Delay before the first token, standing in for queueing and prefill
+        tokens_per_second (float): Generation speed after the first token
+        answer_tokens (int): Number of tokens in every answer
+
+    Returns:
+        FastAPI: Application serving /v1/chat/completions
+    """
+    app = FastAPI(title="Fake LLM")
+    token_delay = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body: Dict[str, Any] = await request.json()
+        model = body.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        tokens = _answer_tokens(answer_tokens)
+
+        if body.get("stream"):
+            async def stream():
+                await asyncio.sleep(latency_ms / 1000)
+                for i, token in enumerate(tokens):
+                    if i:
+                        await asyncio.sleep(token_delay)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "system_fingerprint": "fake",
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"role": "assistant", "content": token},
+                            "logprobs": None,
+                            "finish_reason": "stop" if i == len(tokens) - 1 else None
+                        }]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    usage_chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "system_fingerprint": "fake",
+                        "choices": [],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(tokens),
+                            "total_tokens": prompt_tokens + len(tokens)
+                        }
+                    }
+                    yield f"data: {json.dumps(usage_chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency_ms / 1000 + token_delay * max(0, len(tokens) - 1))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "system_fingerprint": "fake",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                "logprobs": None,
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens)
+            }
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def main():
+    """Run the fake LLM server."""
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind to")
+    parser.add_argument("--port", type=int, default=8081, help="Port to bind to")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Delay before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Generation speed")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="Number of tokens per answer")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_fake_llm_app(args.latency_ms, args.tokens_per_second, args.answer_tokens),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+End-to-end load test of the API against local stand-ins for Qdrant and the LLM.
+
+The API runs in its own process with a LocalVectorDB index (local:// URL)
+and talks to the fake LLM server over HTTP, so the whole request path is
+exercised without any network access beyond localhost. The embedding
+model has to be in the local Hugging Face cache.
+"""
+
+import http.client
+import json
+import logging
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+import numpy as np
+
+from processors import iter_qa_data
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the api/, database/, ... packages the server imports
+AI_CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ("rag_answer", "search", "load")
+
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_http(port: int, path: str, process: subprocess.Popen, timeout: float):
+    """Wait until a local server answers on a path."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server on port {port} exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", path)
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server on port {port} did not start within {timeout}s")
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies in milliseconds."""
+    if not latencies:
+        return {}
+    values = np.array(latencies)
+    return {
+        "mean": round(float(values.mean()), 2),
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "max": round(float(values.max()), 2)
+    }
+
+
+class _ApiClient:
+    """Minimal keep-alive JSON client; one per load-generating thread."""
+
+    def __init__(self, port: int, timeout: float = 300.0):
+        self.port = port
+        self.timeout = timeout
+        self._conn = None
+
+    def request(self, method: str, path: str, body: bytes = None, headers: Dict[str, str] = None) -> Tuple[int, Any]:
+        """Send a request, reconnecting once if the kept-alive connection was dropped."""
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, path, body=body, headers=headers or {})
+                response = self._conn.getresponse()
+                data = response.read()
+                return response.status, json.loads(data) if data else None
+            except (http.client.HTTPException, ConnectionError):
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+
+    def post_json(self, path: str, payload: Any) -> Tuple[int, Any]:
+        return self.request("POST", path, json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json"})
+
+    def upload(self, path: str, file_path: str, fields: Dict[str, str]) -> Tuple[int, Any]:
+        """POST a file as multipart/form-data."""
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode("utf-8")
+            )
+        with open(file_path, "rb") as f:
+            content = f.read()
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+            f"filename=\"{os.path.basename(file_path)}\"\r\nContent-Type: application/json\r\n\r\n".encode("utf-8")
+            + content + b"\r\n"
+        )
+        parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+        return self.request("POST", path, b"".join(parts), {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+
+def _load_and_wait(client: _ApiClient, file_path: str, collection: str, timeout: float = 3600.0) -> Dict[str, Any]:
+    """Upload a dataset and poll its task until it finishes."""
+    status, body = client.upload("/api/v1/vectordb/load", file_path, {"collection_name": collection})
+    if status != 202:
+        raise RuntimeError(f"Load request failed with status {status}: {body}")
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, task = client.request("GET", f"/api/v1/vectordb/task/{body['task_id']}")
+        if task.get("status") == "completed":
+            return task
+        if task.get("status") in ("failed", "cancelled"):
+            raise RuntimeError(f"Load task {task.get('status')}: {task.get('error')}")
+        time.sleep(0.2)
+    raise TimeoutError(f"Load task {body['task_id']} did not finish within {timeout}s")
+
+
+def _run_closed_loop(
+    port: int,
+    concurrency: int,
+    total_requests: int,
+    send: Callable[[_ApiClient, int], bool]
+) -> Dict[str, Any]:
+    """
+    Keep `concurrency` requests in flight until `total_requests` have been sent.
+
+    Args:
+        port (int): Port of the API server
+        concurrency (int): Number of concurrent clients
+        total_requests (int): Number of requests across all clients
+        send (Callable[[_ApiClient, int], bool]): Sends request number i, returns False on an error response
+
+    Returns:
+        Dict[str, Any]: Request and error counts, duration, throughput and latency percentiles
+    """
+    counter = iter(range(total_requests))
+    counter_lock = threading.Lock()
+    latencies = []
+    errors = []
+    results_lock = threading.Lock()
+
+    def worker():
+        client = _ApiClient(port)
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                ok = send(client, i)
+                error = None if ok else "error response"
+            except Exception as e:
+                error = type(e).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            with results_lock:
+                latencies.append(elapsed)
+                if error:
+                    errors.append(error)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    duration = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": _latency_summary(latencies)
+    }
+
+
+def run_load_test(
+    json_file_path: str,
+    output_path: str = "load_test_results.json",
+    scenarios: Tuple[str, ...] = SCENARIOS,
+    concurrency_levels: Tuple[int, ...] = (1, 8, 32),
+    requests_per_level: int = 200,
+    load_requests_per_level: int = 2,
+    llm_latency_ms: float = 300.0,
+    llm_tokens_per_second: float = 50.0,
+    llm_answer_tokens: int = 60,
+    server_env: Optional[Dict[str, str]] = None,
+    startup_timeout: float = 300.0
+) -> Dict[str, Any]:
+    """
+    Boot the API with local stand-ins and measure it under concurrent load.
+
+    Every scenario is run once per concurrency level in closed loop: each
+    client sends its next request as soon as the previous one returns.
+    Queries cycle through the dataset's questions. A load request counts
+    from upload until its background task completes.
+
+    Args:
+        json_file_path (str): JSON or JSON Lines dataset loaded into the index and used for queries
+        output_path (str): JSON file the results are written to
+        scenarios (Tuple[str, ...]): Scenarios to run, any of "rag_answer", "search" and "load"
+        concurrency_levels (Tuple[int, ...]): Numbers of concurrent clients
+        requests_per_level (int): Requests per query scenario and concurrency level
+        load_requests_per_level (int): Uploads per concurrency level of the load scenario
+        llm_latency_ms (float): Fake LLM delay before the first token
+        llm_tokens_per_second (float): Fake LLM generation speed
+        llm_answer_tokens (int): Tokens per fake LLM answer
+        server_env (Optional[Dict[str, str]]): Extra environment variables for the API server,
+            e.g. SEMANTIC_CACHE_SIZE=0 to measure without the answer cache
+        startup_timeout (float): Seconds to wait for the servers to start
+
+    Returns:
+        Dict[str, Any]: Configuration, environment and per-scenario results
+    """
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    questions = [qa["question"] for qa in iter_qa_data(json_file_path)]
+    if not questions:
+        raise ValueError(f"No QA pairs found in {json_file_path}")
+
+    work_dir = tempfile.mkdtemp(prefix="ai_core_load_test_")
+    llm_port = _free_port()
+    api_port = _free_port()
+    collection = "load_test"
+    python_path = os.pathsep.join([AI_CORE_DIR, os.environ.get("PYTHONPATH", "")])
+    processes = []
+
+    try:
+        llm_process = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.fake_llm",
+                "--port", str(llm_port),
+                "--latency-ms", str(llm_latency_ms),
+                "--tokens-per-second", str(llm_tokens_per_second),
+                "--answer-tokens", str(llm_answer_tokens)
+            ],
+            env={**os.environ, "PYTHONPATH": python_path}
+        )
+        processes.append(llm_process)
+
+        env = {
+            **os.environ,
+            "PYTHONPATH": python_path,
+            "QDRANT_URL": f"local://{os.path.join(work_dir, 'index')}",
+            "JOB_DB_PATH": os.path.join(work_dir, "jobs.sqlite3"),
+            "JOB_UPLOAD_DIR": os.path.join(work_dir, "uploads"),
+            "QDRANT_COLLECTION": collection,
+            "LLM_BASE_URL": f"http://127.0.0.1:{llm_port}",
+            "HF_API_KEY": "load-test",
+            "HF_HUB_OFFLINE": os.environ.get("HF_HUB_OFFLINE", "1"),
+            **(server_env or {})
+        }
+        api_process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "api.app:app",
+                "--host", "127.0.0.1",
+                "--port", str(api_port),
+                "--log-level", "warning"
+            ],
+            cwd=AI_CORE_DIR,
+            env=env
+        )
+        processes.append(api_process)
+
+        _wait_for_http(llm_port, "/health", llm_process, startup_timeout)
+        _wait_for_http(api_port, "/health", api_process, startup_timeout)
+        logger.info(f"API on port {api_port}, fake LLM on port {llm_port}")
+
+        # Seed the index the query scenarios run against
+        start = time.perf_counter()
+        _load_and_wait(_ApiClient(api_port), json_file_path, collection)
+        logger.info(f"Loaded {len(questions)} QA pairs in {time.perf_counter() - start:.1f}s")
+
+        def send_answer(client: _ApiClient, i: int) -> bool:
+            status, _ = client.post_json(
+                f"/api/v1/rag/answer?collection_name={collection}",
+                {"text": questions[i % len(questions)]}
+            )
+            return status == 200
+
+        def send_search(client: _ApiClient, i: int) -> bool:
+            status, _ = client.post_json(
+                f"/api/v1/vectordb/search/{collection}",
+                {"text": questions[i % len(questions)], "limit": 3}
+            )
+            return status == 200
+
+        def send_load(client: _ApiClient, i: int) -> bool:
+            _load_and_wait(client, json_file_path, f"{collection}_load_{uuid.uuid4().hex[:8]}")
+            return True
+
+        senders = {
+            "rag_answer": (send_answer, requests_per_level),
+            "search": (send_search, requests_per_level),
+            "load": (send_load, load_requests_per_level)
+        }
+
+        results = {}
+        for scenario in scenarios:
+            send, total = senders[scenario]
+            results[scenario] = []
+            for concurrency in concurrency_levels:
+                logger.info(f"Running {scenario} with {concurrency} concurrent clients")
+                level = _run_closed_loop(api_port, concurrency, total, send)
+                results[scenario].append(level)
+                logger.info(
+                    f"{scenario} x{concurrency}: {level['throughput_rps']} req/s, "
+                    f"p50={level['latency_ms'].get('p50')}ms, p99={level['latency_ms'].get('p99')}ms, "
+                    f"errors={level['errors']}"
+                )
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "config": {
+            "dataset": json_file_path,
+            "qa_pairs": len(questions),
+            "concurrency_levels": list(concurrency_levels),
+            "requests_per_level": requests_per_level,
+            "load_requests_per_level": load_requests_per_level,
+            "llm_latency_ms": llm_latency_ms,
+            "llm_tokens_per_second": llm_tokens_per_second,
+            "llm_answer_tokens": llm_answer_tokens,
+            "server_env": server_env or {}
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        },
+        "results": results
+    }
+
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote load test results to {output_path}")
+
+    return report
@@ -0,0 +1,191 @@
+"""
+Recall versus latency report for vector storage and quantization settings.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import namedtuple
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from qdrant_client.http import models
+
+from database import QdrantDB, VectorStorage
+from database.storage import quantization_search_params
+from models import EmbeddingModel
+from processors import iter_qa_data
+
+logger = logging.getLogger(__name__)
+
+# One configuration of the report: how vectors are stored and how they are searched
+ReportConfig = namedtuple("ReportConfig", ["name", "storage", "oversampling", "rescore"])
+
+DEFAULT_CONFIGS = [
+    ReportConfig("float32", VectorStorage(), None, True),
+    ReportConfig("float32-on-disk", VectorStorage(on_disk=True), None, True),
+    ReportConfig("scalar", VectorStorage(quantization="scalar"), None, True),
+    ReportConfig("scalar-no-rescore", VectorStorage(quantization="scalar"), None, False),
+    ReportConfig("scalar-on-disk", VectorStorage(quantization="scalar", on_disk=True), None, True),
+    ReportConfig("binary-x2", VectorStorage(quantization="binary"), 2.0, True),
+    ReportConfig("binary-x4", VectorStorage(quantization="binary"), 4.0, True),
+    ReportConfig("binary-on-disk-x4", VectorStorage(quantization="binary", on_disk=True), 4.0, True),
+]
+
+# Prefix of the temporary collections built by the report
+COLLECTION_PREFIX = "quantization_report__"
+
+
+def _wait_until_indexed(db: QdrantDB, collection_name: str, timeout: float = 600.0):
+    """Wait for Qdrant to finish optimizing a collection, so quantized segments are searched."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if db.get_collection_info(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1.0)
+    logger.warning(f"Collection {collection_name} is still being optimized; results may be skewed")
+
+
+def _upload(db: QdrantDB, collection_name: str, vectors: np.ndarray, batch_size: int = 256):
+    """Upload vectors with sequential IDs and no payload."""
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start:start + batch_size]
+        db.upload_batch(
+            collection_name,
+            batch.tolist(),
+            [{} for _ in range(len(batch))],
+            start_id=start,
+            wait=start + batch_size >= len(vectors)
+        )
+
+
+def _search_all(db: QdrantDB, collection_name: str, queries: np.ndarray, limit: int, search_params) -> Dict[str, Any]:
+    """Run queries one at a time, returning their hit IDs and latencies."""
+    ids = []
+    latencies = []
+    for vector in queries:
+        start = time.perf_counter()
+        hits = db.search(collection_name, vector.tolist(), limit=limit, search_params=search_params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids.append([hit.id for hit in hits])
+    return {"ids": ids, "latencies": np.array(latencies)}
+
+
+def quantization_report(
+    json_file_path: str,
+    db: QdrantDB,
+    model: Optional[EmbeddingModel] = None,
+    configs: List[ReportConfig] = DEFAULT_CONFIGS,
+    num_queries: int = 200,
+    limit: int = 10,
+    output_path: Optional[str] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Compare the recall and latency of storage configurations against exact search.
+
+    Every distinct storage setting gets a temporary collection holding the
+    dataset's question embeddings. A sample of the questions is searched in
+    each configuration, and recall@limit is measured against exact float32
+    search. The temporary collections are deleted afterwards.
+
+    Args:
+        json_file_path (str): Path to the JSON or JSON Lines dataset
+        db (QdrantDB): Qdrant database client
+        model (Optional[EmbeddingModel]): Embedding model, created if None
+        configs (List[ReportConfig]): Configurations to compare
+        num_queries (int): Number of sampled questions used as queries
+        limit (int): Number of neighbours compared per query
+        output_path (Optional[str]): JSON file the report is written to
+        seed (int): Seed of the query sample
+
+    Returns:
+        Dict[str, Any]: Report with recall, latency percentiles and estimated RAM per configuration
+    """
+    if not isinstance(db, QdrantDB):
+        raise ValueError("The quantization report needs a Qdrant server")
+
+    model = model or EmbeddingModel()
+    questions = [qa["question"] for qa in iter_qa_data(json_file_path)]
+    if not questions:
+        raise ValueError(f"No QA pairs found in {json_file_path}")
+
+    vectors = np.asarray(model.get_embeddings(questions), dtype=np.float32)
+    sample = random.Random(seed).sample(range(len(questions)), min(num_queries, len(questions)))
+    queries = vectors[sample]
+    vector_size = vectors.shape[1]
+
+    collections = {}
+    try:
+        for config in configs:
+            key = (config.storage.quantization, config.storage.on_disk, config.storage.always_ram)
+            if key in collections:
+                continue
+            collection_name = f"{COLLECTION_PREFIX}{len(collections)}"
+            db.create_collection(collection_name, vector_size=vector_size, storage=config.storage)
+            _upload(db, collection_name, vectors)
+            _wait_until_indexed(db, collection_name)
+            collections[key] = collection_name
+
+        # Exact search over the original vectors is the ground truth
+        baseline = _search_all(
+            db, next(iter(collections.values())), queries, limit, models.SearchParams(exact=True)
+        )
+
+        results = []
+        for config in configs:
+            key = (config.storage.quantization, config.storage.on_disk, config.storage.always_ram)
+            run = _search_all(
+                db, collections[key], queries, limit,
+                quantization_search_params(config.oversampling, config.rescore)
+            )
+            recall = np.mean([
+                len(set(found) & set(expected)) / max(1, len(expected))
+                for found, expected in zip(run["ids"], baseline["ids"])
+            ])
+            bytes_per_vector = config.storage.bytes_per_vector(vector_size)
+            results.append({
+                "name": config.name,
+                "quantization": config.storage.quantization,
+                "on_disk": config.storage.on_disk,
+                "oversampling": config.oversampling,
+                "rescore": config.rescore,
+                "recall": round(float(recall), 4),
+                "latency_ms": {
+                    "mean": round(float(run["latencies"].mean()), 3),
+                    "p50": round(float(np.percentile(run["latencies"], 50)), 3),
+                    "p95": round(float(np.percentile(run["latencies"], 95)), 3),
+                    "p99": round(float(np.percentile(run["latencies"], 99)), 3)
+                },
+                "ram_bytes_per_vector": bytes_per_vector,
+                "ram_mb": round(bytes_per_vector * len(vectors) / 2**20, 2)
+            })
+            logger.info(
+                f"{config.name}: recall@{limit}={recall:.4f}, "
+                f"p50={results[-1]['latency_ms']['p50']}ms, p95={results[-1]['latency_ms']['p95']}ms, "
+                f"ram={results[-1]['ram_mb']}MB"
+            )
+    finally:
+        for collection_name in collections.values():
+            db.delete_collection(collection_name)
+
+    report = {
+        "dataset": json_file_path,
+        "points": len(vectors),
+        "vector_size": vector_size,
+        "queries": len(queries),
+        "limit": limit,
+        "exact_latency_ms": {
+            "p50": round(float(np.percentile(baseline["latencies"], 50)), 3),
+            "p95": round(float(np.percentile(baseline["latencies"], 95)), 3)
+        },
+        "configs": results
+    }
+
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Wrote quantization report to {output_path}")
+
+    return report
@@ -3,5 +3,8 @@ Database subpackage for AI Core.
 """
 
 from .qdrant_client import QdrantDB
+from .local_index import LocalVectorDB
+from .pool import QdrantPool, create_vector_db
+from .storage import VectorStorage, QUANTIZATION_MODES
 
-__all__ = ["QdrantDB"]
\ No newline at end of file
+__all__ = ["QdrantDB", "LocalVectorDB", "QdrantPool", "create_vector_db", "VectorStorage", "QUANTIZATION_MODES"]
\ No newline at end of file
@@ -0,0 +1,721 @@
+"""
+In-process vector index with the same interface as QdrantDB.
+"""
+
+import base64
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Without advisory locks the index must only be written by one process
+    fcntl = None
+
+from monitoring import track_stage, record_batch
+from .versioning import VersionedCollectionsMixin
+
+logger = logging.getLogger(__name__)
+
+PointId = Union[int, str]
+
+
+@dataclass
+class ScoredPoint:
+    """Search hit, mirroring the fields of Qdrant's ScoredPoint used by callers."""
+
+    id: PointId
+    score: float
+    payload: Dict[str, Any]
+
+
+@dataclass
+class LocalCollectionInfo:
+    """Collection information, mirroring the fields of Qdrant's CollectionInfo used by callers."""
+
+    name: str
+    status: str
+    vectors_count: int
+    points_count: int
+    vector_size: int
+
+
+class _Collection:
+    """
+    Normalized vectors, IDs and payloads of one collection.
+
+    On disk a collection is a snapshot plus a journal of the changes made
+    since. Each change appends one line to the journal, and the snapshot is
+    only rewritten once the journal has grown as large as the collection.
+    """
+
+    JOURNAL_FILE = "journal.jsonl"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.alive = np.empty(0, dtype=bool)
+        self.count = 0
+        self.ids: List[PointId] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.id_to_row: Dict[PointId, int] = {}
+        # Snapshot the collection was read from, and how much of its journal is applied
+        self.snapshot: Optional[Tuple[int, int]] = None
+        self.journal_size = 0
+        self.journal_points = 0
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+    def upsert(self, ids: List[PointId], vectors: np.ndarray, payloads: List[Dict[str, Any]]):
+        """Insert new points and overwrite existing ones."""
+        new_rows = [i for i, point_id in enumerate(ids) if point_id not in self.id_to_row]
+        self._reserve(self.count + len(new_rows))
+
+        for i, point_id in enumerate(ids):
+            row = self.id_to_row.get(point_id)
+            if row is None:
+                row = self.count
+                self.count += 1
+                self.ids.append(point_id)
+                self.payloads.append(None)
+                self.id_to_row[point_id] = row
+            self.vectors[row] = vectors[i]
+            self.alive[row] = True
+            self.payloads[row] = payloads[i]
+
+    def set_payload(self, point_id: PointId, payload: Dict[str, Any]):
+        """Replace the payload of a point, if it exists."""
+        row = self.id_to_row.get(point_id)
+        if row is not None:
+            self.payloads[row] = payload
+
+    def delete(self, ids: List[PointId]):
+        """Tombstone points; their rows are dropped when the snapshot is rewritten."""
+        for point_id in ids:
+            row = self.id_to_row.pop(point_id, None)
+            if row is not None:
+                self.alive[row] = False
+                self.payloads[row] = None
+
+    def search(self, queries: np.ndarray, limit: int) -> List[List[ScoredPoint]]:
+        """Exact top-k cosine search for a matrix of normalized queries."""
+        if len(self) == 0 or limit <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ self.vectors[:self.count].T
+        scores[:, ~self.alive[:self.count]] = -np.inf
+        k = min(limit, len(self))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = []
+        for query_scores, rows in zip(scores, top):
+            rows = rows[np.argsort(-query_scores[rows])]
+            results.append([
+                ScoredPoint(id=self.ids[row], score=float(query_scores[row]), payload=self.payloads[row])
+                for row in rows
+            ])
+        return results
+
+    def apply(self, change: Dict[str, Any]):
+        """Apply a journaled change."""
+        if change["op"] == "upsert":
+            vectors = np.frombuffer(base64.b64decode(change["vectors"]), dtype=np.float32)
+            self.upsert(change["ids"], vectors.reshape(-1, self.dim), change["payloads"])
+            self.journal_points += len(change["ids"])
+        elif change["op"] == "payload":
+            self.set_payload(change["id"], change["payload"])
+            self.journal_points += 1
+        elif change["op"] == "payloads":
+            for point_id, payload in zip(change["ids"], change["payloads"]):
+                self.set_payload(point_id, payload)
+            self.journal_points += len(change["ids"])
+        elif change["op"] == "delete":
+            self.delete(change["ids"])
+            self.journal_points += len(change["ids"])
+        else:
+            raise ValueError(f"Unknown journal operation: {change['op']}")
+
+    @staticmethod
+    def encode_upsert(ids: List[PointId], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the journal entry of an upsert."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        return {
+            "op": "upsert",
+            "ids": list(ids),
+            "vectors": base64.b64encode(vectors.tobytes()).decode("ascii"),
+            "payloads": list(payloads)
+        }
+
+    def append(self, path: str, change: Dict[str, Any], durable: bool = True):
+        """
+        Write a change to the journal and apply it.
+
+        Args:
+            path (str): Directory of the collection
+            change (Dict[str, Any]): Journal entry
+            durable (bool): Sync the journal to disk before returning
+        """
+        line = (json.dumps(change) + "\n").encode("utf-8")
+        with open(os.path.join(path, self.JOURNAL_FILE), "ab") as f:
+            f.write(line)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        self.journal_size += len(line)
+        self.apply(change)
+
+    def needs_compaction(self, min_points: int) -> bool:
+        """Check whether the journal has grown as large as the collection."""
+        return self.journal_points >= max(len(self), min_points)
+
+    def replay(self, path: str, repair: bool = False):
+        """
+        Apply journal entries written since the journal was last read.
+
+        Args:
+            path (str): Directory of the collection
+            repair (bool): Cut off a partially written last entry instead of just ignoring it
+        """
+        journal_path = os.path.join(path, self.JOURNAL_FILE)
+        if not os.path.exists(journal_path) or os.path.getsize(journal_path) <= self.journal_size:
+            return
+        with open(journal_path, "rb") as f:
+            f.seek(self.journal_size)
+            appended = f.read()
+
+        complete = appended.rfind(b"\n") + 1
+        for line in appended[:complete].splitlines():
+            self.apply(json.loads(line))
+        self.journal_size += complete
+
+        if complete < len(appended) and repair:
+            logger.warning(f"Repairing journal of {path}: dropping a partially written entry")
+            with open(journal_path, "ab") as f:
+                f.truncate(self.journal_size)
+
+    def save(self, path: str):
+        """Compact away deleted rows, write a new snapshot and empty the journal."""
+        rows = np.flatnonzero(self.alive[:self.count])
+        os.makedirs(path, exist_ok=True)
+
+        tmp_vectors = os.path.join(path, "vectors.tmp.npy")
+        np.save(tmp_vectors, np.ascontiguousarray(self.vectors[rows]))
+        with open(os.path.join(path, "payloads.jsonl.tmp"), "w") as f:
+            for row in rows:
+                f.write(json.dumps(self.payloads[row]) + "\n")
+        with open(os.path.join(path, "meta.json.tmp"), "w") as f:
+            json.dump({"dim": self.dim, "ids": [self.ids[row] for row in rows]}, f)
+
+        os.replace(tmp_vectors, os.path.join(path, "vectors.npy"))
+        os.replace(os.path.join(path, "payloads.jsonl.tmp"), os.path.join(path, "payloads.jsonl"))
+        os.replace(os.path.join(path, "meta.json.tmp"), os.path.join(path, "meta.json"))
+        # Replaying the journal over the new snapshot would be harmless, so a crash here loses nothing
+        journal_path = os.path.join(path, self.JOURNAL_FILE)
+        if os.path.exists(journal_path):
+            os.unlink(journal_path)
+
+        self.snapshot = self.snapshot_of(path)
+        self.journal_size = 0
+        self.journal_points = 0
+
+    @staticmethod
+    def snapshot_of(path: str) -> Optional[Tuple[int, int]]:
+        """
+        Identify the snapshot currently on disk.
+
+        Every snapshot replaces the metadata file, so its inode and modification
+        time change whenever any process rewrites the collection.
+
+        Returns:
+            Optional[Tuple[int, int]]: Snapshot identity, or None if the collection does not exist
+        """
+        try:
+            stat = os.stat(os.path.join(path, "meta.json"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @classmethod
+    def load(cls, path: str, repair: bool = False) -> "_Collection":
+        """
+        Read a saved collection and its journal, memory-mapping the snapshot vectors copy-on-write.
+
+        Args:
+            path (str): Directory of the collection
+            repair (bool): Cut off a partially written last journal entry
+        """
+        snapshot = cls.snapshot_of(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(path, "payloads.jsonl")) as f:
+            payloads = [json.loads(line) for line in f]
+
+        collection = cls(meta["dim"])
+        collection.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="c")
+        collection.count = len(meta["ids"])
+        collection.alive = np.ones(collection.count, dtype=bool)
+        collection.ids = list(meta["ids"])
+        collection.payloads = payloads
+        collection.id_to_row = {point_id: row for row, point_id in enumerate(collection.ids)}
+        collection.snapshot = snapshot
+        collection.replay(path, repair=repair)
+        return collection
+
+    def _reserve(self, size: int):
+        """Grow the vector and liveness arrays geometrically."""
+        if size <= len(self.vectors):
+            return
+        capacity = max(size, 2 * len(self.vectors), 1024)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[:self.count] = self.vectors[:self.count]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.count] = self.alive[:self.count]
+        self.vectors = vectors
+        self.alive = alive
+
+
+class LocalVectorDB(VersionedCollectionsMixin):
+    """
+    Exact cosine search over NumPy matrices, persisted to a local directory.
+
+    Writes hold a file lock and first pick up the changes other processes
+    made to the collection, so ingestion jobs and the API server can share
+    one directory; readers see those changes after `reload`.
+    """
+
+    URL_SCHEME = "local://"
+    LOCK_FILE = "lock"
+    # Journals shorter than this never trigger a snapshot rewrite
+    COMPACT_MIN_POINTS = 1024
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a local index directory.
+
+        Args:
+            path (str): Directory holding the collections
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.url = f"{self.URL_SCHEME}{self.path}"
+        self._collections: Dict[str, _Collection] = {}
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._lock_file = None
+
+        os.makedirs(self._collections_dir(), exist_ok=True)
+        with self._lock, self._file_lock(shared=True):
+            self._load()
+
+    @classmethod
+    def from_url(cls, url: str) -> "LocalVectorDB":
+        """
+        Open a local index from a `local://<path>` URL.
+
+        Args:
+            url (str): URL with the local scheme
+
+        Returns:
+            LocalVectorDB: Local index
+        """
+        return cls(url[len(cls.URL_SCHEME):])
+
+    def close(self):
+        """Fold journaled changes into the collection snapshots, so the next open is fast."""
+        with self._lock, self._file_lock():
+            for name in list(self._collections):
+                try:
+                    _, collection = self._catch_up(name)
+                except ValueError:
+                    continue
+                if collection.journal_size:
+                    collection.save(self._collection_dir(name))
+
+    def reload(self):
+        """Re-read collections and aliases written by other processes, such as ingestion jobs."""
+        with self._lock, self._file_lock(shared=True):
+            self._collections = {}
+            self._aliases = {}
+            self._load()
+
+    def collection_exists(self, collection_name: str) -> bool:
+        """
+        Check whether a collection (or alias) exists.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            bool: True if the collection exists
+        """
+        with self._lock:
+            return self._resolve(collection_name) in self._collections
+
+    def ensure_collection(self, collection_name: str, vector_size: int = 384, storage=None):
+        """
+        Create a collection only if it does not exist yet.
+
+        Args:
+            collection_name (str): Name of the collection
+            vector_size (int): Size of the vectors to be stored
+            storage (Optional[VectorStorage]): Ignored, vectors are always exact float32
+        """
+        if not self.collection_exists(collection_name):
+            self.create_collection(collection_name, vector_size=vector_size)
+
+    def create_collection(self, collection_name: str, vector_size: int = 384, storage=None):
+        """
+        Create a new collection, replacing any existing one with the same name.
+
+        Args:
+            collection_name (str): Name of the collection
+            vector_size (int): Size of the vectors to be stored
+            storage (Optional[VectorStorage]): Ignored, vectors are always exact float32
+        """
+        self._validate_name(collection_name)
+        with self._lock, self._file_lock():
+            if _Collection.snapshot_of(self._collection_dir(collection_name)) is not None:
+                self.delete_collection(collection_name)
+            collection = _Collection(vector_size)
+            self._collections[collection_name] = collection
+            collection.save(self._collection_dir(collection_name))
+        logger.info(f"Created local collection: {collection_name}")
+
+    def list_collections(self) -> List[str]:
+        """
+        List the names of all collections.
+
+        Returns:
+            List[str]: Collection names
+        """
+        with self._lock:
+            return list(self._collections)
+
+    def delete_collection(self, collection_name: str):
+        """
+        Delete a collection.
+
+        Args:
+            collection_name (str): Name of the collection
+        """
+        with self._lock, self._file_lock():
+            self._collections.pop(collection_name, None)
+            shutil.rmtree(self._collection_dir(collection_name), ignore_errors=True)
+        logger.info(f"Deleted local collection: {collection_name}")
+
+    def upload_batch(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        payloads: List[Dict[str, Any]],
+        start_id: int = 0,
+        wait: bool = True,
+        ids: Optional[List[PointId]] = None
+    ):
+        """
+        Upload a batch of vectors and payloads.
+
+        Args:
+            collection_name (str): Name of the collection
+            vectors (List[List[float]]): List of embedding vectors
+            payloads (List[Dict[str, Any]]): List of payloads (metadata)
+            start_id (int): Starting ID for the batch, used when `ids` is None
+            wait (bool): Sync the change to disk before returning
+            ids (Optional[List[PointId]]): Explicit point IDs
+        """
+        if ids is None:
+            ids = list(range(start_id, start_id + len(vectors)))
+        record_batch("vectordb_upsert", len(ids))
+        change = _Collection.encode_upsert(ids, self._normalize(vectors), payloads)
+        with track_stage("vectordb_upsert"):
+            self._write(collection_name, change, durable=wait)
+
+    def overwrite_payload(self, collection_name: str, point_id: PointId, payload: Dict[str, Any]):
+        """
+        Replace the payload of a point without touching its vector.
+
+        Args:
+            collection_name (str): Name of the collection
+            point_id (PointId): ID of the point
+            payload (Dict[str, Any]): New payload
+        """
+        self._write(collection_name, {"op": "payload", "id": point_id, "payload": payload})
+
+    def overwrite_payloads(self, collection_name: str, ids: List[PointId], payloads: List[Dict[str, Any]]):
+        """
+        Replace the payloads of many points in one journal entry, without touching their vectors.
+
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[PointId]): IDs of the points
+            payloads (List[Dict[str, Any]]): New payload per point
+        """
+        if not ids:
+            return
+        self._write(collection_name, {"op": "payloads", "ids": list(ids), "payloads": list(payloads)})
+
+    def delete_points(self, collection_name: str, ids: List[PointId]):
+        """
+        Delete points by ID.
+
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[PointId]): IDs of the points to delete
+        """
+        if not ids:
+            return
+        self._write(collection_name, {"op": "delete", "ids": list(ids)})
+
+    def get_payload_values(self, collection_name: str, field: str, page_size: int = 1000) -> Dict[PointId, Any]:
+        """
+        Read one payload field for every point in a collection.
+
+        Args:
+            collection_name (str): Name of the collection
+            field (str): Payload field to read
+            page_size (int): Unused, kept for interface compatibility
+
+        Returns:
+            Dict[PointId, Any]: Field value keyed by point ID
+        """
+        with self._lock:
+            _, collection = self._get(collection_name)
+            return {
+                point_id: (collection.payloads[row] or {}).get(field)
+                for point_id, row in collection.id_to_row.items()
+            }
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 3,
+        search_params=None
+    ) -> List[ScoredPoint]:
+        """
+        Search for similar vectors in the collection.
+
+        Args:
+            collection_name (str): Name of the collection
+            query_vector (List[float]): Query embedding vector
+            limit (int): Maximum number of results to return
+            search_params: Ignored, search is always exact
+
+        Returns:
+            List[ScoredPoint]: Hits ordered by descending cosine similarity
+        """
+        with track_stage("vectordb_search"):
+            return self._search(collection_name, [query_vector], limit)[0]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 3,
+        search_params=None
+    ) -> List[List[ScoredPoint]]:
+        """
+        Search for similar vectors for several queries at once.
+
+        Args:
+            collection_name (str): Name of the collection
+            query_vectors (List[List[float]]): Query embedding vectors
+            limit (int): Maximum number of results to return per query
+            search_params: Ignored, search is always exact
+
+        Returns:
+            List[List[ScoredPoint]]: Search results for each query, in order
+        """
+        if len(query_vectors) == 0:
+            return []
+        record_batch("vectordb_search", len(query_vectors))
+        with track_stage("vectordb_search_batch"):
+            return self._search(collection_name, query_vectors, limit)
+
+    def resolve_alias(self, alias_name: str) -> Optional[str]:
+        """
+        Find the collection an alias points to.
+
+        Args:
+            alias_name (str): Name of the alias
+
+        Returns:
+            Optional[str]: Name of the target collection, or None if the alias does not exist
+        """
+        with self._lock:
+            return self._aliases.get(alias_name)
+
+    def switch_alias(self, alias_name: str, collection_name: str):
+        """
+        Atomically point an alias at a collection.
+
+        Args:
+            alias_name (str): Name of the alias
+            collection_name (str): Name of the target collection
+        """
+        with self._lock, self._file_lock():
+            # Start from the aliases on disk so changes made by other processes are kept
+            self._aliases = self._read_aliases()
+            current = self._aliases.get(alias_name)
+            if current is None and _Collection.snapshot_of(self._collection_dir(alias_name)) is not None:
+                self.delete_collection(alias_name)
+                logger.info(f"Dropped unversioned collection {alias_name} to replace it with an alias")
+            self._aliases[alias_name] = collection_name
+            self._save_aliases()
+        logger.info(f"Switched alias {alias_name} from {current} to {collection_name}")
+
+    def get_collection_info(self, collection_name: str) -> LocalCollectionInfo:
+        """
+        Get information about a collection.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            LocalCollectionInfo: Collection information
+        """
+        with self._lock:
+            name, collection = self._get(collection_name)
+            return LocalCollectionInfo(
+                name=name,
+                status="green",
+                vectors_count=len(collection),
+                points_count=len(collection),
+                vector_size=collection.dim
+            )
+
+    def _search(self, collection_name: str, query_vectors, limit: int) -> List[List[ScoredPoint]]:
+        """Search a collection with a batch of query vectors."""
+        with self._lock:
+            _, collection = self._get(collection_name)
+            return collection.search(self._normalize(query_vectors), limit)
+
+    def _write(self, collection_name: str, change: Dict[str, Any], durable: bool = True):
+        """
+        Journal a change to a collection, rewriting its snapshot once the journal is large.
+
+        Args:
+            collection_name (str): Name of the collection or alias
+            change (Dict[str, Any]): Journal entry
+            durable (bool): Sync the journal to disk before returning
+        """
+        with self._lock, self._file_lock():
+            name, collection = self._catch_up(collection_name)
+            path = self._collection_dir(name)
+            collection.append(path, change, durable=durable)
+            if collection.needs_compaction(self.COMPACT_MIN_POINTS):
+                collection.save(path)
+
+    def _catch_up(self, collection_name: str):
+        """
+        Bring a collection up to date with its files; called with the file lock held.
+
+        Args:
+            collection_name (str): Name of the collection or alias
+
+        Returns:
+            Tuple[str, _Collection]: Collection name and collection
+        """
+        self._aliases = self._read_aliases()
+        name = self._resolve(collection_name)
+        path = self._collection_dir(name)
+        snapshot = _Collection.snapshot_of(path)
+        if snapshot is None:
+            self._collections.pop(name, None)
+            raise ValueError(f"Collection {collection_name} not found")
+
+        collection = self._collections.get(name)
+        if collection is None or collection.snapshot != snapshot:
+            collection = _Collection.load(path, repair=True)
+            self._collections[name] = collection
+        else:
+            collection.replay(path, repair=True)
+        return name, collection
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        """
+        Hold a lock on the index across processes; called with the thread lock held.
+
+        Nested calls reuse the lock already held.
+
+        Args:
+            shared (bool): Take a read lock that other readers can share
+        """
+        if fcntl is None or self._lock_file is not None:
+            yield
+            return
+        with open(os.path.join(self.path, self.LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._lock_file = f
+            try:
+                yield
+            finally:
+                self._lock_file = None
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _resolve(self, collection_name: str) -> str:
+        """Resolve an alias to its collection name."""
+        return self._aliases.get(collection_name, collection_name)
+
+    def _get(self, collection_name: str):
+        """Look up a collection by name or alias."""
+        name = self._resolve(collection_name)
+        collection = self._collections.get(name)
+        if collection is None:
+            raise ValueError(f"Collection {collection_name} not found")
+        return name, collection
+
+    def _collections_dir(self) -> str:
+        return os.path.join(self.path, "collections")
+
+    def _collection_dir(self, collection_name: str) -> str:
+        return os.path.join(self._collections_dir(), collection_name)
+
+    def _read_aliases(self) -> Dict[str, str]:
+        """Read the alias table from disk."""
+        aliases_path = os.path.join(self.path, "aliases.json")
+        if not os.path.exists(aliases_path):
+            return {}
+        with open(aliases_path) as f:
+            return json.load(f)
+
+    def _save_aliases(self):
+        """Persist the alias table atomically; called with the file lock held."""
+        tmp_path = os.path.join(self.path, "aliases.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._aliases, f)
+        os.replace(tmp_path, os.path.join(self.path, "aliases.json"))
+
+    def _load(self):
+        """Load all saved collections and aliases; called with the file lock held."""
+        for name in sorted(os.listdir(self._collections_dir())):
+            path = self._collection_dir(name)
+            if os.path.exists(os.path.join(path, "meta.json")):
+                self._collections[name] = _Collection.load(path)
+
+        self._aliases = self._read_aliases()
+
+        logger.info(f"Opened local index {self.path} with {len(self._collections)} collections")
+
+    @staticmethod
+    def _validate_name(collection_name: str):
+        """Reject names that cannot be used as a directory name."""
+        if not re.fullmatch(r"[A-Za-z0-9._-]+", collection_name) or collection_name in (".", ".."):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        """Convert vectors to a float32 matrix of unit-length rows."""
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
@@ -0,0 +1,166 @@
+"""
+Process-wide pool of vector database clients keyed by URL.
+"""
+
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+from .local_index import LocalVectorDB
+from .qdrant_client import QdrantDB
+
+logger = logging.getLogger(__name__)
+
+
+def create_vector_db(
+    url: Optional[str] = None,
+    timeout: Optional[int] = None,
+    prefer_grpc: bool = False,
+    grpc_port: int = 6334,
+    oversampling: Optional[float] = None,
+    rescore: bool = True
+):
+    """
+    Open a vector database client for a URL.
+
+    `local://<path>` URLs open an in-process LocalVectorDB; anything else is a Qdrant server.
+
+    Args:
+        url (Optional[str]): URL of the database, the Qdrant default if None
+        timeout (Optional[int]): Request timeout in seconds (Qdrant only)
+        prefer_grpc (bool): Use the gRPC transport (Qdrant only)
+        grpc_port (int): Port of the Qdrant gRPC interface
+        oversampling (Optional[float]): Candidate oversampling for quantized collections (Qdrant only)
+        rescore (bool): Re-rank quantized candidates with the original vectors (Qdrant only)
+
+    Returns:
+        Union[QdrantDB, LocalVectorDB]: Database client
+    """
+    if url and url.startswith(LocalVectorDB.URL_SCHEME):
+        return LocalVectorDB.from_url(url)
+    options = dict(
+        timeout=timeout,
+        prefer_grpc=prefer_grpc,
+        grpc_port=grpc_port,
+        oversampling=oversampling,
+        rescore=rescore
+    )
+    return QdrantDB(url=url, **options) if url else QdrantDB(**options)
+
+
+class QdrantPool:
+    """
+    Share one QdrantDB client, and its connections, per Qdrant server.
+
+    Evicted clients are not closed right away, since handlers and cached RAG
+    chains may still hold them; their connections are closed once the last
+    reference is dropped. Pinned URLs, such as the configured default, are
+    never evicted.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[int] = None,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        max_size: int = 16,
+        oversampling: Optional[float] = None,
+        rescore: bool = True
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            timeout (Optional[int]): Request timeout in seconds for new clients
+            prefer_grpc (bool): Use the gRPC transport for new clients
+            grpc_port (int): Port of the Qdrant gRPC interface
+            max_size (int): Maximum number of pooled clients
+            oversampling (Optional[float]): Candidate oversampling for quantized collections
+            rescore (bool): Re-rank quantized candidates with the original vectors
+        """
+        self.timeout = timeout
+        self.prefer_grpc = prefer_grpc
+        self.grpc_port = grpc_port
+        self.max_size = max_size
+        self.oversampling = oversampling
+        self.rescore = rescore
+        self._clients: "OrderedDict[str, QdrantDB]" = OrderedDict()
+        self._pinned = set()
+        self._finalizers = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, pin: bool = False) -> QdrantDB:
+        """
+        Get the pooled client for a Qdrant server, creating it on first use.
+
+        Args:
+            url (str): URL of the Qdrant server
+            pin (bool): Never evict this client, e.g. for the configured default server
+
+        Returns:
+            QdrantDB: Shared database client
+        """
+        evicted = []
+        with self._lock:
+            if pin:
+                self._pinned.add(url)
+            db = self._clients.get(url)
+            if db is not None:
+                self._clients.move_to_end(url)
+                return db
+
+            db = create_vector_db(
+                url,
+                timeout=self.timeout,
+                prefer_grpc=self.prefer_grpc,
+                grpc_port=self.grpc_port,
+                oversampling=self.oversampling,
+                rescore=self.rescore
+            )
+            self._clients[url] = db
+            logger.info(f"Opened vector database client for {url} (prefer_grpc={self.prefer_grpc})")
+
+            # Close the connections once nothing references the client any more
+            if isinstance(db, QdrantDB):
+                self._finalizers[url] = weakref.finalize(db, self._close_client, db.client, url)
+
+            unpinned = [key for key in self._clients if key not in self._pinned]
+            while len(self._clients) > max(1, self.max_size) and unpinned:
+                key = unpinned.pop(0)
+                evicted.append(self._clients.pop(key))
+                self._finalizers.pop(key, None)
+
+        for old in evicted:
+            logger.info(f"Evicted vector database client for {old.url}")
+            # A local index stays usable after close, which only saves pending changes
+            if isinstance(old, LocalVectorDB):
+                self._close_client(old, old.url)
+        return db
+
+    def close_all(self):
+        """Close every pooled client, e.g. at shutdown."""
+        with self._lock:
+            clients = list(self._clients.items())
+            finalizers = dict(self._finalizers)
+            self._clients.clear()
+            self._finalizers.clear()
+
+        for url, db in clients:
+            finalizer = finalizers.get(url)
+            if finalizer is not None:
+                finalizer()
+            else:
+                self._close_client(db, url)
+
+    @staticmethod
+    def _close_client(client, url: str):
+        """Close a client, logging instead of raising on failure."""
+        try:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+            logger.info(f"Closed vector database client for {url}")
+        except Exception as e:
+            logger.error(f"Error closing vector database client for {url}: {str(e)}")
@@ -4,32 +4,103 @@ Qdrant vector database client implementation.
 
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 import logging
 
+from monitoring import track_stage, record_batch
+from .storage import VectorStorage, quantization_search_params
+from .versioning import VersionedCollectionsMixin
+
 logger = logging.getLogger(__name__)
 
 
-class QdrantDB:
+class QdrantDB(VersionedCollectionsMixin):
     """Class to interact with Qdrant vector database."""
     
-    def __init__(self, url="http://localhost:6333"):
+    def __init__(
+        self,
+        url="http://localhost:6333",
+        timeout: Optional[int] = None,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        oversampling: Optional[float] = None,
+        rescore: bool = True
+    ):
         """
         Initialize the Qdrant client.
         
         Args:
             url (str): URL of the Qdrant server
+            timeout (Optional[int]): Request timeout in seconds, client default if None
+            prefer_grpc (bool): Use the gRPC transport where the client supports it
+            grpc_port (int): Port of the Qdrant gRPC interface
+            oversampling (Optional[float]): Candidate oversampling when searching quantized collections
+            rescore (bool): Re-rank quantized candidates with the original vectors
+        """
+        self.url = url
+        self.search_params = quantization_search_params(oversampling, rescore)
+        self.client = QdrantClient(
+            url=url,
+            timeout=timeout,
+            prefer_grpc=prefer_grpc,
+            grpc_port=grpc_port
+        )
+        
+    def close(self):
+        """Close the underlying connections."""
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+        
+    def collection_exists(self, collection_name: str) -> bool:
+        """
+        Check whether a collection exists.
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            bool: True if the collection exists
+        """
+        try:
+            self.client.get_collection(collection_name)
+            return True
+        except Exception:
+            return False
+        
+    def ensure_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 384,
+        storage: Optional[VectorStorage] = None
+    ):
+        """
+        Create a collection only if it does not exist yet.
+        
+        Args:
+            collection_name (str): Name of the collection
+            vector_size (int): Size of the vectors to be stored
+            storage (Optional[VectorStorage]): Vector storage and quantization, float32 in RAM if None
         """
-        self.client = QdrantClient(url=url)
+        if not self.collection_exists(collection_name):
+            self.create_collection(collection_name, vector_size=vector_size, storage=storage)
         
-    def create_collection(self, collection_name: str, vector_size: int = 384):
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 384,
+        storage: Optional[VectorStorage] = None
+    ):
         """
         Create a new collection in Qdrant.
         
         Args:
             collection_name (str): Name of the collection
             vector_size (int): Size of the vectors to be stored
+            storage (Optional[VectorStorage]): Vector storage and quantization, float32 in RAM if None
         """
+        storage = storage or VectorStorage()
+        
         # Check if collection exists and delete if it does
         try:
             self.client.get_collection(collection_name)
@@ -41,14 +112,42 @@ class QdrantDB:
         # Create new collection
         self.client.create_collection(
             collection_name=collection_name,
-            vectors_config=models.VectorParams(
-                size=vector_size,
-                distance=models.Distance.COSINE
-            )
+            vectors_config=storage.vectors_config(vector_size),
+            quantization_config=storage.quantization_config()
+        )
+        logger.info(
+            f"Created collection: {collection_name} "
+            f"(quantization={storage.quantization}, on_disk={storage.on_disk})"
         )
-        logger.info(f"Created collection: {collection_name}")
         
-    def upload_batch(self, collection_name: str, vectors: List[List[float]], payloads: List[Dict[str, Any]], start_id: int = 0):
+    def list_collections(self) -> List[str]:
+        """
+        List the names of all collections.
+        
+        Returns:
+            List[str]: Collection names
+        """
+        return [collection.name for collection in self.client.get_collections().collections]
+        
+    def delete_collection(self, collection_name: str):
+        """
+        Delete a collection.
+        
+        Args:
+            collection_name (str): Name of the collection
+        """
+        self.client.delete_collection(collection_name)
+        logger.info(f"Deleted collection: {collection_name}")
+        
+    def upload_batch(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        payloads: List[Dict[str, Any]],
+        start_id: int = 0,
+        wait: bool = True,
+        ids: Optional[List[Union[int, str]]] = None
+    ):
         """
         Upload a batch of vectors and payloads to Qdrant.
         
@@ -56,19 +155,109 @@ class QdrantDB:
             collection_name (str): Name of the collection
             vectors (List[List[float]]): List of embedding vectors
             payloads (List[Dict[str, Any]]): List of payloads (metadata)
-            start_id (int): Starting ID for the batch
+            start_id (int): Starting ID for the batch, used when `ids` is None
+            wait (bool): Wait until the points are applied rather than just accepted
+            ids (Optional[List[Union[int, str]]]): Explicit point IDs
         """
-        ids = list(range(start_id, start_id + len(vectors)))
-        self.client.upsert(
-            collection_name=collection_name,
-            points=models.Batch(
-                ids=ids,
-                vectors=vectors,
-                payloads=payloads
+        if ids is None:
+            ids = list(range(start_id, start_id + len(vectors)))
+        record_batch("vectordb_upsert", len(ids))
+        with track_stage("vectordb_upsert"):
+            self.client.upsert(
+                collection_name=collection_name,
+                points=models.Batch(
+                    ids=ids,
+                    vectors=vectors,
+                    payloads=payloads
+                ),
+                wait=wait
             )
+        
+    def overwrite_payload(self, collection_name: str, point_id: Union[int, str], payload: Dict[str, Any]):
+        """
+        Replace the payload of a point without touching its vector.
+        
+        Args:
+            collection_name (str): Name of the collection
+            point_id (Union[int, str]): ID of the point
+            payload (Dict[str, Any]): New payload
+        """
+        self.client.overwrite_payload(
+            collection_name=collection_name,
+            payload=payload,
+            points=[point_id]
+        )
+        
+    def overwrite_payloads(self, collection_name: str, ids: List[Union[int, str]], payloads: List[Dict[str, Any]]):
+        """
+        Replace the payloads of many points in one request, without touching their vectors.
+        
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points
+            payloads (List[Dict[str, Any]]): New payload per point
+        """
+        if not ids:
+            return
+        self.client.batch_update_points(
+            collection_name=collection_name,
+            update_operations=[
+                models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(payload=payload, points=[point_id])
+                )
+                for point_id, payload in zip(ids, payloads)
+            ]
+        )
+        
+    def delete_points(self, collection_name: str, ids: List[Union[int, str]]):
+        """
+        Delete points by ID.
+        
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to delete
+        """
+        if not ids:
+            return
+        self.client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=list(ids))
         )
         
-    def search(self, collection_name: str, query_vector: List[float], limit: int = 3):
+    def get_payload_values(self, collection_name: str, field: str, page_size: int = 1000) -> Dict[Union[int, str], Any]:
+        """
+        Read one payload field for every point in a collection.
+        
+        Args:
+            collection_name (str): Name of the collection
+            field (str): Payload field to read
+            page_size (int): Number of points fetched per scroll request
+            
+        Returns:
+            Dict[Union[int, str], Any]: Field value keyed by point ID
+        """
+        values = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=[field],
+                with_vectors=False
+            )
+            for point in points:
+                values[point.id] = (point.payload or {}).get(field)
+            if offset is None:
+                return values
+        
+    def search(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 3,
+        search_params: Optional[models.SearchParams] = None
+    ):
         """
         Search for similar vectors in the collection.
         
@@ -76,15 +265,99 @@ class QdrantDB:
             collection_name (str): Name of the collection
             query_vector (List[float]): Query embedding vector
             limit (int): Maximum number of results to return
+            search_params (Optional[models.SearchParams]): Overrides the client's quantization search settings
             
         Returns:
             List: List of search results
         """
-        return self.client.search(
-            collection_name=collection_name,
-            query_vector=query_vector,
-            limit=limit
-        )
+        with track_stage("vectordb_search"):
+            return self.client.search(
+                collection_name=collection_name,
+                query_vector=query_vector,
+                limit=limit,
+                search_params=search_params or self.search_params
+            )
+        
+    def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 3,
+        search_params: Optional[models.SearchParams] = None
+    ):
+        """
+        Search for similar vectors for several queries in one request.
+        
+        Args:
+            collection_name (str): Name of the collection
+            query_vectors (List[List[float]]): Query embedding vectors
+            limit (int): Maximum number of results to return per query
+            search_params (Optional[models.SearchParams]): Overrides the client's quantization search settings
+            
+        Returns:
+            List[List]: Search results for each query, in order
+        """
+        if len(query_vectors) == 0:
+            return []
+        
+        requests = [
+            models.SearchRequest(
+                vector=[float(x) for x in vector],
+                limit=limit,
+                with_payload=True,
+                params=search_params or self.search_params
+            )
+            for vector in query_vectors
+        ]
+        record_batch("vectordb_search", len(requests))
+        with track_stage("vectordb_search_batch"):
+            return self.client.search_batch(
+                collection_name=collection_name,
+                requests=requests
+            )
+        
+    def resolve_alias(self, alias_name: str) -> Optional[str]:
+        """
+        Find the collection an alias points to.
+        
+        Args:
+            alias_name (str): Name of the alias
+            
+        Returns:
+            Optional[str]: Name of the target collection, or None if the alias does not exist
+        """
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == alias_name:
+                return alias.collection_name
+        return None
+        
+    def switch_alias(self, alias_name: str, collection_name: str):
+        """
+        Atomically point an alias at a collection.
+        
+        A physical collection that still uses the alias name from before
+        versioning was introduced is dropped first, so this one-time
+        migration has a brief gap.
+        
+        Args:
+            alias_name (str): Name of the alias
+            collection_name (str): Name of the target collection
+        """
+        current = self.resolve_alias(alias_name)
+        if current is None and self.collection_exists(alias_name):
+            self.client.delete_collection(alias_name)
+            logger.info(f"Dropped unversioned collection {alias_name} to replace it with an alias")
+        
+        operations = []
+        if current is not None:
+            operations.append(models.DeleteAliasOperation(
+                delete_alias=models.DeleteAlias(alias_name=alias_name)
+            ))
+        operations.append(models.CreateAliasOperation(
+            create_alias=models.CreateAlias(collection_name=collection_name, alias_name=alias_name)
+        ))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Switched alias {alias_name} from {current} to {collection_name}")
         
     def get_collection_info(self, collection_name: str):
         """
@@ -0,0 +1,111 @@
+"""
+Vector storage and quantization settings for Qdrant collections.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from qdrant_client.http import models
+
+# Supported vector quantization modes
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+@dataclass
+class VectorStorage:
+    """
+    How a collection stores its vectors.
+
+    Attributes:
+        quantization (str): "none" for float32, "scalar" for int8 or "binary" for 1 bit per dimension
+        on_disk (bool): Keep the original float32 vectors on disk instead of in RAM
+        always_ram (bool): Keep the quantized vectors in RAM even when the originals are on disk
+    """
+
+    quantization: str = "none"
+    on_disk: bool = False
+    always_ram: bool = True
+
+    def __post_init__(self):
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization {self.quantization}, expected one of {', '.join(QUANTIZATION_MODES)}"
+            )
+
+    def vectors_config(self, vector_size: int) -> models.VectorParams:
+        """
+        Build the vector parameters of a collection.
+
+        Args:
+            vector_size (int): Size of the vectors to be stored
+
+        Returns:
+            models.VectorParams: Vector parameters
+        """
+        return models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk
+        )
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        """
+        Build the quantization configuration of a collection.
+
+        Returns:
+            Optional[models.QuantizationConfig]: Quantization configuration, None for float32
+        """
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=self.always_ram
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.always_ram)
+            )
+        return None
+
+    def bytes_per_vector(self, vector_size: int) -> int:
+        """
+        Estimate the RAM used per vector by the search index.
+
+        Args:
+            vector_size (int): Size of the vectors
+
+        Returns:
+            int: Bytes of vector data kept in RAM per point
+        """
+        in_ram = 0 if self.on_disk else 4 * vector_size
+        if self.quantization == "scalar" and self.always_ram:
+            in_ram += vector_size
+        elif self.quantization == "binary" and self.always_ram:
+            in_ram += (vector_size + 7) // 8
+        return in_ram
+
+
+def quantization_search_params(oversampling: Optional[float] = None, rescore: bool = True) -> Optional[models.SearchParams]:
+    """
+    Build search parameters for quantized collections.
+
+    Qdrant ignores them on collections without quantization.
+
+    Args:
+        oversampling (Optional[float]): Fetch this many times `limit` candidates with the quantized
+            vectors before rescoring, the server default if None
+        rescore (bool): Re-rank the candidates with the original vectors
+
+    Returns:
+        Optional[models.SearchParams]: Search parameters, None to use the server defaults
+    """
+    if oversampling is None and rescore:
+        return None
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            rescore=rescore,
+            oversampling=oversampling
+        )
+    )
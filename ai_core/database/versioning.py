@@ -0,0 +1,135 @@
+"""
+Versioned collections behind aliases, shared by the vector database clients.
+"""
+
+import logging
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedCollectionsMixin:
+    """
+    Blue/green collection versions on top of basic collection and alias operations.
+
+    Classes using this mixin provide `create_collection`, `delete_collection`,
+    `list_collections`, `resolve_alias` and `switch_alias`. Loads into the same
+    alias are not serialized here; the job queue runs them one at a time.
+    """
+
+    # Separator between an alias name and the version suffix of its collections
+    VERSION_SEPARATOR = "__v"
+
+    def create_version(self, alias_name: str, vector_size: int = 384, storage=None) -> str:
+        """
+        Create a new, empty versioned collection behind an alias.
+
+        Args:
+            alias_name (str): Name of the alias queries resolve through
+            vector_size (int): Size of the vectors to be stored
+            storage (Optional[VectorStorage]): Vector storage and quantization of the new collection
+
+        Returns:
+            str: Name of the new collection
+        """
+        # Suffixes keep increasing even if the clock goes back or two loads start in the same millisecond
+        versions = self.list_versions(alias_name)
+        suffix = int(time.time() * 1000)
+        if versions:
+            suffix = max(suffix, self._version_number(alias_name, versions[-1]) + 1)
+        version_name = f"{alias_name}{self.VERSION_SEPARATOR}{suffix}"
+        self.create_collection(version_name, vector_size=vector_size, storage=storage)
+        return version_name
+
+    def list_versions(self, alias_name: str) -> List[str]:
+        """
+        List the versioned collections of an alias, oldest first.
+
+        Args:
+            alias_name (str): Name of the alias
+
+        Returns:
+            List[str]: Names of the versioned collections
+        """
+        prefix = f"{alias_name}{self.VERSION_SEPARATOR}"
+        versions = [
+            name
+            for name in self.list_collections()
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        ]
+        return sorted(versions, key=lambda name: int(name[len(prefix):]))
+
+    def promote_version(self, alias_name: str, version_name: str) -> bool:
+        """
+        Point an alias at a new version unless a newer one is already live.
+
+        A load that finishes after a later load must not switch the alias back
+        to older data.
+
+        Args:
+            alias_name (str): Name of the alias
+            version_name (str): Name of the version to serve
+
+        Returns:
+            bool: True if the alias now points to the version
+        """
+        current = self._version_number(alias_name, self.resolve_alias(alias_name))
+        if current is not None and current > self._version_number(alias_name, version_name):
+            logger.warning(f"Not switching {alias_name} to {version_name}: a newer version is live")
+            return False
+        self.switch_alias(alias_name, version_name)
+        return True
+
+    def rollback(self, alias_name: str) -> str:
+        """
+        Point an alias back at the version before its current one.
+
+        Args:
+            alias_name (str): Name of the alias
+
+        Returns:
+            str: Name of the collection the alias now points to
+        """
+        current = self.resolve_alias(alias_name)
+        versions = self.list_versions(alias_name)
+        if current not in versions or versions.index(current) == 0:
+            raise ValueError(f"No earlier version of {alias_name} to roll back to")
+
+        previous = versions[versions.index(current) - 1]
+        self.switch_alias(alias_name, previous)
+        return previous
+
+    def prune_versions(self, alias_name: str, keep: int = 2) -> List[str]:
+        """
+        Delete old versioned collections, keeping the newest ones and the current target.
+
+        Versions newer than the current target are never deleted, since they
+        may still be loading or be the target of a rollback.
+
+        Args:
+            alias_name (str): Name of the alias
+            keep (int): Number of most recent versions to keep
+
+        Returns:
+            List[str]: Names of the deleted collections
+        """
+        current = self._version_number(alias_name, self.resolve_alias(alias_name))
+        versions = self.list_versions(alias_name)
+        stale = versions[:-keep] if keep > 0 else versions
+
+        deleted = []
+        for version_name in stale:
+            if current is None or self._version_number(alias_name, version_name) >= current:
+                continue
+            self.delete_collection(version_name)
+            deleted.append(version_name)
+        return deleted
+
+    def _version_number(self, alias_name: str, collection_name: Optional[str]) -> Optional[int]:
+        """Get the suffix of a versioned collection of an alias, None for any other collection."""
+        prefix = f"{alias_name}{self.VERSION_SEPARATOR}"
+        if collection_name is None or not collection_name.startswith(prefix):
+            return None
+        suffix = collection_name[len(prefix):]
+        return int(suffix) if suffix.isdigit() else None
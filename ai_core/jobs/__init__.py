@@ -0,0 +1,8 @@
+"""
+Jobs subpackage for AI Core.
+"""
+
+from .store import JobStore
+from .worker import JobQueue, JobCancelled
+
+__all__ = ["JobStore", "JobQueue", "JobCancelled"]
@@ -0,0 +1,466 @@
+"""
+SQLite-backed store of ingestion jobs.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    throughput REAL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS collection_generations (
+    db_url TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    PRIMARY KEY (db_url, collection)
+);
+"""
+
+
+class JobStore:
+    """Persistent job table shared by every process that opens the same file."""
+
+    def __init__(self, path: str, stale_after: float = 60.0, max_attempts: int = 3):
+        """
+        Open (or create) the job database.
+
+        Args:
+            path (str): Path of the SQLite file
+            stale_after (float): Seconds without a heartbeat after which a running job
+                is considered lost and queued again
+            max_attempts (int): Number of times a lost job is started before it is failed
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            # WAL lets status reads proceed while a worker is writing progress
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        """
+        Open a short-lived connection, committing on success.
+
+        Args:
+            immediate (bool): Take the write lock up front, for read-modify-write transactions
+        """
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def create(self, params: Dict[str, Any]) -> str:
+        """
+        Queue a new job.
+
+        Args:
+            params (Dict[str, Any]): JSON-serializable job parameters
+
+        Returns:
+            str: Job ID
+        """
+        job_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), time.time())
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Job status and details, or None if unknown
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        List the most recent jobs.
+
+        Args:
+            status (Optional[str]): Only list jobs with this status
+            limit (int): Maximum number of jobs
+
+        Returns:
+            List[Dict[str, Any]]: Jobs, newest first
+        """
+        query = "SELECT * FROM jobs"
+        args: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            args = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(query, args + (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim(self, max_running: int) -> Optional[Dict[str, Any]]:
+        """
+        Start the oldest queued job, unless `max_running` jobs are already running.
+
+        Jobs whose collection is being loaded by a running job wait for it. The
+        check and the claim happen in one write transaction, so the cap and the
+        per-collection exclusivity hold across every process sharing the store.
+
+        Args:
+            max_running (int): Maximum number of jobs running at once
+
+        Returns:
+            Optional[Dict[str, Any]]: ID, parameters and attempt number of the claimed job, or None
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            self._recover_stale(conn, now)
+
+            running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (PROCESSING,)).fetchone()[0]
+            if running >= max_running:
+                return None
+
+            # Loads into the same collection run one at a time, so their versions go live in order
+            row = conn.execute(
+                "SELECT * FROM jobs AS queued WHERE status = ? AND NOT EXISTS ("
+                "SELECT 1 FROM jobs AS running WHERE running.status = ? "
+                "AND json_extract(running.params, '$.db_url') = json_extract(queued.params, '$.db_url') "
+                "AND json_extract(running.params, '$.collection_name') = json_extract(queued.params, '$.collection_name')"
+                ") ORDER BY created_at LIMIT 1",
+                (QUEUED, PROCESSING)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, heartbeat_at = ?, "
+                "processed = 0, total = NULL, throughput = NULL WHERE id = ?",
+                (PROCESSING, now, now, row["id"])
+            )
+        return {"task_id": row["id"], "params": json.loads(row["params"]), "attempts": row["attempts"] + 1}
+
+    def params(self, job_id: str) -> Dict[str, Any]:
+        """
+        Get the parameters a job was created with.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            Dict[str, Any]: Job parameters
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        return json.loads(row["params"])
+
+    def heartbeat(self, job_id: str):
+        """
+        Mark a running job as alive.
+
+        Args:
+            job_id (str): Job ID
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?",
+                (time.time(), job_id, PROCESSING)
+            )
+
+    def update_progress(self, job_id: str, processed: int, total: Optional[int], throughput: float) -> bool:
+        """
+        Record the progress of a running job, which also counts as a heartbeat.
+
+        Args:
+            job_id (str): Job ID
+            processed (int): Number of records processed so far
+            total (Optional[int]): Number of records in the job, None if unknown
+            throughput (float): Records processed per second
+
+        Returns:
+            bool: True if cancellation of the job was requested
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET processed = ?, total = ?, throughput = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = ?",
+                (processed, total, throughput, time.time(), job_id, PROCESSING)
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row is not None and row["cancel_requested"])
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Move a running job to a final status.
+
+        Args:
+            job_id (str): Job ID
+            status (str): "completed", "failed" or "cancelled"
+            result (Optional[Dict[str, Any]]): Result of a completed job
+            error (Optional[str]): Error message of a failed job
+
+        Returns:
+            bool: True if the job was still running
+        """
+        if status not in FINISHED_STATUSES:
+            raise ValueError(f"Not a final job status: {status}")
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, PROCESSING)
+            )
+            finished = cursor.rowcount > 0
+            if finished:
+                self._bump_job_generation(conn, job_id)
+        return finished
+
+    def requeue(self, job_id: str):
+        """
+        Put a running job back in the queue, e.g. when its server shuts down.
+
+        Args:
+            job_id (str): Job ID
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, heartbeat_at = NULL WHERE id = ? AND status = ?",
+                (QUEUED, job_id, PROCESSING)
+            )
+        logger.info(f"Job {job_id} queued again")
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job.
+
+        A queued job is cancelled at once; a running job is asked to stop and is
+        cancelled by its worker at the next batch boundary.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            Optional[Dict[str, Any]]: The job after the request, or None if unknown
+        """
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, PROCESSING)
+            )
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """
+        Check whether cancellation of a job was requested.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            bool: True if the job should stop
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row is not None and row["cancel_requested"])
+
+    def prune(self, max_age: float) -> List[Dict[str, Any]]:
+        """
+        Delete finished jobs older than `max_age`.
+
+        Args:
+            max_age (float): Age in seconds after which finished jobs are deleted
+
+        Returns:
+            List[Dict[str, Any]]: Parameters of the deleted jobs
+        """
+        cutoff = time.time() - max_age
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._connect(immediate=True) as conn:
+            rows = conn.execute(
+                f"SELECT params FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+                FINISHED_STATUSES + (cutoff,)
+            ).fetchall()
+            conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+                FINISHED_STATUSES + (cutoff,)
+            )
+        if rows:
+            logger.info(f"Pruned {len(rows)} finished jobs")
+        return [json.loads(row["params"]) for row in rows]
+
+    def bump_generation(self, db_url: str, collection: str) -> int:
+        """
+        Record that the data of a collection changed.
+
+        Every server process compares the generation with the one it last saw
+        before serving the collection, so all of them pick up the change.
+
+        Args:
+            db_url (str): URL of the vector database holding the collection
+            collection (str): Name of the collection
+
+        Returns:
+            int: New generation of the collection
+        """
+        with self._connect(immediate=True) as conn:
+            return self._bump(conn, db_url, collection)
+
+    def generation(self, db_url: str, collection: str) -> int:
+        """
+        Get the generation of a collection.
+
+        Args:
+            db_url (str): URL of the vector database holding the collection
+            collection (str): Name of the collection
+
+        Returns:
+            int: Number of recorded changes, 0 if none
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT generation FROM collection_generations WHERE db_url = ? AND collection = ?",
+                (db_url, collection)
+            ).fetchone()
+        return row["generation"] if row is not None else 0
+
+    def generations(self) -> Dict[Tuple[str, str], int]:
+        """
+        Get the generations of all collections with recorded changes.
+
+        Returns:
+            Dict[Tuple[str, str], int]: Generation per (database URL, collection)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT db_url, collection, generation FROM collection_generations").fetchall()
+        return {(row["db_url"], row["collection"]): row["generation"] for row in rows}
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, db_url: str, collection: str) -> int:
+        """Increment the generation of a collection inside a write transaction."""
+        conn.execute(
+            "INSERT INTO collection_generations (db_url, collection, generation) VALUES (?, ?, 1) "
+            "ON CONFLICT (db_url, collection) DO UPDATE SET generation = generation + 1",
+            (db_url, collection)
+        )
+        return conn.execute(
+            "SELECT generation FROM collection_generations WHERE db_url = ? AND collection = ?",
+            (db_url, collection)
+        ).fetchone()[0]
+
+    def _bump_job_generation(self, conn: sqlite3.Connection, job_id: str):
+        """
+        Bump the generation of the collection a job wrote to.
+
+        Failed and cancelled jobs count too: a sync writes in place, so it
+        may have changed the collection before it stopped.
+        """
+        row = conn.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        params = json.loads(row["params"])
+        if params.get("db_url") and params.get("collection_name"):
+            self._bump(conn, params["db_url"], params["collection_name"])
+
+    def _recover_stale(self, conn: sqlite3.Connection, now: float):
+        """Requeue running jobs whose worker stopped sending heartbeats."""
+        cutoff = now - self.stale_after
+        stale = conn.execute(
+            "SELECT id, attempts, cancel_requested FROM jobs WHERE status = ? AND heartbeat_at < ?",
+            (PROCESSING, cutoff)
+        ).fetchall()
+        for row in stale:
+            if row["cancel_requested"]:
+                status, error = CANCELLED, None
+            elif row["attempts"] >= self.max_attempts:
+                status, error = FAILED, f"Worker lost after {row['attempts']} attempts"
+            else:
+                status, error = QUEUED, None
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, now if status != QUEUED else None, row["id"])
+            )
+            if status != QUEUED:
+                self._bump_job_generation(conn, row["id"])
+            logger.warning(f"Job {row['id']} lost its worker, now {status}")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a job row to its API representation."""
+        job = {
+            "task_id": row["id"],
+            "status": row["status"],
+            "processed": row["processed"],
+            "total": row["total"],
+            "progress": round(row["processed"] / row["total"], 4) if row["total"] else 0,
+            "throughput": row["throughput"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "attempts": row["attempts"],
+        }
+        if row["status"] == PROCESSING and row["throughput"] and row["total"]:
+            job["eta_seconds"] = round(max(0, row["total"] - row["processed"]) / row["throughput"], 1)
+        if row["status"] == PROCESSING and row["cancel_requested"]:
+            job["cancel_requested"] = True
+        if row["result"]:
+            job.update(json.loads(row["result"]))
+        if row["error"]:
+            job["error"] = row["error"]
+        return job
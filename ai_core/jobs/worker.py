@@ -0,0 +1,341 @@
+"""
+Bounded pool that runs ingestion jobs in their own processes.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+from .store import JobStore, COMPLETED, FAILED, CANCELLED, FINISHED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes from a running job
+PROGRESS_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job whose cancellation was requested."""
+
+
+class JobInterrupted(Exception):
+    """Raised inside a job whose process is being stopped, so it is queued again."""
+
+
+def _interrupt(signum, frame):
+    raise JobInterrupted(f"Job process received signal {signum}")
+
+
+def _run_job(store_path: str, job_id: str, settings: Dict[str, Any]):
+    """
+    Run one ingestion job; entry point of the job process.
+
+    Args:
+        store_path (str): Path of the job database
+        job_id (str): ID of the claimed job
+        settings (Dict[str, Any]): Database options, embedding configuration and resource limits
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    # Unwind through the loader's cleanup, which drops a half-built collection version
+    signal.signal(signal.SIGTERM, _interrupt)
+    if settings.get("niceness") and hasattr(os, "nice"):
+        os.nice(settings["niceness"])
+
+    store = JobStore(store_path)
+    params = store.params(job_id)
+    file_path = params["file_path"]
+
+    try:
+        import torch
+        from database import create_vector_db, VectorStorage
+        from models import EmbeddingModel, DiskEmbeddingStore
+        from processors import load_qa_into_qdrant
+
+        torch.set_num_threads(settings["num_threads"])
+        # Embedding processes of the job split its thread budget rather than the whole machine
+        embed_threads = max(1, settings["num_threads"] // max(1, params["workers"]))
+
+        if store.update_progress(job_id, 0, None, 0.0):
+            raise JobCancelled()
+
+        last_update = [0.0]
+        processed_count = [0]
+
+        def estimate_total(processed: int) -> Optional[int]:
+            # Records are counted as they are ingested; the total is extrapolated from the bytes read
+            bytes_read = os.lseek(source.fileno(), 0, os.SEEK_CUR)
+            if processed == 0 or bytes_read == 0:
+                return None
+            return max(processed, round(processed * file_size / bytes_read))
+
+        def on_progress(processed: int, throughput: float):
+            processed_count[0] = processed
+            now = time.monotonic()
+            if now - last_update[0] < PROGRESS_INTERVAL:
+                return
+            last_update[0] = now
+            if store.update_progress(job_id, processed, estimate_total(processed), throughput):
+                raise JobCancelled()
+
+        backend = settings.get("embed_backend", "torch")
+        embedding_store = (
+            DiskEmbeddingStore(settings["embed_store_path"], EmbeddingModel.DEFAULT_MODEL_NAME, backend=backend)
+            if settings.get("embed_store_path") else None
+        )
+        model = EmbeddingModel(store=embedding_store, backend=backend)
+        db = create_vector_db(params["db_url"], **settings.get("db_options", {}))
+        source = open(file_path, "r", encoding="utf-8")
+        file_size = os.fstat(source.fileno()).st_size
+        try:
+            start = time.monotonic()
+            count, info = load_qa_into_qdrant(
+                json_file_path=source,
+                db=db,
+                model=model,
+                collection_name=params["collection_name"],
+                show_progress=False,
+                sync=params["sync"],
+                embed_workers=params["workers"],
+                embed_threads=embed_threads,
+                storage=VectorStorage(**params["storage"]),
+                progress_callback=on_progress
+            )
+        finally:
+            source.close()
+            db.close()
+
+        total = processed_count[0]
+        store.update_progress(job_id, total, total, total / max(time.monotonic() - start, 1e-9))
+        store.finish(job_id, COMPLETED, result={
+            "vectors_count": count,
+            "collection_info": {
+                "name": params["collection_name"],
+                "vectors_count": getattr(info, "points_count", None) or getattr(info, "vectors_count", None)
+            }
+        })
+        logger.info(f"Job {job_id} completed: {count} QA pairs loaded into {params['collection_name']}")
+    except JobCancelled:
+        store.finish(job_id, CANCELLED)
+        logger.info(f"Job {job_id} cancelled")
+    except JobInterrupted:
+        logger.info(f"Job {job_id} interrupted, leaving it to be queued again")
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {str(e)}")
+        store.finish(job_id, FAILED, error=str(e))
+
+
+class JobQueue:
+    """
+    Run queued ingestion jobs in separate processes, a bounded number at a time.
+
+    Each job gets its own process with a reduced thread count and CPU priority,
+    so bulk embedding cannot starve the threads serving queries. Claims go
+    through the shared job store, which enforces `max_concurrent` across every
+    server process using it.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_concurrent: int = 1,
+        poll_interval: float = 1.0,
+        cancel_grace: float = 30.0,
+        retention: float = 7 * 24 * 3600,
+        db_options: Optional[Dict[str, Any]] = None,
+        embed_store_path: Optional[str] = None,
+        embed_backend: str = "torch",
+        num_threads: Optional[int] = None,
+        niceness: int = 10,
+        on_finished: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            store (JobStore): Persistent job store
+            max_concurrent (int): Maximum number of jobs running at once
+            poll_interval (float): Seconds between checks for new jobs, cancellation and exit
+            cancel_grace (float): Seconds a cancelled job may take to stop before it is terminated
+            retention (float): Seconds finished jobs are kept before they are pruned
+            db_options (Optional[Dict[str, Any]]): Keyword arguments for `create_vector_db` in the job process
+            embed_store_path (Optional[str]): Directory of the persistent embedding store
+            embed_backend (str): Embedding inference backend
+            num_threads (Optional[int]): Torch threads per job, shared by its embedding
+                processes; half the cores shared between the concurrent jobs if None
+            niceness (int): CPU priority decrement of job processes
+            on_finished (Optional[Callable]): Called in this process with the finished job
+                and its parameters
+        """
+        self.store = store
+        self.max_concurrent = max(1, max_concurrent)
+        self.poll_interval = poll_interval
+        self.cancel_grace = cancel_grace
+        self.retention = retention
+        self.on_finished = on_finished
+        self.settings = {
+            "db_options": db_options or {},
+            "embed_store_path": embed_store_path,
+            "embed_backend": embed_backend,
+            "num_threads": num_threads or max(1, (os.cpu_count() or 1) // 2 // self.max_concurrent),
+            "niceness": niceness
+        }
+
+        # Spawn avoids inheriting the server's torch thread pools and event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads that claim and supervise jobs."""
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"ingest-worker-{i}", daemon=True)
+            for i in range(self.max_concurrent)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            f"Started ingestion queue with {self.max_concurrent} workers "
+            f"({self.settings['num_threads']} threads per job)"
+        )
+
+    def stop(self):
+        """
+        Stop the worker threads.
+
+        Running jobs are interrupted and queued again, to resume on the next start.
+        """
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, params: Dict[str, Any]) -> str:
+        """
+        Queue a job.
+
+        Args:
+            params (Dict[str, Any]): File path, collection, database URL and load options
+
+        Returns:
+            str: Job ID
+        """
+        job_id = self.store.create(params)
+        logger.info(f"Queued job {job_id} for {params['collection_name']}")
+        return job_id
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            Optional[Dict[str, Any]]: The job after the request, or None if unknown
+        """
+        job = self.store.cancel(job_id)
+        if job is not None and job["status"] == CANCELLED:
+            self._remove_file(self.store.params(job_id))
+        return job
+
+    def _work(self):
+        """Claim and run jobs until stopped."""
+        while not self._stopping.is_set():
+            try:
+                job = self.store.claim(self.max_concurrent)
+            except Exception as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._prune()
+                self._stopping.wait(self.poll_interval)
+                continue
+
+            try:
+                self._supervise(job)
+            except Exception as e:
+                logger.error(f"Error supervising job {job['task_id']}: {str(e)}")
+
+    def _supervise(self, job: Dict[str, Any]):
+        """Run a claimed job in its own process and record how it ended."""
+        job_id = job["task_id"]
+        process = self._context.Process(
+            target=_run_job,
+            args=(self.store.path, job_id, self.settings),
+            name=f"ingest-{job_id[:8]}"
+        )
+        process.start()
+        logger.info(f"Started job {job_id} (attempt {job['attempts']}) in process {process.pid}")
+
+        cancel_deadline = None
+        while process.is_alive():
+            process.join(self.poll_interval)
+            if not process.is_alive():
+                break
+            if self._stopping.is_set():
+                self._terminate(process)
+                self.store.requeue(job_id)
+                return
+
+            # The heartbeat comes from here so a long batch in the job never looks like a lost worker
+            self.store.heartbeat(job_id)
+            if cancel_deadline is None and self.store.is_cancel_requested(job_id):
+                cancel_deadline = time.monotonic() + self.cancel_grace
+            elif cancel_deadline is not None and time.monotonic() > cancel_deadline:
+                logger.warning(f"Job {job_id} did not stop within {self.cancel_grace}s, terminating it")
+                self._terminate(process)
+
+        # Record an outcome if the process died before it could
+        if cancel_deadline is not None:
+            self.store.finish(job_id, CANCELLED)
+        elif self.store.finish(job_id, FAILED, error=f"Job process exited with code {process.exitcode}"):
+            logger.error(f"Job {job_id} process exited with code {process.exitcode}")
+
+        finished = self.store.get(job_id)
+        if finished is None or finished["status"] not in FINISHED_STATUSES:
+            return
+        self._remove_file(job["params"])
+        if self.on_finished is not None:
+            try:
+                self.on_finished(finished, job["params"])
+            except Exception as e:
+                logger.error(f"Error in job completion handler for {job_id}: {str(e)}")
+
+    def _terminate(self, process):
+        """Stop a job process, killing it if it ignores the request."""
+        process.terminate()
+        process.join(self.cancel_grace)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _prune(self):
+        """Delete expired finished jobs, at most once per hour."""
+        with self._prune_lock:
+            if time.monotonic() < self._next_prune:
+                return
+            self._next_prune = time.monotonic() + 3600
+
+        try:
+            for params in self.store.prune(self.retention):
+                self._remove_file(params)
+        except Exception as e:
+            logger.error(f"Error pruning jobs: {str(e)}")
+
+    @staticmethod
+    def _remove_file(params: Dict[str, Any]):
+        """Delete the uploaded file of a job that owns it."""
+        file_path = params.get("file_path")
+        if params.get("delete_file") and file_path and os.path.exists(file_path):
+            os.unlink(file_path)
@@ -2,16 +2,34 @@
 LLM client implementation using Hugging Face.
 """
 
-from huggingface_hub import InferenceClient
+from huggingface_hub import InferenceClient, AsyncInferenceClient
+import asyncio
 import logging
-from typing import List, Dict, Any, Union
+import time
+import weakref
+from typing import List, Dict, Any, Union, AsyncIterator, Iterator
+
+from monitoring import track_stage, observe_stage, record_tokens
 
 logger = logging.getLogger(__name__)
 
+
+def _close_async_client(async_client: AsyncInferenceClient, loop: asyncio.AbstractEventLoop):
+    """Close the HTTP session of an async client on the event loop it was opened on."""
+    if not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(async_client.close(), loop)
+
+
 class LLMClient:
     """Client for interacting with LLM services."""
     
-    def __init__(self, provider="novita", api_key=None, model_name="meta-llama/Llama-3.2-3B-Instruct"):
+    # Answer returned when the LLM call fails
+    ERROR_MESSAGE = "Sorry, I'm having trouble processing your request."
+    
+    # Rough characters per token, for prompts whose size the provider does not report
+    CHARS_PER_TOKEN = 4
+    
+    def __init__(self, provider="novita", api_key=None, model_name="meta-llama/Llama-3.2-3B-Instruct", base_url=None):
         """
         Initialize the LLM client.
         
@@ -19,14 +37,43 @@ class LLMClient:
             provider (str): Provider name for the Hugging Face Inference API
             api_key (str): API key for authentication
             model_name (str): Name of the model to use
+            base_url (str): URL of an OpenAI-compatible server to use instead of the provider
         """
+        # A self-hosted endpoint replaces the provider routing
+        connection = {"base_url": base_url} if base_url else {"provider": provider}
         self.client = InferenceClient(
-            provider=provider,
             api_key=api_key,
+            **connection
+        )
+        self.async_client = AsyncInferenceClient(
+            api_key=api_key,
+            **connection
         )
         self.model_name = model_name
+        # Closes the async client's session once this client is unreferenced
+        self._finalizer = None
         logger.info(f"Initialized LLM client with model: {model_name}")
     
+    async def aclose(self):
+        """Close the HTTP session held by the async client."""
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        await self.async_client.close()
+    
+    def _track_session(self):
+        """
+        Arrange for the async client's session to be closed when this client is dropped.
+        
+        The async client keeps one HTTP session for all calls, opened on the
+        running event loop by the first call, so the loop is recorded here.
+        """
+        if self._finalizer is None:
+            self._finalizer = weakref.finalize(
+                self, _close_async_client, self.async_client, asyncio.get_running_loop()
+            )
+            self._finalizer.atexit = False
+    
     def generate_answer(self, prompt_messages):
         """
         Generate answer using Hugging Face LLM.
@@ -40,15 +87,169 @@ class LLMClient:
         messages = self._format_messages(prompt_messages)
         
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-            )
+            with track_stage("llm"):
+                completion = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                )
             
+            self._record_usage(completion)
             return completion.choices[0].message.content
         except Exception as e:
             logger.error(f"Error generating answer: {str(e)}")
-            return "Sorry, I'm having trouble processing your request."
+            return self.ERROR_MESSAGE
+    
+    async def agenerate_answer(self, prompt_messages, raise_on_error: bool = False):
+        """
+        Generate answer using Hugging Face LLM without blocking the event loop.
+        
+        Args:
+            prompt_messages: Messages in various formats
+            raise_on_error (bool): Re-raise LLM errors instead of returning a fallback answer
+            
+        Returns:
+            str: Generated answer
+        """
+        messages = self._format_messages(prompt_messages)
+        self._track_session()
+        
+        try:
+            with track_stage("llm"):
+                completion = await self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                )
+            
+            self._record_usage(completion)
+            return completion.choices[0].message.content
+        except Exception as e:
+            logger.error(f"Error generating answer: {str(e)}")
+            if raise_on_error:
+                raise
+            return self.ERROR_MESSAGE
+    
+    def stream_answer(self, prompt_messages) -> Iterator[str]:
+        """
+        Stream answer tokens from the Hugging Face LLM as they are generated.
+        
+        Args:
+            prompt_messages: Messages in various formats
+            
+        Yields:
+            str: Generated text fragments
+        """
+        messages = self._format_messages(prompt_messages)
+        
+        start = time.perf_counter()
+        chunks = 0
+        usage = None
+        try:
+            with track_stage("llm_stream"):
+                stream = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                
+                for chunk in stream:
+                    usage = getattr(chunk, "usage", None) or usage
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        if chunks == 0:
+                            observe_stage("llm_first_token", time.perf_counter() - start)
+                        chunks += 1
+                        yield content
+            
+            self._record_stream_usage(usage, messages, chunks)
+        except Exception as e:
+            logger.error(f"Error streaming answer: {str(e)}")
+            yield self.ERROR_MESSAGE
+    
+    async def astream_answer(self, prompt_messages, raise_on_error: bool = False) -> AsyncIterator[str]:
+        """
+        Stream answer tokens from the Hugging Face LLM without blocking the event loop.
+        
+        Args:
+            prompt_messages: Messages in various formats
+            raise_on_error (bool): Re-raise LLM errors, possibly after some fragments,
+                instead of ending the stream with a fallback answer
+            
+        Yields:
+            str: Generated text fragments
+        """
+        messages = self._format_messages(prompt_messages)
+        self._track_session()
+        
+        start = time.perf_counter()
+        chunks = 0
+        usage = None
+        try:
+            with track_stage("llm_stream"):
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                
+                async for chunk in stream:
+                    usage = getattr(chunk, "usage", None) or usage
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        if chunks == 0:
+                            observe_stage("llm_first_token", time.perf_counter() - start)
+                        chunks += 1
+                        yield content
+            
+            self._record_stream_usage(usage, messages, chunks)
+        except Exception as e:
+            logger.error(f"Error streaming answer: {str(e)}")
+            if raise_on_error:
+                raise
+            yield self.ERROR_MESSAGE
+    
+    def _record_usage(self, completion):
+        """
+        Count the prompt and completion tokens reported by the provider.
+        
+        Args:
+            completion: Chat completion output
+        """
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            record_tokens(
+                self.model_name,
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) or 0
+            )
+    
+    def _record_stream_usage(self, usage, messages: List[Dict[str, str]], chunks: int):
+        """
+        Count the prompt and completion tokens of a streamed answer.
+        
+        Providers that honour `include_usage` report exact counts in the last
+        chunk. Otherwise the prompt is estimated from its length and each
+        fragment counts as one token.
+        
+        Args:
+            usage: Usage report of the stream, or None
+            messages (List[Dict[str, str]]): Messages the answer was generated from
+            chunks (int): Number of text fragments received
+        """
+        if usage is not None:
+            record_tokens(
+                self.model_name,
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) or chunks
+            )
+            return
+        prompt_chars = sum(len(str(message.get("content") or "")) for message in messages)
+        record_tokens(
+            self.model_name,
+            prompt_tokens=prompt_chars // self.CHARS_PER_TOKEN,
+            completion_tokens=chunks
+        )
     
     def _format_messages(self, prompt_messages) -> List[Dict[str, str]]:
         """
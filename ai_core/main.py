@@ -3,15 +3,22 @@ Command-line entry point for the AI Core package.
 """
 
 import argparse
+import json
 import logging
 import uvicorn
 import sys
 import os
 from typing import Optional
 
-from ai_core.database import QdrantDB
-from ai_core.models import EmbeddingModel
-from ai_core.processors import load_qa_into_qdrant
+# The packages import each other as top-level modules (as the API server does),
+# so the package directory is the one import root, also for the console script
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+if PACKAGE_DIR not in sys.path:
+    sys.path.insert(0, PACKAGE_DIR)
+
+from database import create_vector_db, VectorStorage, QUANTIZATION_MODES
+from models import EmbeddingModel, DiskEmbeddingStore
+from processors import load_qa_into_qdrant
 
 # Configure logging
 logging.basicConfig(
@@ -32,41 +39,55 @@ def start_api(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
     """
     logger.info(f"Starting API server on {host}:{port}")
     uvicorn.run(
-        "ai_core.api.app:app",
+        "api.app:app",
         host=host,
         port=port,
-        reload=reload
+        reload=reload,
+        app_dir=PACKAGE_DIR
     )
 
 
 def load_data(
     file_path: str,
     collection_name: str = "qa_collection",
-    db_url: Optional[str] = None
+    db_url: Optional[str] = None,
+    sync: bool = False,
+    embedding_store: Optional[str] = None,
+    backend: str = "torch",
+    workers: int = 1,
+    quantization: str = "none",
+    on_disk: bool = False
 ):
     """
-    Load data from a JSON file into Qdrant.
+    Load data from a JSON or JSON Lines file into Qdrant.
     
     Args:
-        file_path (str): Path to the JSON file
+        file_path (str): Path to the JSON or JSON Lines file
         collection_name (str): Name of the collection
         db_url (Optional[str]): URL of the Qdrant server
+        sync (bool): Update the existing collection incrementally instead of recreating it
+        embedding_store (Optional[str]): Directory of the persistent embedding store
+        backend (str): Embedding inference backend
+        workers (int): Number of embedding processes
+        quantization (str): Vector quantization of new collections: none, scalar or binary
+        on_disk (bool): Keep the original vectors of new collections on disk
     """
     # Check if file exists
     if not os.path.isfile(file_path):
         logger.error(f"File not found: {file_path}")
         sys.exit(1)
         
-    # Check if file is a JSON file
-    if not file_path.endswith('.json'):
-        logger.error(f"File is not a JSON file: {file_path}")
+    # Check if file is a JSON or JSON Lines file
+    if not file_path.endswith(('.json', '.jsonl')):
+        logger.error(f"File is not a JSON or JSON Lines file: {file_path}")
         sys.exit(1)
         
     # Initialize database client
-    db = QdrantDB(url=db_url) if db_url else QdrantDB()
+    db = create_vector_db(db_url)
     
-    # Initialize embedding model
-    model = EmbeddingModel()
+    # Initialize embedding model, reusing stored embeddings if configured
+    store = DiskEmbeddingStore(embedding_store, EmbeddingModel.DEFAULT_MODEL_NAME, backend=backend) if embedding_store else None
+    model = EmbeddingModel(store=store, backend=backend)
     
     # Load data into Qdrant
     try:
@@ -74,7 +95,10 @@ def load_data(
             json_file_path=file_path,
             db=db,
             model=model,
-            collection_name=collection_name
+            collection_name=collection_name,
+            sync=sync,
+            embed_workers=workers,
+            storage=VectorStorage(quantization=quantization, on_disk=on_disk)
         )
         
         logger.info(f"Successfully loaded {count} QA pairs into collection {collection_name}")
@@ -85,6 +109,110 @@ def load_data(
         sys.exit(1)
 
 
+def rollback_collection(collection_name: str = "qa_collection", db_url: Optional[str] = None):
+    """
+    Point a collection alias back at its previous version.
+    
+    Args:
+        collection_name (str): Name of the collection alias
+        db_url (Optional[str]): URL of the Qdrant server
+    """
+    db = create_vector_db(db_url)
+    
+    try:
+        active = db.rollback(collection_name)
+        logger.info(f"Collection {collection_name} now points to {active}")
+    except Exception as e:
+        logger.error(f"Error rolling back collection: {str(e)}")
+        sys.exit(1)
+
+
+def quantization_report(
+    file_path: str,
+    db_url: Optional[str] = None,
+    num_queries: int = 200,
+    limit: int = 10,
+    output_path: Optional[str] = None,
+    embedding_store: Optional[str] = None,
+    backend: str = "torch"
+):
+    """
+    Compare recall and latency of the quantization settings on a dataset.
+    
+    Args:
+        file_path (str): Path to the JSON or JSON Lines file
+        db_url (Optional[str]): URL of the Qdrant server
+        num_queries (int): Number of sampled questions used as queries
+        limit (int): Number of neighbours compared per query
+        output_path (Optional[str]): JSON file the report is written to
+        embedding_store (Optional[str]): Directory of the persistent embedding store
+        backend (str): Embedding inference backend
+    """
+    from benchmarks import quantization_report as run_report
+    
+    db = create_vector_db(db_url)
+    store = DiskEmbeddingStore(embedding_store, EmbeddingModel.DEFAULT_MODEL_NAME, backend=backend) if embedding_store else None
+    model = EmbeddingModel(store=store, backend=backend)
+    
+    try:
+        report = run_report(
+            file_path, db, model,
+            num_queries=num_queries,
+            limit=limit,
+            output_path=output_path
+        )
+    except Exception as e:
+        logger.error(f"Error building quantization report: {str(e)}")
+        sys.exit(1)
+    
+    if not output_path:
+        print(json.dumps(report, indent=2))
+
+
+def load_test(
+    file_path: str,
+    output_path: str = "load_test_results.json",
+    scenarios: Optional[list] = None,
+    concurrency: Optional[list] = None,
+    requests: int = 200,
+    load_requests: int = 2,
+    llm_latency_ms: float = 300.0,
+    llm_tokens_per_second: float = 50.0,
+    server_env: Optional[list] = None
+):
+    """
+    Measure API throughput and latency under concurrent load with local stand-ins.
+    
+    Args:
+        file_path (str): Path to the JSON or JSON Lines dataset
+        output_path (str): JSON file the results are written to
+        scenarios (Optional[list]): Scenarios to run, all if None
+        concurrency (Optional[list]): Numbers of concurrent clients
+        requests (int): Requests per query scenario and concurrency level
+        load_requests (int): Uploads per concurrency level of the load scenario
+        llm_latency_ms (float): Fake LLM delay before the first token
+        llm_tokens_per_second (float): Fake LLM generation speed
+        server_env (Optional[list]): KEY=VALUE environment overrides for the API server
+    """
+    from benchmarks import run_load_test, SCENARIOS
+    
+    try:
+        run_load_test(
+            file_path,
+            output_path=output_path,
+            scenarios=tuple(scenarios or SCENARIOS),
+            concurrency_levels=tuple(concurrency or (1, 8, 32)),
+            requests_per_level=requests,
+            load_requests_per_level=load_requests,
+            llm_latency_ms=llm_latency_ms,
+            llm_tokens_per_second=llm_tokens_per_second,
+            server_env=dict(item.split("=", 1) for item in server_env or [])
+        )
+    except Exception as e:
+        logger.error(f"Error running load test: {str(e)}")
+        sys.exit(1)
+
+
 def main():
     """Main entry point for the AI Core package."""
     parser = argparse.ArgumentParser(description="AI Core CLI")
@@ -99,10 +227,43 @@ def main():
     api_parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     
     # Load command
-    load_parser = subparsers.add_parser("load", help="Load data from a JSON file into Qdrant")
-    load_parser.add_argument("file", type=str, help="Path to the JSON file")
+    load_parser = subparsers.add_parser("load", help="Load data from a JSON or JSON Lines file into Qdrant")
+    load_parser.add_argument("file", type=str, help="Path to the JSON or JSON Lines file")
     load_parser.add_argument("--collection", type=str, default="qa_collection", help="Name of the collection")
     load_parser.add_argument("--db-url", type=str, help="URL of the Qdrant server")
+    load_parser.add_argument("--embedding-store", type=str, default=os.environ.get("EMBED_STORE_PATH"), help="Directory of the persistent embedding store")
+    load_parser.add_argument("--backend", type=str, choices=EmbeddingModel.BACKENDS, default=os.environ.get("EMBED_BACKEND", "torch"), help="Embedding inference backend")
+    load_parser.add_argument("--workers", type=int, default=1, help="Number of embedding processes")
+    load_parser.add_argument("--sync", action="store_true", help="Only apply changes to an existing collection instead of recreating it")
+    load_parser.add_argument("--quantization", type=str, choices=QUANTIZATION_MODES, default="none", help="Vector quantization of new collections")
+    load_parser.add_argument("--on-disk", action="store_true", help="Keep the original vectors of new collections on disk")
+    
+    # Rollback command
+    rollback_parser = subparsers.add_parser("rollback", help="Point a collection back at its previous version")
+    rollback_parser.add_argument("--collection", type=str, default="qa_collection", help="Name of the collection")
+    rollback_parser.add_argument("--db-url", type=str, help="URL of the Qdrant server")
+    
+    # Quantization report command
+    report_parser = subparsers.add_parser("quantization-report", help="Compare recall and latency of vector quantization settings")
+    report_parser.add_argument("file", type=str, help="Path to the JSON or JSON Lines file")
+    report_parser.add_argument("--db-url", type=str, help="URL of the Qdrant server")
+    report_parser.add_argument("--queries", type=int, default=200, help="Number of sampled questions used as queries")
+    report_parser.add_argument("--limit", type=int, default=10, help="Number of neighbours compared per query")
+    report_parser.add_argument("--output", type=str, help="JSON file the report is written to")
+    report_parser.add_argument("--embedding-store", type=str, default=os.environ.get("EMBED_STORE_PATH"), help="Directory of the persistent embedding store")
+    report_parser.add_argument("--backend", type=str, choices=EmbeddingModel.BACKENDS, default=os.environ.get("EMBED_BACKEND", "torch"), help="Embedding inference backend")
+    
+    # Load test command
+    load_test_parser = subparsers.add_parser("load-test", help="Measure API throughput and latency with local stand-ins for Qdrant and the LLM")
+    load_test_parser.add_argument("file", type=str, help="Path to the JSON or JSON Lines dataset")
+    load_test_parser.add_argument("--output", type=str, default="load_test_results.json", help="JSON file the results are written to")
+    load_test_parser.add_argument("--scenarios", type=str, nargs="+", choices=("rag_answer", "search", "load"), help="Scenarios to run (default: all)")
+    load_test_parser.add_argument("--concurrency", type=int, nargs="+", help="Numbers of concurrent clients (default: 1 8 32)")
+    load_test_parser.add_argument("--requests", type=int, default=200, help="Requests per query scenario and concurrency level")
+    load_test_parser.add_argument("--load-requests", type=int, default=2, help="Uploads per concurrency level of the load scenario")
+    load_test_parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Fake LLM delay before the first token")
+    load_test_parser.add_argument("--llm-tokens-per-second", type=float, default=50.0, help="Fake LLM generation speed")
+    load_test_parser.add_argument("--server-env", type=str, nargs="*", help="KEY=VALUE environment overrides for the API server")
     
     # Parse arguments
     args = parser.parse_args()
@@ -111,7 +272,13 @@ def main():
     if args.command == "api":
         start_api(host=args.host, port=args.port, reload=args.reload)
     elif args.command == "load":
-        load_data(file_path=args.file, collection_name=args.collection, db_url=args.db_url)
+        load_data(file_path=args.file, collection_name=args.collection, db_url=args.db_url, sync=args.sync, embedding_store=args.embedding_store, backend=args.backend, workers=args.workers, quantization=args.quantization, on_disk=args.on_disk)
+    elif args.command == "rollback":
+        rollback_collection(collection_name=args.collection, db_url=args.db_url)
+    elif args.command == "load-test":
+        load_test(file_path=args.file, output_path=args.output, scenarios=args.scenarios, concurrency=args.concurrency, requests=args.requests, load_requests=args.load_requests, llm_latency_ms=args.llm_latency_ms, llm_tokens_per_second=args.llm_tokens_per_second, server_env=args.server_env)
+    elif args.command == "quantization-report":
+        quantization_report(file_path=args.file, db_url=args.db_url, num_queries=args.queries, limit=args.limit, output_path=args.output, embedding_store=args.embedding_store, backend=args.backend)
     else:
         parser.print_help()
 
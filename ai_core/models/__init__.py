@@ -3,5 +3,8 @@ Models subpackage for AI Core.
 """
 
 from .embedding import EmbeddingModel
+from .batcher import EmbeddingBatcher
+from .cache import EmbeddingCache
+from .store import DiskEmbeddingStore
 
-__all__ = ["EmbeddingModel"]
\ No newline at end of file
+__all__ = ["EmbeddingModel", "EmbeddingBatcher", "EmbeddingCache", "DiskEmbeddingStore"]
@@ -0,0 +1,156 @@
+"""
+Alternative CPU inference backends for the embedding model.
+"""
+
+import logging
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+try:
+    import fcntl
+except ImportError:
+    # Without advisory locks concurrent first exports each do the work, but never clash
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def mean_pool(last_hidden_state: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Mean-pool token embeddings over the attention mask.
+
+    Args:
+        last_hidden_state (numpy.ndarray): Token embeddings of shape (batch, seq, dim)
+        attention_mask (numpy.ndarray): Mask of shape (batch, seq)
+
+    Returns:
+        numpy.ndarray: Float32 sentence embeddings of shape (batch, dim)
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (last_hidden_state * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    return (summed / counts).astype(np.float32, copy=False)
+
+
+def quantize_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Dynamically quantize the linear layers of a model to int8.
+
+    Args:
+        model (torch.nn.Module): Float32 model on the CPU
+
+    Returns:
+        torch.nn.Module: Quantized model
+    """
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class _ExportWrapper(torch.nn.Module):
+    """Expose a Hugging Face model with positional inputs and a single output for export."""
+
+    def __init__(self, model: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs))).last_hidden_state
+
+
+class OnnxEncoder:
+    """Run a transformer encoder exported to ONNX with ONNX Runtime."""
+
+    def __init__(self, model: torch.nn.Module, tokenizer, model_name: str, cache_dir: str):
+        """
+        Load the ONNX export of a model, exporting it on first use.
+
+        Args:
+            model (torch.nn.Module): Float32 model to export if no cached export exists
+            tokenizer: Tokenizer of the model
+            model_name (str): Hugging Face model name, used for the cache path
+            cache_dir (str): Directory where exported models are cached
+        """
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError(
+                "The onnx embedding backend requires onnxruntime. "
+                "Install it with: pip install ai_core[onnx]"
+            ) from e
+
+        self.path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9._-]", "_", model_name), "model.onnx")
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Processes starting together export once; the others wait and load the result
+            with self._export_lock():
+                if not os.path.exists(self.path):
+                    self._export(model, tokenizer)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self.path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        logger.info(f"Loaded ONNX embedding model from {self.path}")
+
+    @contextmanager
+    def _export_lock(self):
+        """Hold an exclusive lock on the export across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _export(self, model: torch.nn.Module, tokenizer):
+        """Export the model to ONNX with dynamic batch and sequence axes."""
+        sample = tokenizer(["ONNX export sample"], return_tensors="pt")
+        input_names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        # Write to a unique temporary file so an interrupted export is never picked up
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".onnx.tmp")
+        os.close(fd)
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    _ExportWrapper(model.cpu().eval(), input_names),
+                    tuple(sample[name] for name in input_names),
+                    tmp_path,
+                    input_names=input_names,
+                    output_names=["last_hidden_state"],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=14
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Exported embedding model to {self.path}")
+
+    def __call__(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Embed tokenized inputs.
+
+        Args:
+            inputs (Dict[str, numpy.ndarray]): Tokenizer output as NumPy arrays
+
+        Returns:
+            numpy.ndarray: Mean-pooled float32 embeddings
+        """
+        feed = {name: inputs[name].astype(np.int64) for name in self.input_names}
+        last_hidden_state = self.session.run(["last_hidden_state"], feed)[0]
+        return mean_pool(last_hidden_state, inputs["attention_mask"])
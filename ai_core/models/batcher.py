@@ -0,0 +1,203 @@
+"""
+Dynamic micro-batching of embedding requests.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from monitoring import record_batch
+from .embedding import EmbeddingModel
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Collect concurrent embedding requests and run them as one batch."""
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize the embedding batcher.
+
+        Args:
+            model (EmbeddingModel): Embedding model shared by all callers
+            max_batch_size (int): Maximum number of texts per forward pass
+            max_wait_ms (float): Maximum time to wait for a batch to fill up
+        """
+        self.model = model
+        self.model_name = getattr(model, "model_name", None)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        # A single worker thread keeps forward passes serialized
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-batcher")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a single text, batched together with concurrent callers.
+
+        Args:
+            text (str): The text to embed
+
+        Returns:
+            numpy.ndarray: The embedding vector
+        """
+        cache = getattr(self.model, "cache", None)
+        if cache is not None:
+            cached = cache.get(self.model_name, text)
+            if cached is not None:
+                return cached
+
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def get_embedding(self, text: str) -> np.ndarray:
+        """
+        Blocking variant of `embed` for code running in worker threads.
+
+        Falls back to the wrapped model when the batcher has not been started
+        or when called from the event loop thread itself.
+
+        Args:
+            text (str): The text to embed
+
+        Returns:
+            numpy.ndarray: The embedding vector
+        """
+        if self._loop is None or self._loop.is_closed() or self._in_loop_thread():
+            return self.model.get_embedding(text)
+        return asyncio.run_coroutine_threadsafe(self.embed(text), self._loop).result()
+
+    def get_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Embed a list of texts directly with the wrapped model.
+
+        Args:
+            texts (List[str]): The texts to embed
+            batch_size (int): Number of texts per forward pass
+
+        Returns:
+            numpy.ndarray: Float32 matrix of shape (len(texts), dim)
+        """
+        return self.model.get_embeddings(texts, batch_size=batch_size)
+
+    async def embed_many(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Embed a list of texts in one batched pass on the worker thread.
+
+        Args:
+            texts (List[str]): The texts to embed
+            batch_size (int): Number of texts per forward pass
+
+        Returns:
+            numpy.ndarray: Float32 matrix of shape (len(texts), dim)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.model.get_embeddings, texts, batch_size
+        )
+
+    async def stop(self):
+        """Stop the background worker and fail any pending requests."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Embedding batcher stopped"))
+
+        self._loop = None
+        self._queue = None
+
+    def _ensure_started(self):
+        """Start the background worker on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+        logger.info(
+            f"Started embedding batcher (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    def _in_loop_thread(self) -> bool:
+        """Check whether the caller is running on the batcher's event loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def _collect_batch(self) -> list:
+        """
+        Wait for the first request, then gather more until the batch is full
+        or the wait window closes.
+
+        Returns:
+            list: List of (text, future) tuples
+        """
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Background loop that embeds collected batches in the worker thread."""
+        while True:
+            batch = await self._collect_batch()
+
+            # Skip requests whose callers have already gone away
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            record_batch("embed_coalesce", len(texts))
+            try:
+                vectors = await self._loop.run_in_executor(
+                    self._executor, self.model.get_embeddings, texts, len(texts)
+                )
+            except Exception as e:
+                logger.error(f"Error embedding batch of {len(texts)}: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            cache = getattr(self.model, "cache", None)
+            for (text, future), vector in zip(batch, vectors):
+                if cache is not None:
+                    cache.put(self.model_name, text, vector)
+                if not future.done():
+                    future.set_result(vector)
@@ -0,0 +1,123 @@
+"""
+In-memory LRU/TTL cache for embedding vectors.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from monitoring import record_cache
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for use as a cache key.
+
+    Collapses whitespace and lowercases, both of which are no-ops for the
+    uncased sentence-transformers tokenizers used here.
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        str: Normalized text
+    """
+    return " ".join(text.split()).lower()
+
+
+class EmbeddingCache:
+    """Bounded, thread-safe LRU cache of embeddings with optional TTL."""
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = None):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            max_size (int): Maximum number of cached vectors
+            ttl (Optional[float]): Time-to-live in seconds, None for no expiry
+        """
+        self.max_size = max_size
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model_name (str): Name of the embedding model
+            text (str): The text that was embedded
+
+        Returns:
+            Optional[numpy.ndarray]: The cached vector, or None on a miss
+        """
+        key = (model_name, normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                record_cache("embedding", misses=1)
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record_cache("embedding", hits=1)
+            return entry[0]
+
+    def put(self, model_name: str, text: str, vector: np.ndarray):
+        """
+        Store an embedding, evicting the least recently used entry if full.
+
+        Args:
+            model_name (str): Name of the embedding model
+            text (str): The text that was embedded
+            vector (numpy.ndarray): The embedding vector
+        """
+        if self.max_size <= 0:
+            return
+
+        # Cached vectors are shared between callers, so freeze a private copy
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+
+        key = (model_name, normalize_text(text))
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Size, capacity, hit and miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
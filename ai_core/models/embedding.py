@@ -2,39 +2,308 @@
 Embedding model implementation using Hugging Face transformers.
 """
 
+import logging
+import os
+import threading
+
+import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModel
+from typing import List, Dict, Any, Optional
+
+from monitoring import track_stage, record_batch, record_cache
+from .backends import OnnxEncoder, quantize_int8
+from .cache import EmbeddingCache
+from .store import DiskEmbeddingStore
+
+logger = logging.getLogger(__name__)
 
 
 class EmbeddingModel:
     """Class to create embeddings using a pre-trained model."""
-    
-    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2"):
+
+    DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+    # Supported inference backends
+    BACKENDS = ("torch", "onnx", "int8")
+
+    # Sample texts used to compare a backend against the float32 torch model
+    PARITY_TEXTS = [
+        "How do I open a savings account?",
+        "What documents are required for a personal loan?",
+        "Can I increase the limit on my credit card?",
+        "What is the profit rate on a fixed deposit for one year?",
+    ]
+
+    def __init__(
+        self,
+        model_name=DEFAULT_MODEL_NAME,
+        cache: Optional[EmbeddingCache] = None,
+        store: Optional[DiskEmbeddingStore] = None,
+        backend: str = "torch",
+        onnx_cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "ai_core", "onnx"),
+        parity_tolerance: float = 0.01,
+        max_length: int = 256
+    ):
         """
         Initialize the embedding model.
-        
+
         Args:
             model_name (str): Hugging Face model name
+            cache (Optional[EmbeddingCache]): Cache consulted for single-text embeddings
+            store (Optional[DiskEmbeddingStore]): Persistent store consulted before running the model
+            backend (str): Inference backend, one of "torch", "onnx" or "int8"
+            onnx_cache_dir (str): Directory where ONNX exports are cached
+            parity_tolerance (float): Maximum allowed drop in cosine similarity against
+                the float32 torch model before falling back to it
+            max_length (int): Maximum number of tokens per text, longer texts are truncated
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {self.BACKENDS}")
+
+        self.model_name = model_name
+        self.cache = cache
+        self.store = store
+        self.backend = backend
+        self.max_length = max_length
+        self.onnx_cache_dir = onnx_cache_dir
+        self.parity_tolerance = parity_tolerance
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model.to(self.device)
-        
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+        self.dim = model.config.hidden_size
+        self._onnx: Optional[OnnxEncoder] = None
+
+        # Token counts used to report padding efficiency
+        self._real_tokens = 0
+        self._padded_tokens = 0
+        self._stats_lock = threading.Lock()
+
+        if backend == "torch":
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.model = model.to(self.device)
+            self._bind_store()
+            return
+
+        # The optimized backends target CPU inference
+        self.device = "cpu"
+        if backend == "int8":
+            self.model = quantize_int8(model)
+        else:
+            self._onnx = OnnxEncoder(model, self.tokenizer, model_name, onnx_cache_dir)
+            self.model = None
+
+        similarity = self.check_parity(model)
+        if similarity < 1.0 - parity_tolerance:
+            logger.error(
+                f"{backend} embedding backend failed the parity check "
+                f"(min cosine {similarity:.4f}), falling back to torch"
+            )
+            self.backend = "torch"
+            self.model = model
+            self._onnx = None
+        else:
+            logger.info(f"Using {backend} embedding backend (min cosine {similarity:.4f} vs torch)")
+        self._bind_store()
+
+    def _bind_store(self):
+        """Switch to the store of the configuration actually in use, e.g. after a backend fallback."""
+        if self.store is None or self.store.matches(self.model_name, self.backend, self.max_length):
+            return
+        logger.warning(
+            f"Embedding store is for {self.store.model_name} ({self.store.backend}, max_length={self.store.max_length}), "
+            f"switching to the store for {self.model_name} ({self.backend}, max_length={self.max_length})"
+        )
+        self.store = self.store.reopen(self.model_name, self.backend, self.max_length)
+
+    def config(self) -> Dict[str, Any]:
+        """
+        Get the arguments that build an equivalent model, e.g. in another process.
+
+        The backend is the one in use, so a model that fell back to torch is rebuilt with torch.
+
+        Returns:
+            Dict[str, Any]: Keyword arguments for EmbeddingModel, without cache and store
+        """
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "onnx_cache_dir": self.onnx_cache_dir,
+            "parity_tolerance": self.parity_tolerance,
+            "max_length": self.max_length
+        }
+
+    def check_parity(self, reference: torch.nn.Module, texts: Optional[List[str]] = None) -> float:
+        """
+        Compare this model's embeddings with those of a float32 reference model.
+
+        Args:
+            reference (torch.nn.Module): Float32 model to compare against
+            texts (Optional[List[str]]): Texts to compare on, PARITY_TEXTS if None
+
+        Returns:
+            float: Lowest cosine similarity between the two embeddings of any text
+        """
+        texts = texts or self.PARITY_TEXTS
+        expected = self._torch_embed(reference, texts)
+        actual = self._embed_batch(texts)
+        cosine = (expected * actual).sum(axis=1) / (
+            np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1) + 1e-12
+        )
+        return float(cosine.min())
+
     def get_embedding(self, text):
         """
         Generate embedding for a given text.
-        
+
         Args:
             text (str): The text to embed
-            
+
         Returns:
             numpy.ndarray: The embedding vector
         """
-        inputs = self.tokenizer(text, padding=True, truncation=True, return_tensors="pt").to(self.device)
+        if self.cache is not None:
+            cached = self.cache.get(self.model_name, text)
+            if cached is not None:
+                return cached
+
+        embedding = self.get_embeddings([text])[0]
+
+        if self.cache is not None:
+            self.cache.put(self.model_name, text, embedding)
+        return embedding
+
+    def get_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts in batches.
+
+        Texts already in the persistent store are read from it and only the
+        rest go through the model.
+
+        Args:
+            texts (List[str]): The texts to embed
+            batch_size (int): Number of texts per forward pass
+
+        Returns:
+            numpy.ndarray: Contiguous float32 matrix of shape (len(texts), dim)
+        """
+        if self.store is None or len(texts) == 0:
+            return self._embed_texts(texts, batch_size)
+
+        stored = self.store.get_many(texts)
+        missing = [i for i, vector in enumerate(stored) if vector is None]
+        record_cache("embedding_store", hits=len(texts) - len(missing), misses=len(missing))
+        if not missing:
+            return np.stack(stored).astype(np.float32, copy=False)
+
+        computed = self._embed_texts([texts[i] for i in missing], batch_size)
+        self.store.put_many([texts[i] for i in missing], computed)
+
+        embeddings = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        embeddings[missing] = computed
+        for i, vector in enumerate(stored):
+            if vector is not None:
+                embeddings[i] = vector
+        return embeddings
+
+    def padding_stats(self) -> Dict[str, Any]:
+        """
+        Get padding statistics for batched embedding.
+
+        Returns:
+            Dict[str, Any]: Real and padded token counts and their ratio
+        """
+        with self._stats_lock:
+            return {
+                "real_tokens": self._real_tokens,
+                "padded_tokens": self._padded_tokens,
+                "efficiency": self._real_tokens / self._padded_tokens if self._padded_tokens else 1.0
+            }
+
+    def _embed_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        Run the model over texts in length-bucketed batches.
+
+        Texts are tokenized once, sorted by token count so each batch pads to
+        a similar length, and written back in their original order.
+
+        Args:
+            texts (List[str]): The texts to embed
+            batch_size (int): Number of texts per forward pass
+
+        Returns:
+            numpy.ndarray: Contiguous float32 matrix of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        encodings = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        lengths = np.array([len(ids) for ids in encodings["input_ids"]])
+        order = np.argsort(lengths, kind="stable")
+
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        real_tokens = 0
+        padded_tokens = 0
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            features = [{key: encodings[key][i] for key in encodings.keys()} for i in rows]
+            record_batch("embed", len(rows))
+            with track_stage("embed"):
+                embeddings[rows] = self._forward(features)
+
+            batch_lengths = lengths[rows]
+            real_tokens += int(batch_lengths.sum())
+            padded_tokens += int(batch_lengths.max()) * len(rows)
+
+        with self._stats_lock:
+            self._real_tokens += real_tokens
+            self._padded_tokens += padded_tokens
+
+        return embeddings
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Run a single forward pass over a batch of texts.
+
+        Args:
+            texts (List[str]): The texts to embed
+
+        Returns:
+            numpy.ndarray: Float32 matrix of mean-pooled embeddings
+        """
+        return self._forward(self.tokenizer(texts, truncation=True, max_length=self.max_length))
+
+    def _torch_embed(self, model: torch.nn.Module, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts with a torch model.
+
+        Args:
+            model (torch.nn.Module): Torch model to run
+            texts (List[str]): The texts to embed
+
+        Returns:
+            numpy.ndarray: Float32 matrix of mean-pooled embeddings
+        """
+        return self._forward(self.tokenizer(texts, truncation=True, max_length=self.max_length), model=model)
+
+    def _forward(self, features, model: Optional[torch.nn.Module] = None) -> np.ndarray:
+        """
+        Pad tokenized features to the longest in the batch and embed them.
+
+        Args:
+            features: Tokenizer output without padding
+            model (Optional[torch.nn.Module]): Torch model to run instead of the active backend
+
+        Returns:
+            numpy.ndarray: Float32 matrix of mean-pooled embeddings
+        """
+        if model is None and self._onnx is not None:
+            return self._onnx(self.tokenizer.pad(features, return_tensors="np"))
+
+        inputs = self.tokenizer.pad(features, return_tensors="pt").to(self.device)
         with torch.no_grad():
-            outputs = self.model(**inputs)
-        
+            outputs = (model or self.model)(**inputs)
+
         # Mean pooling to get sentence embedding
         attention_mask = inputs['attention_mask']
         embeddings = outputs.last_hidden_state
@@ -43,6 +312,6 @@ class EmbeddingModel:
         summed = torch.sum(masked_embeddings, 1)
         counts = torch.clamp(mask.sum(1), min=1e-9)
         mean_pooled = summed / counts
-        
+
         # Convert to numpy and return
-        return mean_pooled[0].cpu().numpy()
\ No newline at end of file
+        return mean_pooled.cpu().numpy().astype(np.float32, copy=False)
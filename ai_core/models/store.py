@@ -0,0 +1,326 @@
+"""
+Persistent, append-only on-disk store of embeddings keyed by content hash.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Without advisory locks the store must only be written by one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class DiskEmbeddingStore:
+    """
+    Memory-mapped float32 embedding store for a single model configuration.
+
+    Vectors depend on the inference backend and the truncation length as
+    well as the model, so each combination gets its own store. Appends hold
+    a file lock and first pick up rows appended by other processes, and a
+    read-only store picks them up on lookup, so ingestion jobs and a
+    read-only API server can share one directory.
+    """
+
+    META_FILE = "meta.json"
+    INDEX_FILE = "index.txt"
+    VECTORS_FILE = "vectors.f32"
+    LOCK_FILE = "lock"
+
+    def __init__(
+        self,
+        root: str,
+        model_name: str,
+        backend: str = "torch",
+        max_length: int = 256,
+        read_only: bool = False
+    ):
+        """
+        Open (or create) the store for a model configuration.
+
+        Args:
+            root (str): Directory holding the stores of all models
+            model_name (str): Name of the embedding model
+            backend (str): Inference backend the vectors are computed with
+            max_length (int): Token limit texts are truncated to before embedding
+            read_only (bool): Only look up vectors; `put_many` is then a no-op,
+                e.g. so queries are never persisted
+        """
+        self.root = root
+        self.model_name = model_name
+        self.backend = backend
+        self.max_length = max_length
+        self.read_only = read_only
+        key = f"{model_name}@{backend}-{max_length}"
+        self.path = os.path.join(root, re.sub(r"[^A-Za-z0-9._-]", "_", key))
+
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._index_size = 0
+        self._lock = threading.Lock()
+        if read_only:
+            self._load(repair=False)
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._file_lock():
+            self._load()
+
+    def matches(self, model_name: str, backend: str, max_length: int) -> bool:
+        """
+        Check whether the store holds vectors of a model configuration.
+
+        Args:
+            model_name (str): Name of the embedding model
+            backend (str): Inference backend
+            max_length (int): Token limit of the model
+
+        Returns:
+            bool: True if vectors from this store can be used for the configuration
+        """
+        return (self.model_name, self.backend, self.max_length) == (model_name, backend, max_length)
+
+    def reopen(self, model_name: str, backend: str, max_length: int) -> "DiskEmbeddingStore":
+        """
+        Open the store of another model configuration under the same root.
+
+        Args:
+            model_name (str): Name of the embedding model
+            backend (str): Inference backend
+            max_length (int): Token limit of the model
+
+        Returns:
+            DiskEmbeddingStore: Store with the same root and access mode
+        """
+        return DiskEmbeddingStore(self.root, model_name, backend, max_length, read_only=self.read_only)
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """
+        Hash a text into its store key.
+
+        Args:
+            text (str): The embedded text
+
+        Returns:
+            str: Hex digest of the text
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up stored embeddings.
+
+        A read-only store first picks up rows appended by writers since it was opened.
+
+        Args:
+            texts (List[str]): The texts to look up
+
+        Returns:
+            List[Optional[numpy.ndarray]]: Stored vector per text, None where missing
+        """
+        with self._lock:
+            if self.read_only and self._index_grew():
+                with self._file_lock(shared=True):
+                    self._catch_up(repair=False)
+            if self._vectors is None:
+                return [None] * len(texts)
+            results = []
+            for text in texts:
+                row = self._rows.get(self.text_key(text))
+                results.append(None if row is None else np.array(self._vectors[row]))
+            return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Append embeddings for texts that are not stored yet.
+
+        Args:
+            texts (List[str]): The embedded texts
+            vectors (numpy.ndarray): Matrix of embeddings, one row per text
+        """
+        if self.read_only or len(texts) == 0:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        with self._lock, self._file_lock():
+            self._catch_up()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._write_meta()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of size {self.dim}, got {vectors.shape[1]}")
+
+            keys = []
+            rows = []
+            seen = set()
+            for i, text in enumerate(texts):
+                key = self.text_key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                keys.append(key)
+                rows.append(i)
+            if not keys:
+                return
+
+            # Vectors are written before the index so a crash never indexes missing data
+            with open(self._file(self.VECTORS_FILE), "ab") as f:
+                f.write(vectors[rows].tobytes())
+            index_lines = "".join(f"{key}\n" for key in keys).encode("ascii")
+            with open(self._file(self.INDEX_FILE), "ab") as f:
+                f.write(index_lines)
+            self._index_size += len(index_lines)
+
+            for key in keys:
+                self._rows[key] = self._count
+                self._count += 1
+            self._remap()
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        """
+        Hold a lock on the store across processes.
+
+        Args:
+            shared (bool): Take a shared lock for reading instead of an exclusive one
+        """
+        if fcntl is None:
+            yield
+            return
+        # Readers never create files; a store with an index always has its lock file
+        with open(self._file(self.LOCK_FILE), "r" if shared else "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _index_grew(self) -> bool:
+        """Check whether the index file is longer than the part already read."""
+        try:
+            return os.path.getsize(self._file(self.INDEX_FILE)) > self._index_size
+        except OSError:
+            return False
+
+    def _catch_up(self, repair: bool = True):
+        """
+        Index the rows other processes appended since the index was last read.
+
+        Args:
+            repair (bool): Cut rows a crashed writer left half written off the files
+                instead of just ignoring them
+        """
+        index_path = self._file(self.INDEX_FILE)
+        vectors_path = self._file(self.VECTORS_FILE)
+        if os.path.exists(index_path) and os.path.getsize(index_path) > self._index_size:
+            if self.dim is None:
+                with open(self._file(self.META_FILE)) as f:
+                    self.dim = json.load(f)["dim"]
+
+            with open(index_path, "rb") as f:
+                f.seek(self._index_size)
+                appended = f.read()
+            # Only complete lines whose vectors are fully written count
+            keys = appended[:appended.rfind(b"\n") + 1].decode("ascii").split()
+            row_bytes = self.dim * np.dtype(np.float32).itemsize
+            stored_rows = os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+            keys = keys[:max(0, stored_rows - self._count)]
+
+            self._index_size += sum(len(key) + 1 for key in keys)
+            for key in keys:
+                self._rows[key] = self._count
+                self._count += 1
+            self._remap()
+
+            if repair and os.path.getsize(index_path) > self._index_size:
+                logger.warning(f"Repairing embedding store {self.path}: keeping {self._count} complete rows")
+                with open(index_path, "ab") as f:
+                    f.truncate(self._index_size)
+
+        # Drop vectors a crashed writer appended without indexing them
+        if repair and self.dim is not None and os.path.exists(vectors_path):
+            indexed_bytes = self._count * self.dim * np.dtype(np.float32).itemsize
+            if os.path.getsize(vectors_path) > indexed_bytes:
+                logger.warning(f"Repairing embedding store {self.path}: keeping {self._count} complete rows")
+                with open(vectors_path, "ab") as f:
+                    f.truncate(indexed_bytes)
+
+    def _file(self, name: str) -> str:
+        """Get the path of a file inside the store."""
+        return os.path.join(self.path, name)
+
+    def _write_meta(self):
+        """Persist the model name and vector size."""
+        with open(self._file(self.META_FILE), "w") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "backend": self.backend,
+                "max_length": self.max_length,
+                "dim": self.dim
+            }, f)
+
+    def _load(self, repair: bool = True):
+        """
+        Read the index and map the vectors.
+
+        Args:
+            repair (bool): Cut a partially written tail off the files instead of just ignoring it
+        """
+        meta_path = self._file(self.META_FILE)
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as f:
+            self.dim = json.load(f)["dim"]
+
+        index_path = self._file(self.INDEX_FILE)
+        vectors_path = self._file(self.VECTORS_FILE)
+        keys = []
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                keys = [line.strip() for line in f if line.strip()]
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        stored_rows = os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+
+        count = min(len(keys), stored_rows)
+        torn = len(keys) != count or (os.path.exists(vectors_path) and os.path.getsize(vectors_path) != count * row_bytes)
+        keys = keys[:count]
+        if torn and repair:
+            logger.warning(f"Repairing embedding store {self.path}: keeping {count} complete rows")
+            with open(index_path, "w") as f:
+                f.write("".join(f"{key}\n" for key in keys))
+            with open(vectors_path, "ab") as f:
+                f.truncate(count * row_bytes)
+
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._count = count
+        self._index_size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        self._remap()
+        logger.info(f"Opened embedding store {self.path} with {count} vectors")
+
+    def _remap(self):
+        """Memory-map the vectors file at its current length."""
+        if self._count == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(
+            self._file(self.VECTORS_FILE),
+            dtype=np.float32,
+            mode="r",
+            shape=(self._count, self.dim)
+        )
@@ -0,0 +1,49 @@
+"""
+Monitoring subpackage for AI Core.
+"""
+
+from .metrics import (
+    METRICS_REGISTRY,
+    track_stage,
+    observe_stage,
+    record_error,
+    record_cache,
+    record_batch,
+    record_tokens,
+    record_answer,
+    set_token_models,
+)
+from .tracing import (
+    Span,
+    SpanExporter,
+    LogSpanExporter,
+    OtlpFileSpanExporter,
+    start_span,
+    current_trace,
+    parse_traceparent,
+    server_timing,
+    set_exporter,
+    create_exporter,
+)
+
+__all__ = [
+    "METRICS_REGISTRY",
+    "track_stage",
+    "observe_stage",
+    "record_error",
+    "record_cache",
+    "record_batch",
+    "record_tokens",
+    "record_answer",
+    "set_token_models",
+    "Span",
+    "SpanExporter",
+    "LogSpanExporter",
+    "OtlpFileSpanExporter",
+    "start_span",
+    "current_trace",
+    "parse_traceparent",
+    "server_timing",
+    "set_exporter",
+    "create_exporter",
+]
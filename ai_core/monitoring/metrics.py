@@ -0,0 +1,191 @@
+"""
+Prometheus metrics for the RAG pipeline.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterable, Set
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    GCCollector,
+    PlatformCollector,
+    ProcessCollector,
+)
+
+from .tracing import start_span
+
+# Buckets from sub-millisecond cache paths up to slow LLM generations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+# Label value for tokens of LLMs that are not configured
+OTHER_MODEL = "other"
+
+def _create_registry() -> CollectorRegistry:
+    """Create the registry of the pipeline metrics, with the standard process metrics."""
+    registry = CollectorRegistry()
+    ProcessCollector(registry=registry)
+    PlatformCollector(registry=registry)
+    GCCollector(registry=registry)
+    return registry
+
+
+METRICS_REGISTRY: CollectorRegistry = _create_registry()
+_token_models: Set[str] = set()
+
+
+def _metric(cls, name: str, documentation: str, labelnames=(), **kwargs):
+    """Create a metric in the pipeline registry."""
+    return cls(name, documentation, labelnames, registry=METRICS_REGISTRY, **kwargs)
+
+
+STAGE_LATENCY = _metric(
+    Histogram,
+    "ai_core_stage_latency_seconds",
+    "Latency of a pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+BATCH_SIZE = _metric(
+    Histogram,
+    "ai_core_batch_size",
+    "Number of items processed together in one call",
+    ["operation"],
+    buckets=BATCH_SIZE_BUCKETS
+)
+CACHE_REQUESTS = _metric(
+    Counter,
+    "ai_core_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+LLM_TOKENS = _metric(
+    Counter,
+    "ai_core_llm_tokens_total",
+    "Tokens sent to and generated by the LLM",
+    ["model", "direction"]
+)
+ANSWERS = _metric(
+    Counter,
+    "ai_core_answers_total",
+    "Answers by the path that served them",
+    ["source"]
+)
+ERRORS = _metric(
+    Counter,
+    "ai_core_errors_total",
+    "Errors by pipeline stage and exception type",
+    ["stage", "error_type"]
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    Time a block as a pipeline stage and count the exceptions it raises.
+
+    The block also runs in a tracing span named after the stage.
+
+    Args:
+        stage (str): Name of the stage
+    """
+    start = time.perf_counter()
+    with start_span(stage):
+        try:
+            yield
+        except Exception as e:
+            ERRORS.labels(stage=stage, error_type=type(e).__name__).inc()
+            raise
+        finally:
+            STAGE_LATENCY.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def observe_stage(stage: str, seconds: float):
+    """
+    Record a stage duration measured by the caller.
+
+    Args:
+        stage (str): Name of the stage
+        seconds (float): Duration in seconds
+    """
+    STAGE_LATENCY.labels(stage=stage).observe(seconds)
+
+
+def record_error(stage: str, error: Exception):
+    """
+    Count an error that was handled without propagating.
+
+    Args:
+        stage (str): Name of the stage
+        error (Exception): The handled exception
+    """
+    ERRORS.labels(stage=stage, error_type=type(error).__name__).inc()
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0):
+    """
+    Count cache hits and misses.
+
+    Args:
+        cache (str): Name of the cache
+        hits (int): Number of hits
+        misses (int): Number of misses
+    """
+    if hits:
+        CACHE_REQUESTS.labels(cache=cache, result="hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache=cache, result="miss").inc(misses)
+
+
+def record_batch(operation: str, size: int):
+    """
+    Record the size of a batch.
+
+    Args:
+        operation (str): Name of the batched operation
+        size (int): Number of items in the batch
+    """
+    BATCH_SIZE.labels(operation=operation).observe(size)
+
+
+def set_token_models(models: Iterable[str]):
+    """
+    Set the LLMs whose tokens are counted under their own name.
+
+    Model names come from requests, so tokens of any other model are counted
+    under "other" to keep the number of label values bounded.
+
+    Args:
+        models (Iterable[str]): Names of the configured LLMs
+    """
+    _token_models.clear()
+    _token_models.update(models)
+
+
+def record_tokens(model: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+    """
+    Count LLM tokens.
+
+    Args:
+        model (str): Name of the LLM
+        prompt_tokens (int): Tokens sent to the LLM
+        completion_tokens (int): Tokens generated by the LLM
+    """
+    model = model if model in _token_models else OTHER_MODEL
+    if prompt_tokens:
+        LLM_TOKENS.labels(model=model, direction="in").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(model=model, direction="out").inc(completion_tokens)
+
+
+def record_answer(source: str):
+    """
+    Count an answer by the path that served it.
+
+    Args:
+        source (str): Serving path, e.g. "cache", "direct", "llm" or "error"
+    """
+    ANSWERS.labels(source=source).inc()
@@ -0,0 +1,300 @@
+"""
+Lightweight request tracing with pluggable span exporters.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "ai_core"
+
+# W3C trace context header: version-traceid-parentid-flags
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    _start_perf_ns: int = 0
+
+    @property
+    def duration_ms(self) -> float:
+        """Duration in milliseconds, up to now if the span is still open."""
+        if self.end_ns is not None:
+            return (self.end_ns - self.start_ns) / 1e6
+        return (time.perf_counter_ns() - self._start_perf_ns) / 1e6
+
+
+class Trace:
+    """Spans collected for one request or root operation."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self.spans)
+
+
+class SpanExporter:
+    """Receives finished spans; the base class drops them."""
+
+    def export(self, spans: List[Span]):
+        """
+        Export finished spans.
+
+        Args:
+            spans (List[Span]): Spans of one trace, or late spans of a finished trace
+        """
+
+
+class LogSpanExporter(SpanExporter):
+    """Write one log line per span."""
+
+    def export(self, spans: List[Span]):
+        for span in spans:
+            logger.info(
+                f"span name={span.name} trace={span.trace_id} span={span.span_id} "
+                f"parent={span.parent_id or '-'} duration_ms={span.duration_ms:.2f}"
+                + (f" error={span.error}" if span.error else "")
+                + "".join(f" {key}={value}" for key, value in span.attributes.items())
+            )
+
+
+class OtlpFileSpanExporter(SpanExporter):
+    """Append spans as OTLP/JSON trace export requests, one JSON object per line."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the exporter.
+
+        Args:
+            path (str): File the export requests are appended to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [self._otlp_span(span) for span in spans]
+                }]
+            }]
+        }
+        line = json.dumps(request, separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+    @staticmethod
+    def _otlp_span(span: Span) -> Dict[str, Any]:
+        """Convert a span to its OTLP/JSON representation."""
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Convert an attribute to an OTLP key/value pair."""
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("ai_core_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("ai_core_span", default=None)
+_exporter: SpanExporter = SpanExporter()
+
+
+def set_exporter(exporter: SpanExporter):
+    """
+    Set the exporter finished traces are sent to.
+
+    Args:
+        exporter (SpanExporter): Span exporter
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def create_exporter(name: str, path: Optional[str] = None) -> SpanExporter:
+    """
+    Create a span exporter by name.
+
+    Args:
+        name (str): "none", "log" or "otlp-file"
+        path (Optional[str]): Output file of the otlp-file exporter
+
+    Returns:
+        SpanExporter: Span exporter
+    """
+    if name == "log":
+        return LogSpanExporter()
+    if name == "otlp-file":
+        return OtlpFileSpanExporter(path or "traces.jsonl")
+    if name in ("", "none"):
+        return SpanExporter()
+    raise ValueError(f"Unknown trace exporter: {name}")
+
+
+def current_trace() -> Optional[Trace]:
+    """
+    Get the trace of the current context.
+
+    Returns:
+        Optional[Trace]: Current trace, or None outside of any span
+    """
+    return _current_trace.get()
+
+
+def parse_traceparent(header: Optional[str]):
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        header (Optional[str]): Header value
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: Trace ID and parent span ID, or Nones if invalid
+    """
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    if match is None:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+def _reset(var: ContextVar, token, fallback):
+    """Reset a context variable, tolerating generators resumed in another context."""
+    try:
+        var.reset(token)
+    except ValueError:
+        var.set(fallback)
+
+
+@contextmanager
+def start_span(name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+    """
+    Open a span as a child of the current one, or as the root of a new trace.
+
+    The trace is exported when its root span ends. Spans ending after that,
+    such as those of background tasks, are exported on their own.
+
+    Args:
+        name (str): Name of the span
+        trace_id (Optional[str]): Trace ID for a new root span, random if None
+        parent_id (Optional[str]): Remote parent span ID for a new root span
+        **attributes: Span attributes
+
+    Yields:
+        Span: The open span
+    """
+    parent = _current_span.get()
+    trace = _current_trace.get()
+    is_root = trace is None
+    trace_token = None
+    if is_root:
+        trace = Trace(trace_id or os.urandom(16).hex())
+        trace_token = _current_trace.set(trace)
+
+    span = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent is not None else parent_id,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+        _start_perf_ns=time.perf_counter_ns()
+    )
+    span_token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        span.end_ns = span.start_ns + (time.perf_counter_ns() - span._start_perf_ns)
+        _reset(_current_span, span_token, parent)
+        trace.add(span)
+        if is_root:
+            _reset(_current_trace, trace_token, None)
+            trace.finished = True
+            _export(trace.finished_spans())
+        elif trace.finished:
+            _export([span])
+
+
+def _export(spans: List[Span]):
+    """Send spans to the exporter, logging instead of raising on failure."""
+    try:
+        _exporter.export(spans)
+    except Exception as e:
+        logger.error(f"Error exporting spans: {str(e)}")
+
+
+def server_timing(trace: Optional[Trace], root: Optional[Span] = None) -> str:
+    """
+    Format the finished spans of a trace as a Server-Timing header value.
+
+    Durations of spans with the same name are summed.
+
+    Args:
+        trace (Optional[Trace]): Trace of the request
+        root (Optional[Span]): Open root span, reported as "total"
+
+    Returns:
+        str: Header value, e.g. "retrieve;dur=12.3, llm;dur=480.1, total;dur=495.0"
+    """
+    totals: Dict[str, float] = {}
+    for span in trace.finished_spans() if trace is not None else []:
+        if root is not None and span.span_id == root.span_id:
+            continue
+        metric = re.sub(r"[^A-Za-z0-9_.-]", "_", span.name)
+        totals[metric] = totals.get(metric, 0.0) + span.duration_ms
+
+    entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+    if root is not None:
+        entries.append(f"total;dur={root.duration_ms:.1f}")
+    return ", ".join(entries)
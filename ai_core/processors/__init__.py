@@ -2,6 +2,24 @@
 Processors subpackage for AI Core.
 """
 
-from .data_processor import load_qa_data, process_and_upload_data, load_qa_into_qdrant
+from .data_processor import (
+    load_qa_data,
+    iter_qa_data,
+    process_and_upload_data,
+    sync_qa_data,
+    upsert_qa_pair,
+    qa_point_id,
+    load_qa_into_qdrant,
+)
+from .json_stream import iter_json_records
 
-__all__ = ["load_qa_data", "process_and_upload_data", "load_qa_into_qdrant"]
\ No newline at end of file
+__all__ = [
+    "load_qa_data",
+    "iter_qa_data",
+    "iter_json_records",
+    "process_and_upload_data",
+    "sync_qa_data",
+    "upsert_qa_pair",
+    "qa_point_id",
+    "load_qa_into_qdrant",
+]
\ No newline at end of file
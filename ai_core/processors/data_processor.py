@@ -2,16 +2,131 @@
 Data processing utilities for QA data.
 """
 
-import json
+import hashlib
+import itertools
 import logging
-from typing import Dict, List, Tuple, Optional
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple, Optional, Iterable, Iterator, TextIO, Union
 from tqdm import tqdm
 
 from models import EmbeddingModel
-from database import QdrantDB
+from database import QdrantDB, VectorStorage
+from .json_stream import iter_json_records
+from .parallel import ParallelEmbedder
 
 logger = logging.getLogger(__name__)
 
+# Namespace for deriving stable point IDs from question text
+QA_POINT_NAMESPACE = uuid.UUID("6f1c1d2e-8a4b-5c3d-9e7f-0a1b2c3d4e5f")
+
+
+def qa_point_id(question: str) -> str:
+    """
+    Derive a stable point ID from the question text.
+    
+    Only the question is embedded, so the same question always maps to the
+    same point and vector regardless of its answer.
+    
+    Args:
+        question (str): Question text
+        
+    Returns:
+        str: UUID string usable as a Qdrant point ID
+    """
+    return str(uuid.uuid5(QA_POINT_NAMESPACE, question))
+
+
+def qa_content_hash(question: str, answer: str) -> str:
+    """
+    Hash the full content of a QA pair to detect changes.
+    
+    Args:
+        question (str): Question text
+        answer (str): Answer text
+        
+    Returns:
+        str: Hex digest of the question and answer
+    """
+    return hashlib.sha256(f"{question}\0{answer}".encode("utf-8")).hexdigest()
+
+
+def build_qa_payload(qa: Dict[str, str]) -> Dict[str, str]:
+    """
+    Build the Qdrant payload stored with a QA pair.
+    
+    Args:
+        qa (Dict[str, str]): QA pair
+        
+    Returns:
+        Dict[str, str]: Payload with question, answer, point ID and content hash
+    """
+    question = qa.get("question", "")
+    answer = qa.get("answer", "")
+    return {
+        "question": question,
+        "answer": answer,
+        "id": qa_point_id(question),
+        "content_hash": qa_content_hash(question, answer)
+    }
+
+
+def extract_qa_pair(item: Dict) -> Optional[Dict[str, str]]:
+    """
+    Convert one raw prompt/completion record into a QA pair.
+    
+    Args:
+        item (Dict): Raw record with "prompt" and "completion" message lists
+        
+    Returns:
+        Optional[Dict[str, str]]: QA pair, or None if the question or answer is missing
+    """
+    # Extract question (prompt) from user content
+    question = ""
+    for prompt_item in item.get("prompt", []):
+        if prompt_item.get("role") == "user":
+            question = prompt_item.get("content", "")
+            break
+    
+    # Extract answer (completion) from assistant content
+    answer = ""
+    for completion_item in item.get("completion", []):
+        if completion_item.get("role") == "assistant":
+            answer = completion_item.get("content", "")
+            break
+    
+    # Only keep records where both question and answer exist
+    if question and answer:
+        return {
+            "question": question,
+            "answer": answer
+        }
+    return None
+
+
+def iter_qa_data(file_path: Union[str, TextIO]) -> Iterator[Dict[str, str]]:
+    """
+    Stream QA pairs from a JSON array or JSON Lines file one record at a time.
+    
+    Args:
+        file_path (Union[str, TextIO]): Path to the JSON or JSON Lines file, or the file opened in text mode
+        
+    Yields:
+        Dict[str, str]: Processed QA pairs
+    """
+    raw_count = 0
+    valid_count = 0
+    for item in iter_json_records(file_path):
+        raw_count += 1
+        qa = extract_qa_pair(item) if isinstance(item, dict) else None
+        if qa is not None:
+            valid_count += 1
+            yield qa
+    
+    logger.info(f"Processed {valid_count} valid QA pairs from {raw_count} raw records")
+
 
 def load_qa_data(file_path: str) -> List[Dict[str, str]]:
     """
@@ -23,144 +138,434 @@ def load_qa_data(file_path: str) -> List[Dict[str, str]]:
     Returns:
         List[Dict[str, str]]: List of processed QA pairs
     """
-    with open(file_path, 'r') as f:
-        raw_data = json.load(f)
-    
-    # Process the nested format into a simpler structure
-    processed_data = []
-    for item in raw_data:
-        # Extract question (prompt) from user content
-        question = ""
-        for prompt_item in item.get("prompt", []):
-            if prompt_item.get("role") == "user":
-                question = prompt_item.get("content", "")
-                break
-        
-        # Extract answer (completion) from assistant content
-        answer = ""
-        for completion_item in item.get("completion", []):
-            if completion_item.get("role") == "assistant":
-                answer = completion_item.get("content", "")
-                break
+    return list(iter_qa_data(file_path))
+
+
+def _batched(items: Iterable, batch_size: int) -> Iterator[List]:
+    """
+    Group an iterable into lists of at most `batch_size` items.
+    
+    Args:
+        items (Iterable): Items to group
+        batch_size (int): Maximum batch length
         
-        # Add to processed data if both question and answer exist
-        if question and answer:
-            processed_data.append({
-                "question": question,
-                "answer": answer
-            })
+    Yields:
+        List: Consecutive batches
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _last_per_question(batch: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Drop repeated questions from a batch, keeping the last occurrence of each.
     
-    logger.info(f"Processed {len(processed_data)} valid QA pairs from {len(raw_data)} raw records")
-    return processed_data
+    Args:
+        batch (List[Dict[str, str]]): QA pairs
+        
+    Returns:
+        List[Dict[str, str]]: QA pairs with unique questions, in order of their last occurrence
+    """
+    last = {qa.get("question", ""): i for i, qa in enumerate(batch)}
+    if len(last) == len(batch):
+        return batch
+    return [qa for i, qa in enumerate(batch) if last[qa.get("question", "")] == i]
 
 
 def process_and_upload_data(
     db: QdrantDB, 
-    data: List[Dict[str, str]], 
+    data: Iterable[Dict[str, str]], 
     model: EmbeddingModel, 
     collection_name: str,
     batch_size: int = 100,
-    show_progress: bool = True
+    show_progress: bool = True,
+    upload_workers: int = 2,
+    queue_size: int = 4,
+    embed_workers: int = 1,
+    embed_batch_size: int = 32,
+    embed_threads: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, float], None]] = None
 ) -> int:
     """
     Process QA data and upload to Qdrant.
     
+    Embedding runs in the calling thread and fills a bounded queue that
+    uploader threads drain with non-blocking upserts, so CPU and network
+    work overlap. The final batch is uploaded with `wait=True` once every
+    earlier batch has been accepted, which acts as a consistency barrier.
+    With `embed_workers` above one, batches are embedded by a pool of
+    processes, each with its own model, and still uploaded in order.
+    A question that appears more than once is stored with its last answer.
+    
+    `progress_callback` is called after every embedded batch; an exception
+    raised from it stops the load.
+    
     Args:
         db (QdrantDB): Qdrant database client
-        data (List[Dict[str, str]]): List of QA pairs
+        data (Iterable[Dict[str, str]]): QA pairs, consumed lazily so generators stay streaming
         model (EmbeddingModel): Embedding model
         collection_name (str): Name of the collection
-        batch_size (int): Size of batches for uploading
+        batch_size (int): Size of batches for embedding and uploading
         show_progress (bool): Whether to show progress bar
+        upload_workers (int): Number of uploader threads
+        queue_size (int): Maximum number of embedded batches waiting for upload
+        embed_workers (int): Number of embedding processes, 1 to embed in the calling thread
+        embed_batch_size (int): Texts per forward pass; upload batches are split into
+            length-sorted sub-batches of this size to reduce padding
+        embed_threads (Optional[int]): Torch threads per embedding process, the cores
+            shared between the processes if None
+        progress_callback (Optional[Callable[[int, float], None]]): Receives the number of
+            QA pairs read so far and the throughput in pairs per second
         
     Returns:
-        int: Number of QA pairs uploaded
+        int: Number of distinct QA pairs uploaded
     """
-    vectors = []
-    payloads = []
-    total_uploaded = 0
+    total_embedded = 0
+    processed = 0
+    seen_ids = set()
+    start = time.monotonic()
+    upload_errors = []
+    
+    # Each point ID always goes to the same uploader, whose upserts are applied in
+    # order, so the last occurrence of a duplicate question wins
+    upload_queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in range(max(1, upload_workers))]
+    
+    def uploader(upload_queue):
+        while True:
+            item = upload_queue.get()
+            try:
+                if item is None:
+                    return
+                # After a failure, drain the queue without uploading
+                if upload_errors:
+                    continue
+                vectors, payloads, ids = item
+                db.upload_batch(collection_name, vectors, payloads, ids=ids, wait=False)
+            except Exception as e:
+                logger.error(f"Error uploading batch: {str(e)}")
+                upload_errors.append(e)
+            finally:
+                upload_queue.task_done()
+    
+    def enqueue(vectors, payloads, ids):
+        shards = [([], [], []) for _ in upload_queues]
+        for vector, payload, point_id in zip(vectors, payloads, ids):
+            shard = shards[hash(point_id) % len(shards)]
+            shard[0].append(vector)
+            shard[1].append(payload)
+            shard[2].append(point_id)
+        for upload_queue, shard in zip(upload_queues, shards):
+            if shard[2]:
+                upload_queue.put(shard)
+    
+    uploaders = [
+        threading.Thread(target=uploader, args=(upload_queue,), name=f"qdrant-uploader-{i}", daemon=True)
+        for i, upload_queue in enumerate(upload_queues)
+    ]
+    for thread in uploaders:
+        thread.start()
     
     logger.info("Processing and embedding QA pairs...")
     
     # Use tqdm for progress tracking if requested
-    data_iterator = tqdm(data) if show_progress else data
+    total = len(data) if hasattr(data, "__len__") else None
+    progress = tqdm(total=total) if show_progress else None
+    
+    def question_batches():
+        # Text to embed - using only the question for search efficiency.
+        # Repeated questions within a batch are embedded once, keeping the last answer.
+        for batch in _batched(data, batch_size):
+            unique = _last_per_question(batch)
+            yield (len(batch), unique), [qa.get("question", "") for qa in unique]
+    
+    # Create embeddings for each batch in one pass, in-process or across workers
+    embedder = ParallelEmbedder(model, embed_workers, num_threads=embed_threads) if embed_workers > 1 else None
+    if embedder is not None:
+        embedded_batches = embedder.embed_batches(question_batches())
+    else:
+        embedded_batches = (
+            (tag, model.get_embeddings(questions, batch_size=embed_batch_size))
+            for tag, questions in question_batches()
+        )
+    
+    # The most recent batch is held back so it can serve as the barrier
+    final_batch = None
+    try:
+        for (read, batch), embeddings in embedded_batches:
+            if upload_errors:
+                break
+            
+            # Create payloads with metadata
+            payloads = [build_qa_payload(qa) for qa in batch]
+            ids = [payload["id"] for payload in payloads]
+            
+            if final_batch is not None:
+                enqueue(*final_batch)
+            final_batch = (embeddings.tolist(), payloads, ids)
+            processed += read
+            # Points are counted once however often their question repeats
+            seen_ids.update(uuid.UUID(point_id).int for point_id in ids)
+            total_embedded = len(seen_ids)
+            
+            if progress is not None:
+                progress.update(read)
+                progress.set_postfix(upload_queue=sum(upload_queue.qsize() for upload_queue in upload_queues))
+            if progress_callback is not None:
+                progress_callback(processed, processed / max(time.monotonic() - start, 1e-9))
+    finally:
+        if embedder is not None:
+            embedder.close()
+        for upload_queue in upload_queues:
+            upload_queue.put(None)
+        for thread in uploaders:
+            thread.join()
+        if progress is not None:
+            progress.close()
     
-    for i, qa in enumerate(data_iterator):
-        question = qa.get("question", "")
-        answer = qa.get("answer", "")
+    if upload_errors:
+        raise upload_errors[0]
+    
+    # Every earlier batch has been accepted, so waiting on this one waits on all of them
+    if final_batch is not None:
+        vectors, payloads, ids = final_batch
+        db.upload_batch(collection_name, vectors, payloads, ids=ids, wait=True)
+    
+    elapsed = time.monotonic() - start
+    logger.info(f"Uploaded {total_embedded} QA pairs to Qdrant in {elapsed:.1f}s ({total_embedded / max(elapsed, 1e-9):.1f} pairs/s).")
+    if embedder is None:
+        logger.info(f"Embedding padding efficiency: {model.padding_stats()['efficiency']:.1%}")
+    return total_embedded
+
+
+def sync_qa_data(
+    db: QdrantDB,
+    data: Iterable[Dict[str, str]],
+    model: EmbeddingModel,
+    collection_name: str,
+    batch_size: int = 100,
+    show_progress: bool = True,
+    progress_callback: Optional[Callable[[int, float], None]] = None
+) -> Dict[str, int]:
+    """
+    Bring a collection in line with the given QA pairs without reloading it.
+    
+    New questions are embedded and inserted, pairs whose answer changed get
+    their payload rewritten without re-embedding, and points whose question
+    no longer appears in the data are deleted.
+    
+    Args:
+        db (QdrantDB): Qdrant database client
+        data (Iterable[Dict[str, str]]): QA pairs
+        model (EmbeddingModel): Embedding model
+        collection_name (str): Name of the collection
+        batch_size (int): Size of batches for embedding and uploading
+        show_progress (bool): Whether to show progress bar
+        progress_callback (Optional[Callable[[int, float], None]]): Called every `batch_size`
+            pairs and at the end with the number of pairs processed and the throughput in pairs per second;
+            an exception raised from it stops the sync
         
-        # Text to embed - using only the question for search efficiency
-        text_to_embed = question
+    Returns:
+        Dict[str, int]: Counts of added, updated, unchanged and deleted pairs
+    """
+    stored_hashes = db.get_payload_values(collection_name, "content_hash")
+    logger.info(f"Found {len(stored_hashes)} stored QA pairs in {collection_name}")
+    
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    seen_ids = set()
+    # Payloads waiting to be embedded, by point ID
+    pending: Dict[str, Dict[str, str]] = {}
+    # Changed payloads of stored points, written in one request per batch
+    updates: Dict[str, Dict[str, str]] = {}
+    processed = 0
+    start = time.monotonic()
+    
+    def flush_pending():
+        payloads = list(pending.values())
+        questions = [payload["question"] for payload in payloads]
+        embeddings = model.get_embeddings(questions, batch_size=batch_size)
+        db.upload_batch(
+            collection_name,
+            embeddings.tolist(),
+            payloads,
+            ids=[payload["id"] for payload in payloads]
+        )
+        stats["added"] += len(payloads)
+        pending.clear()
+    
+    def flush_updates():
+        db.overwrite_payloads(collection_name, list(updates), list(updates.values()))
+        updates.clear()
+    
+    data_iterator = tqdm(data) if show_progress else data
+    for qa in data_iterator:
+        payload = build_qa_payload(qa)
+        point_id = payload["id"]
+        content_hash = payload["content_hash"]
         
-        # Create embedding
-        embedding = model.get_embedding(text_to_embed)
+        # Each question is counted once; later duplicates replace earlier ones, as in a full load
+        duplicate = point_id in seen_ids
+        seen_ids.add(point_id)
         
-        # Create payload with metadata
-        payload = {
-            "question": question,
-            "answer": answer,
-            "id": i + total_uploaded
-        }
+        stored_hash = stored_hashes.get(point_id)
+        if stored_hash == content_hash:
+            if not duplicate:
+                stats["unchanged"] += 1
+        elif point_id in pending:
+            pending[point_id] = payload
+        elif stored_hash is None:
+            pending[point_id] = payload
+            if len(pending) >= batch_size:
+                flush_pending()
+        else:
+            updates[point_id] = payload
+            if not duplicate:
+                stats["updated"] += 1
+            if len(updates) >= batch_size:
+                flush_updates()
         
-        vectors.append(embedding)
-        payloads.append(payload)
+        # Record the hash as soon as the point is queued, so duplicates after a flush are recognized
+        stored_hashes[point_id] = content_hash
         
-        # Upload in batches to avoid memory issues
-        if len(vectors) >= batch_size:
-            db.upload_batch(collection_name, vectors, payloads, start_id=total_uploaded)
-            total_uploaded += len(vectors)
-            vectors = []
-            payloads = []
+        processed += 1
+        if progress_callback is not None and processed % batch_size == 0:
+            progress_callback(processed, processed / max(time.monotonic() - start, 1e-9))
     
-    # Upload any remaining items
-    if vectors:
-        db.upload_batch(collection_name, vectors, payloads, start_id=total_uploaded)
-        total_uploaded += len(vectors)
+    if pending:
+        flush_pending()
+    if updates:
+        flush_updates()
+    if progress_callback is not None and processed % batch_size != 0:
+        progress_callback(processed, processed / max(time.monotonic() - start, 1e-9))
     
-    logger.info(f"Uploaded {total_uploaded} QA pairs to Qdrant.")
-    return total_uploaded
+    # Remove pairs that are no longer in the data
+    removed_ids = [point_id for point_id in stored_hashes if point_id not in seen_ids]
+    for batch in _batched(removed_ids, batch_size):
+        db.delete_points(collection_name, batch)
+    stats["deleted"] = len(removed_ids)
+    
+    logger.info(
+        f"Synced {collection_name}: {stats['added']} added, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['deleted']} deleted"
+    )
+    return stats
+
+
+def upsert_qa_pair(
+    db: QdrantDB,
+    model: Optional[EmbeddingModel],
+    collection_name: str,
+    question: str,
+    answer: str,
+    embedding=None
+) -> str:
+    """
+    Insert or replace a single QA pair.
+    
+    Args:
+        db (QdrantDB): Qdrant database client
+        model (Optional[EmbeddingModel]): Embedding model, unused if `embedding` is given
+        collection_name (str): Name of the collection
+        question (str): Question text
+        answer (str): Answer text
+        embedding: Precomputed embedding of the question, e.g. from a shared batcher
+        
+    Returns:
+        str: Point ID of the QA pair
+    """
+    payload = build_qa_payload({"question": question, "answer": answer})
+    if embedding is None:
+        embedding = model.get_embeddings([question])[0]
+    db.upload_batch(collection_name, [embedding.tolist()], [payload], ids=[payload["id"]])
+    return payload["id"]
 
 
 def load_qa_into_qdrant(
-    json_file_path: str, 
+    json_file_path: Union[str, TextIO], 
     db: QdrantDB,
     model: Optional[EmbeddingModel] = None,
     collection_name: str = "qa_collection",
     vector_size: int = 384,
-    show_progress: bool = True
+    show_progress: bool = True,
+    sync: bool = False,
+    keep_versions: int = 2,
+    embed_workers: int = 1,
+    embed_threads: Optional[int] = None,
+    storage: Optional[VectorStorage] = None,
+    progress_callback: Optional[Callable[[int, float], None]] = None
 ) -> Tuple[int, Dict]:
     """
     Load QA data into Qdrant.
     
+    `collection_name` is an alias. A full load builds a new versioned
+    collection in the background and switches the alias to it once the
+    upload is complete, so queries keep being served from the previous
+    version until then.
+    
     Args:
-        json_file_path (str): Path to the JSON file
+        json_file_path (Union[str, TextIO]): Path to the JSON or JSON Lines file, or the file opened in text mode
         db (QdrantDB): Qdrant database client
         model (Optional[EmbeddingModel]): Embedding model, created if None
-        collection_name (str): Name of the collection
+        collection_name (str): Name of the collection alias
         vector_size (int): Size of the embedding vectors
         show_progress (bool): Whether to show progress bar
+        sync (bool): Update the existing collection incrementally instead of rebuilding it
+        keep_versions (int): Number of most recent versions kept for rollback
+        embed_workers (int): Number of embedding processes for a full load
+        embed_threads (Optional[int]): Torch threads per embedding process, the cores
+            shared between the processes if None
+        storage (Optional[VectorStorage]): Vector storage and quantization of new versions
+        progress_callback (Optional[Callable[[int, float], None]]): Receives the number of QA
+            pairs processed so far and the throughput; raising from it aborts the load and, for
+            a full load, discards the new version
         
     Returns:
-        Tuple[int, Dict]: Number of QA pairs uploaded and collection info
+        Tuple[int, Dict]: Number of QA pairs uploaded (or written, in sync mode) and collection info
     """
-    # Load data
-    data = load_qa_data(json_file_path)
-    logger.info(f"Loaded {len(data)} QA pairs from {json_file_path}")
+    # Stream data so the file never has to fit in memory
+    data = iter_qa_data(json_file_path)
+    logger.info(f"Streaming QA pairs from {getattr(json_file_path, 'name', json_file_path)}")
     
     # Initialize embedding model if not provided
     if model is None:
         logger.info("Initializing embedding model...")
         model = EmbeddingModel()
     
-    # Create collection
-    db.create_collection(collection_name, vector_size=vector_size)
-    
-    # Process and upload data
-    total_uploaded = process_and_upload_data(
-        db, data, model, collection_name, show_progress=show_progress
-    )
+    if sync:
+        # Keep the collection online and only apply the differences
+        if not db.collection_exists(collection_name):
+            db.switch_alias(collection_name, db.create_version(collection_name, vector_size=vector_size, storage=storage))
+        stats = sync_qa_data(
+            db, data, model, collection_name,
+            show_progress=show_progress,
+            progress_callback=progress_callback
+        )
+        total_uploaded = stats["added"] + stats["updated"]
+    else:
+        # Build a shadow version while the alias keeps serving the current one
+        version_name = db.create_version(collection_name, vector_size=vector_size, storage=storage)
+        try:
+            total_uploaded = process_and_upload_data(
+                db, data, model, version_name,
+                show_progress=show_progress,
+                embed_workers=embed_workers,
+                embed_threads=embed_threads,
+                progress_callback=progress_callback
+            )
+        except Exception:
+            db.delete_collection(version_name)
+            raise
+        
+        if db.promote_version(collection_name, version_name):
+            db.prune_versions(collection_name, keep=keep_versions)
+        else:
+            # A load that started later already went live with newer data
+            db.delete_collection(version_name)
     
     # Get collection info
     collection_info = db.get_collection_info(collection_name)
     
-    return total_uploaded, collection_info
\ No newline at end of file
+    return total_uploaded, collection_info
@@ -0,0 +1,100 @@
+"""
+Incremental readers for JSON array and JSON Lines files.
+"""
+
+import json
+from typing import Any, Iterator, TextIO, Union
+
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_records(source: Union[str, TextIO], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the records of a JSON file one at a time.
+
+    Accepts either a top-level JSON array or JSON Lines (one value per line).
+    Only the record currently being parsed is held in memory.
+
+    Args:
+        source (Union[str, TextIO]): Path to the JSON or JSON Lines file, or the file
+            opened in text mode, which is read from its current position and left open
+        chunk_size (int): Number of characters read from disk at a time
+
+    Yields:
+        Any: Decoded records in file order
+    """
+    if not isinstance(source, str):
+        yield from _iter_records(source, chunk_size)
+        return
+    with open(source, 'r', encoding='utf-8') as f:
+        yield from _iter_records(f, chunk_size)
+
+
+def _iter_records(f, chunk_size: int) -> Iterator[Any]:
+    """Decode an open file as a JSON array or JSON Lines, whichever it holds."""
+    first = _peek_first_char(f)
+    if first is None:
+        return
+    if first == '[':
+        yield from _iter_array(f, chunk_size)
+    else:
+        yield from _iter_lines(f)
+
+
+def _peek_first_char(f):
+    """Return the first non-whitespace character and rewind the file."""
+    while True:
+        position = f.tell()
+        char = f.read(1)
+        if not char:
+            return None
+        if char not in _WHITESPACE and char != '﻿':
+            f.seek(position)
+            return char
+
+
+def _iter_lines(f) -> Iterator[Any]:
+    """Decode a JSON Lines file, skipping blank lines."""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}") from e
+
+
+def _iter_array(f, chunk_size: int) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array incrementally."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip(_WHITESPACE + '﻿')[1:]  # Drop the opening bracket
+    eof = False
+
+    while True:
+        # Skip separators between elements
+        buffer = buffer.lstrip(_WHITESPACE + ',')
+        if not buffer:
+            if eof:
+                raise ValueError("Unexpected end of file: JSON array is not closed")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = chunk
+            continue
+
+        if buffer[0] == ']':
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # The element is split across chunks, so read more and retry
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield record
+        buffer = buffer[end:]
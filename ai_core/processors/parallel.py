@@ -0,0 +1,124 @@
+"""
+Multi-process embedding for bulk ingestion.
+"""
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+
+import numpy as np
+
+from models import EmbeddingModel
+
+logger = logging.getLogger(__name__)
+
+# Model held by each worker process
+_worker_model = None
+
+
+def _init_worker(model_config: Dict[str, Any], num_threads: int):
+    """Load a private copy of the parent's model in a worker process with a pinned thread count."""
+    import torch
+
+    global _worker_model
+    torch.set_num_threads(num_threads)
+    _worker_model = EmbeddingModel(**model_config)
+
+
+def _embed_in_worker(texts: List[str]) -> np.ndarray:
+    """Embed a batch of texts with the worker's model."""
+    return _worker_model.get_embeddings(texts)
+
+
+class ParallelEmbedder:
+    """Shard embedding batches across a pool of worker processes."""
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        workers: int,
+        max_pending: int = None,
+        num_threads: Optional[int] = None
+    ):
+        """
+        Start the worker pool.
+
+        Args:
+            model (EmbeddingModel): Model whose configuration the workers load,
+                and whose persistent store is consulted in this process
+            workers (int): Number of worker processes
+            max_pending (int): Maximum number of batches in flight, 2 per worker if None
+            num_threads (Optional[int]): Torch threads per worker, the cores shared
+                between the workers if None
+        """
+        self.model = model
+        self.workers = workers
+        self.max_pending = max_pending or 2 * workers
+        num_threads = num_threads or max(1, (os.cpu_count() or 1) // workers)
+
+        # Spawn avoids inheriting the parent's torch thread pools
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(model.config(), num_threads)
+        )
+        logger.info(f"Started {workers} embedding workers with {num_threads} threads each")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the worker pool."""
+        self._pool.terminate()
+        self._pool.join()
+
+    def embed_batches(self, batches: Iterable[Tuple[Any, List[str]]]) -> Iterator[Tuple[Any, np.ndarray]]:
+        """
+        Embed batches in parallel and yield them in input order.
+
+        At most `max_pending` batches are read ahead, so streamed input stays streaming.
+
+        Args:
+            batches (Iterable[Tuple[Any, List[str]]]): Pairs of (tag, texts); the tag is passed through
+
+        Yields:
+            Tuple[Any, numpy.ndarray]: Pairs of (tag, embeddings) in input order
+        """
+        pending = deque()
+        for tag, texts in batches:
+            pending.append((tag, texts, self._submit(texts)))
+            if len(pending) >= self.max_pending:
+                yield self._collect(*pending.popleft())
+
+        while pending:
+            yield self._collect(*pending.popleft())
+
+    def _submit(self, texts: List[str]):
+        """Send the texts missing from the persistent store to a worker."""
+        store = self.model.store
+        stored = store.get_many(texts) if store is not None else [None] * len(texts)
+        missing = [i for i, vector in enumerate(stored) if vector is None]
+        result = self._pool.apply_async(_embed_in_worker, ([texts[i] for i in missing],)) if missing else None
+        return stored, missing, result
+
+    def _collect(self, tag: Any, texts: List[str], submitted) -> Tuple[Any, np.ndarray]:
+        """Wait for a submitted batch and merge it with the stored vectors."""
+        stored, missing, result = submitted
+        embeddings = np.empty((len(texts), self.model.dim), dtype=np.float32)
+        for i, vector in enumerate(stored):
+            if vector is not None:
+                embeddings[i] = vector
+
+        if result is not None:
+            computed = result.get()
+            embeddings[missing] = computed
+            if self.model.store is not None:
+                self.model.store.put_many([texts[i] for i in missing], computed)
+
+        return tag, embeddings
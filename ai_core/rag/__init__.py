@@ -3,6 +3,9 @@ RAG (Retrieval-Augmented Generation) subpackage for AI Core.
 """
 
 from .chain import RagChain
+from .context import ContextBuilder
+from .semantic_cache import SemanticCache
+from .registry import ChainRegistry, hash_api_key
 
-__all__ = ["RagChain"]
+__all__ = ["RagChain", "ContextBuilder", "SemanticCache", "ChainRegistry", "hash_api_key"]
 
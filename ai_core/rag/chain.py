@@ -2,7 +2,8 @@
 RAG (Retrieval-Augmented Generation) chain implementation.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+import asyncio
 import logging
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema import StrOutputParser
@@ -11,12 +12,22 @@ from langchain.schema.runnable import RunnablePassthrough
 from database import QdrantDB
 from models import EmbeddingModel
 from llm import LLMClient
+from monitoring import track_stage, record_answer, record_error
+from .context import ContextBuilder
 
 logger = logging.getLogger(__name__)
 
 class RagChain:
     """Class for building and executing RAG chains."""
     
+    # Answer returned when the chain fails
+    ERROR_MESSAGE = "I'm sorry, I couldn't generate an answer due to an error."
+    
+    # Paths that can serve an answer
+    SOURCE_DIRECT = "direct"
+    SOURCE_LLM = "llm"
+    SOURCE_ERROR = "error"
+    
     # Default RAG prompt template
     DEFAULT_PROMPT_TEMPLATE = """You are a helpful banking assistant. Use the following retrieved information to answer the user's question.
 If you don't know the answer, just say that you don't know, don't try to make up an answer.
@@ -36,7 +47,10 @@ Your answer should be helpful, concise, accurate, and friendly.
         llm_client: LLMClient,
         collection_name: str = "qa_collection",
         prompt_template: Optional[str] = None,
-        top_k: int = 3
+        top_k: int = 3,
+        direct_answer_threshold: Optional[float] = None,
+        direct_answer_margin: float = 0.0,
+        context_builder: Optional[ContextBuilder] = None
     ):
         """
         Initialize the RAG chain.
@@ -48,12 +62,21 @@ Your answer should be helpful, concise, accurate, and friendly.
             collection_name (str): Name of the collection to query
             prompt_template (Optional[str]): Custom prompt template
             top_k (int): Number of documents to retrieve
+            direct_answer_threshold (Optional[float]): Return the stored answer of the top hit
+                without calling the LLM when it scores at least this much, disabled if None
+            direct_answer_margin (float): Minimum score lead of the top hit over the runner-up
+                for a direct answer
+            context_builder (Optional[ContextBuilder]): Selects and formats retrieved contexts
+                for the prompt, without a token budget if None
         """
         self.db = db
         self.embedding_model = embedding_model
         self.llm_client = llm_client
         self.collection_name = collection_name
         self.top_k = top_k
+        self.direct_answer_threshold = direct_answer_threshold
+        self.direct_answer_margin = direct_answer_margin
+        self.context_builder = context_builder or ContextBuilder()
         
         # Set prompt template
         template = prompt_template if prompt_template else self.DEFAULT_PROMPT_TEMPLATE
@@ -74,9 +97,46 @@ Your answer should be helpful, concise, accurate, and friendly.
         Returns:
             List[Dict[str, Any]]: List of relevant context items
         """
-        # Generate embedding for the query
-        query_vector = self.embedding_model.get_embedding(query)
+        with track_stage("retrieve"):
+            # Generate embedding for the query
+            with track_stage("query_embed"):
+                query_vector = self.embedding_model.get_embedding(query)
+            
+            return self._search(query_vector)
+    
+    async def _aretrieve_context(self, query: str, query_vector=None) -> List[Dict[str, Any]]:
+        """
+        Retrieve relevant context without blocking the event loop.
+        
+        Args:
+            query (str): User query
+            query_vector: Precomputed query embedding, embedded here if None
+            
+        Returns:
+            List[Dict[str, Any]]: List of relevant context items
+        """
+        with track_stage("retrieve"):
+            if query_vector is None:
+                # Prefer the async batcher interface, otherwise offload to a thread
+                embed = getattr(self.embedding_model, "embed", None)
+                with track_stage("query_embed"):
+                    if embed is not None and asyncio.iscoroutinefunction(embed):
+                        query_vector = await embed(query)
+                    else:
+                        query_vector = await asyncio.to_thread(self.embedding_model.get_embedding, query)
+            
+            return await asyncio.to_thread(self._search, query_vector)
+    
+    def _search(self, query_vector) -> List[Dict[str, Any]]:
+        """
+        Search Qdrant with a query embedding and format the hits.
         
+        Args:
+            query_vector: Query embedding
+            
+        Returns:
+            List[Dict[str, Any]]: List of relevant context items
+        """
         # Search in Qdrant
         search_results = self.db.search(
             collection_name=self.collection_name,
@@ -84,7 +144,19 @@ Your answer should be helpful, concise, accurate, and friendly.
             limit=self.top_k
         )
         
-        # Format the results
+        return self._hits_to_contexts(search_results)
+    
+    @staticmethod
+    def _hits_to_contexts(search_results) -> List[Dict[str, Any]]:
+        """
+        Convert Qdrant search hits into context items.
+        
+        Args:
+            search_results: Scored points returned by Qdrant
+            
+        Returns:
+            List[Dict[str, Any]]: List of context items
+        """
         contexts = []
         for hit in search_results:
             contexts.append({
@@ -95,9 +167,29 @@ Your answer should be helpful, concise, accurate, and friendly.
         
         return contexts
     
+    def _direct_answer(self, contexts: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Get the stored answer of a confident top hit.
+        
+        Args:
+            contexts (List[Dict[str, Any]]): Retrieved context items, best first
+            
+        Returns:
+            Optional[str]: Stored answer, or None if the LLM should answer
+        """
+        if self.direct_answer_threshold is None or not contexts:
+            return None
+        
+        top = contexts[0]
+        if top["score"] < self.direct_answer_threshold or not top["answer"]:
+            return None
+        if len(contexts) > 1 and top["score"] - contexts[1]["score"] < self.direct_answer_margin:
+            return None
+        return top["answer"]
+    
     def _format_context(self, contexts: List[Dict[str, Any]]) -> str:
         """
-        Format context for the prompt.
+        Format context for the prompt within the context builder's token budget.
         
         Args:
             contexts (List[Dict[str, Any]]): List of context items
@@ -105,12 +197,8 @@ Your answer should be helpful, concise, accurate, and friendly.
         Returns:
             str: Formatted context
         """
-        formatted_contexts = []
-        for i, ctx in enumerate(contexts, 1):
-            formatted_contexts.append(
-                f"[Context {i}]\nQuestion: {ctx['question']}\nAnswer: {ctx['answer']}\nRelevance Score: {ctx['score']:.4f}"
-            )
-        return "\n\n".join(formatted_contexts)
+        with track_stage("prompt"):
+            return self.context_builder.build(contexts)
     
     def _build_chain(self):
         """Build the RAG chain with LangChain."""
@@ -126,23 +214,36 @@ Your answer should be helpful, concise, accurate, and friendly.
             | self.prompt
         )
         
-        # Add a custom formatting step to handle message format conversion
-        def format_for_llm(langchain_messages):
-            if isinstance(langchain_messages, list) and len(langchain_messages) > 0:
-                # Extract the content from LangChain messages
-                content = langchain_messages[0].content if hasattr(langchain_messages[0], 'content') else str(langchain_messages[0])
-                return [{"role": "user", "content": content}]
-            else:
-                return [{"role": "user", "content": str(langchain_messages)}]
-        
         # Complete the chain with the LLM call
         self.chain = (
             rag_chain
-            | format_for_llm
+            | self._format_for_llm
             | self.llm_client.generate_answer
             | StrOutputParser()
         )
     
+    @staticmethod
+    def _format_for_llm(langchain_messages) -> List[Dict[str, str]]:
+        """
+        Convert the rendered prompt into the message format expected by the LLM client.
+        
+        Args:
+            langchain_messages: Prompt value or list of LangChain messages
+            
+        Returns:
+            List[Dict[str, str]]: Formatted messages
+        """
+        # Unwrap the ChatPromptValue produced by the prompt template
+        if hasattr(langchain_messages, 'to_messages'):
+            langchain_messages = langchain_messages.to_messages()
+        
+        if isinstance(langchain_messages, list) and len(langchain_messages) > 0:
+            # Extract the content from LangChain messages
+            content = langchain_messages[0].content if hasattr(langchain_messages[0], 'content') else str(langchain_messages[0])
+            return [{"role": "user", "content": content}]
+        else:
+            return [{"role": "user", "content": str(langchain_messages)}]
+    
     def answer(self, query: str) -> str:
         """
         Answer a query using the RAG chain.
@@ -154,7 +255,177 @@ Your answer should be helpful, concise, accurate, and friendly.
             str: Generated answer
         """
         try:
-            return self.chain.invoke(query)
+            if self.direct_answer_threshold is None:
+                return self.chain.invoke(query)
+            
+            # Retrieve once and only call the LLM if no hit is confident enough
+            contexts = self._retrieve_context(query)
+            direct = self._direct_answer(contexts)
+            if direct is not None:
+                return direct
+            messages = self.prompt.format_messages(
+                context=self._format_context(contexts),
+                question=query
+            )
+            return self.llm_client.generate_answer(self._format_for_llm(messages))
         except Exception as e:
             logger.error(f"Error answering query: {str(e)}")
-            return "I'm sorry, I couldn't generate an answer due to an error."
+            return self.ERROR_MESSAGE
+    
+    async def aanswer(self, query: str, query_vector=None) -> str:
+        """
+        Answer a query asynchronously.
+        
+        Embedding and search are offloaded from the event loop and the LLM
+        call is awaited on the async client.
+        
+        Args:
+            query (str): User query
+            query_vector: Precomputed query embedding, embedded here if None
+            
+        Returns:
+            str: Generated answer
+        """
+        result = await self.aanswer_with_source(query, query_vector)
+        return result["answer"]
+    
+    async def aanswer_with_source(self, query: str, query_vector=None) -> Dict[str, Any]:
+        """
+        Answer a query asynchronously and report which path served it.
+        
+        Args:
+            query (str): User query
+            query_vector: Precomputed query embedding, embedded here if None
+            
+        Returns:
+            Dict[str, Any]: "answer" and "source", one of SOURCE_DIRECT, SOURCE_LLM or SOURCE_ERROR
+        """
+        try:
+            with track_stage("rag_answer"):
+                contexts = await self._aretrieve_context(query, query_vector)
+                direct = self._direct_answer(contexts)
+                if direct is not None:
+                    result = {"answer": direct, "source": self.SOURCE_DIRECT}
+                else:
+                    messages = self.prompt.format_messages(
+                        context=self._format_context(contexts),
+                        question=query
+                    )
+                    answer = await self.llm_client.agenerate_answer(self._format_for_llm(messages), raise_on_error=True)
+                    result = {"answer": answer, "source": self.SOURCE_LLM}
+        except Exception as e:
+            logger.error(f"Error answering query: {str(e)}")
+            result = {"answer": self.ERROR_MESSAGE, "source": self.SOURCE_ERROR}
+        
+        record_answer(result["source"])
+        return result
+    
+    async def astream_answer(self, query: str, query_vector=None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer a query asynchronously, streaming the result as events.
+        
+        The first event carries the retrieved contexts and the serving path,
+        followed by one event per generated text fragment. A direct answer
+        arrives as a single fragment. A failure ends the stream with an
+        "error" event carrying ERROR_MESSAGE, possibly after some fragments.
+        The answer source is recorded once the stream has ended.
+        
+        Args:
+            query (str): User query
+            query_vector: Precomputed query embedding, embedded here if None
+            
+        Yields:
+            Dict[str, Any]: Events of type "contexts", "token" or "error"
+        """
+        try:
+            contexts = await self._aretrieve_context(query, query_vector)
+        except Exception as e:
+            logger.error(f"Error answering query: {str(e)}")
+            record_answer(self.SOURCE_ERROR)
+            yield {"type": "error", "text": self.ERROR_MESSAGE}
+            return
+        
+        direct = self._direct_answer(contexts)
+        if direct is not None:
+            yield {"type": "contexts", "contexts": contexts, "source": self.SOURCE_DIRECT}
+            yield {"type": "token", "text": direct}
+            record_answer(self.SOURCE_DIRECT)
+            return
+        
+        yield {"type": "contexts", "contexts": contexts, "source": self.SOURCE_LLM}
+        
+        messages = self.prompt.format_messages(
+            context=self._format_context(contexts),
+            question=query
+        )
+        try:
+            async for token in self.llm_client.astream_answer(self._format_for_llm(messages), raise_on_error=True):
+                yield {"type": "token", "text": token}
+        except Exception as e:
+            logger.error(f"Error streaming answer: {str(e)}")
+            record_answer(self.SOURCE_ERROR)
+            yield {"type": "error", "text": self.ERROR_MESSAGE}
+            return
+        # Only a stream that ran to the end counts as answered by the LLM
+        record_answer(self.SOURCE_LLM)
+    
+    async def aanswer_batch(
+        self,
+        queries: List[str],
+        query_vectors=None,
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer many queries with one batched embedding pass and one batch search.
+        
+        Confident hits are answered directly; the remaining LLM calls are fanned
+        out with at most `max_concurrency` in flight. A failing query is
+        reported in its own result instead of failing the batch.
+        
+        Args:
+            queries (List[str]): User queries
+            query_vectors: Precomputed query embeddings, embedded here if None
+            max_concurrency (int): Maximum number of concurrent LLM calls
+            
+        Returns:
+            List[Dict[str, Any]]: One result per query, in order, with "answer", "source" and "error" keys
+        """
+        if not queries:
+            return []
+        
+        if query_vectors is None:
+            query_vectors = await asyncio.to_thread(self.embedding_model.get_embeddings, queries)
+        
+        search_results = await asyncio.to_thread(
+            self.db.search_batch, self.collection_name, query_vectors, self.top_k
+        )
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def answer_one(query: str, hits) -> Dict[str, Any]:
+            contexts = self._hits_to_contexts(hits)
+            direct = self._direct_answer(contexts)
+            if direct is not None:
+                record_answer(self.SOURCE_DIRECT)
+                return {"answer": direct, "source": self.SOURCE_DIRECT, "error": None}
+            
+            async with semaphore:
+                try:
+                    messages = self.prompt.format_messages(
+                        context=self._format_context(contexts),
+                        question=query
+                    )
+                    answer = await self.llm_client.agenerate_answer(
+                        self._format_for_llm(messages), raise_on_error=True
+                    )
+                    record_answer(self.SOURCE_LLM)
+                    return {"answer": answer, "source": self.SOURCE_LLM, "error": None}
+                except Exception as e:
+                    logger.error(f"Error answering query: {str(e)}")
+                    record_error("rag_answer", e)
+                    record_answer(self.SOURCE_ERROR)
+                    return {"answer": None, "source": self.SOURCE_ERROR, "error": str(e)}
+        
+        return await asyncio.gather(
+            *(answer_one(query, hits) for query, hits in zip(queries, search_results))
+        )
@@ -0,0 +1,216 @@
+"""
+Token-budgeted assembly of retrieved contexts into prompt text.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters per token assumed when the model's tokenizer is unavailable
+CHARS_PER_TOKEN = 4
+
+# Maximum number of tokenizers kept loaded
+MAX_TOKENIZERS = 16
+
+# Seconds before a tokenizer that failed to load is tried again
+TOKENIZER_RETRY_SECONDS = 300.0
+
+_tokenizers: "OrderedDict[str, Any]" = OrderedDict()
+_tokenizer_failures: Dict[str, float] = {}
+_tokenizer_lock = threading.Lock()
+
+
+def _cached_tokenizer(model_name: str):
+    """Get an already loaded tokenizer without blocking, or None."""
+    with _tokenizer_lock:
+        tokenizer = _tokenizers.get(model_name)
+        if tokenizer is not None:
+            _tokenizers.move_to_end(model_name)
+        return tokenizer
+
+
+def _load_tokenizer(model_name: str):
+    """
+    Load and share the tokenizer of a model, or None if it cannot be loaded.
+
+    This may download from the Hugging Face Hub, so it must not run on the
+    event loop. Failures are not cached; loading is retried once
+    TOKENIZER_RETRY_SECONDS have passed.
+    """
+    tokenizer = _cached_tokenizer(model_name)
+    if tokenizer is not None:
+        return tokenizer
+    with _tokenizer_lock:
+        failed_at = _tokenizer_failures.get(model_name)
+    if failed_at is not None and time.monotonic() - failed_at < TOKENIZER_RETRY_SECONDS:
+        return None
+
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+    except Exception as e:
+        logger.warning(
+            f"Could not load tokenizer for {model_name}, estimating {CHARS_PER_TOKEN} characters per token: {str(e)}"
+        )
+        with _tokenizer_lock:
+            _tokenizer_failures[model_name] = time.monotonic()
+        return None
+
+    with _tokenizer_lock:
+        _tokenizer_failures.pop(model_name, None)
+        _tokenizers[model_name] = tokenizer
+        while len(_tokenizers) > MAX_TOKENIZERS:
+            _tokenizers.popitem(last=False)
+    return tokenizer
+
+
+def _word_set(text: str) -> frozenset:
+    """Lowercased words of a text."""
+    return frozenset(re.findall(r"\w+", text.lower()))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two word sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class ContextBuilder:
+    """Select retrieved contexts and format them within a token budget."""
+
+    def __init__(
+        self,
+        tokenizer_name: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        min_score: Optional[float] = None,
+        max_similarity: Optional[float] = None,
+        include_scores: bool = False
+    ):
+        """
+        Initialize the context builder.
+
+        Args:
+            tokenizer_name (Optional[str]): Hugging Face model whose tokenizer counts tokens once
+                `load_tokenizer` has loaded it, a character estimate is used until then
+            max_tokens (Optional[int]): Token budget of the formatted context, unlimited if None
+            min_score (Optional[float]): Drop hits scoring below this
+            max_similarity (Optional[float]): Drop hits whose answer has a word-level Jaccard
+                similarity above this with an answer already kept
+            include_scores (bool): Add a relevance score line to each context
+        """
+        self.tokenizer_name = tokenizer_name
+        self.max_tokens = max_tokens
+        self.min_score = min_score
+        self.max_similarity = max_similarity
+        self.include_scores = include_scores
+
+    @property
+    def tokenizer(self):
+        """Tokenizer of the target model if already loaded, None when estimating."""
+        return _cached_tokenizer(self.tokenizer_name) if self.tokenizer_name else None
+
+    def load_tokenizer(self):
+        """
+        Load the tokenizer of the target model so token counts stop being estimated.
+
+        Blocking, possibly on a download, so call it off the event loop. A
+        failed load is retried on a later call once the retry interval has passed.
+
+        Returns:
+            Tokenizer, or None if it could not be loaded
+        """
+        return _load_tokenizer(self.tokenizer_name) if self.tokenizer_name else None
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text for the target model.
+
+        Args:
+            text (str): Text to count
+
+        Returns:
+            int: Number of tokens
+        """
+        tokenizer = self.tokenizer
+        if tokenizer is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def select(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop low-scoring and near-duplicate contexts.
+
+        Args:
+            contexts (List[Dict[str, Any]]): Retrieved contexts, best first
+
+        Returns:
+            List[Dict[str, Any]]: Contexts to keep, in order
+        """
+        kept = []
+        kept_words = []
+        for ctx in contexts:
+            if self.min_score is not None and ctx["score"] < self.min_score:
+                continue
+            if self.max_similarity is not None:
+                words = _word_set(ctx["answer"])
+                if any(_jaccard(words, other) > self.max_similarity for other in kept_words):
+                    continue
+                kept_words.append(words)
+            kept.append(ctx)
+        return kept
+
+    def build(self, contexts: List[Dict[str, Any]]) -> str:
+        """
+        Format the selected contexts, filling up to the token budget.
+
+        Contexts are added best first; one that does not fit is skipped in
+        favour of smaller ones further down. If even the best context does
+        not fit, its answer is truncated to the budget.
+
+        Args:
+            contexts (List[Dict[str, Any]]): Retrieved contexts, best first
+
+        Returns:
+            str: Formatted context
+        """
+        separator = "\n\n"
+        separator_tokens = self.count_tokens(separator) if self.max_tokens is not None else 0
+
+        blocks = []
+        used = 0
+        for ctx in self.select(contexts):
+            block = self._format_block(len(blocks) + 1, ctx)
+            if self.max_tokens is None:
+                blocks.append(block)
+                continue
+
+            cost = self.count_tokens(block) + (separator_tokens if blocks else 0)
+            if used + cost <= self.max_tokens:
+                blocks.append(block)
+                used += cost
+            elif not blocks:
+                blocks.append(self._truncate(block, self.max_tokens))
+                used = self.max_tokens
+
+        return separator.join(blocks)
+
+    def _format_block(self, index: int, ctx: Dict[str, Any]) -> str:
+        """Format one context."""
+        block = f"[Context {index}]\nQuestion: {ctx['question']}\nAnswer: {ctx['answer']}"
+        if self.include_scores:
+            block += f"\nRelevance Score: {ctx['score']:.4f}"
+        return block
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text down to a number of tokens."""
+        tokenizer = self.tokenizer
+        if tokenizer is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+        ids = tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+        return tokenizer.decode(ids)
@@ -0,0 +1,218 @@
+"""
+Registry of warm LLM clients and RAG chains shared across requests.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from database import QdrantDB
+from llm import LLMClient
+from .chain import RagChain
+from .context import ContextBuilder
+
+logger = logging.getLogger(__name__)
+
+
+def hash_api_key(api_key: Optional[str]) -> str:
+    """
+    Hash an API key so it can be used in a cache key without being stored.
+
+    Args:
+        api_key (Optional[str]): API key
+
+    Returns:
+        str: Hex digest, or an empty string when no key is given
+    """
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class ChainRegistry:
+    """Bounded LRU registry of LLM clients and RAG chains."""
+
+    def __init__(
+        self,
+        max_clients: int = 16,
+        max_chains: int = 64,
+        context_max_tokens: Optional[int] = None,
+        context_min_score: Optional[float] = None,
+        context_max_similarity: Optional[float] = None,
+        llm_base_url: Optional[str] = None
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_clients (int): Maximum number of cached LLM clients
+            max_chains (int): Maximum number of cached RAG chains
+            context_max_tokens (Optional[int]): Token budget of the prompt context, unlimited if None
+            context_min_score (Optional[float]): Drop retrieved hits scoring below this
+            context_max_similarity (Optional[float]): Drop retrieved hits too similar to ones already kept
+            llm_base_url (Optional[str]): OpenAI-compatible server used for every LLM client instead of the provider
+        """
+        self.max_clients = max_clients
+        self.max_chains = max_chains
+        self.context_max_tokens = context_max_tokens
+        self.context_min_score = context_min_score
+        self.context_max_similarity = context_max_similarity
+        self.llm_base_url = llm_base_url
+        self._clients: "OrderedDict[Tuple, LLMClient]" = OrderedDict()
+        self._chains: "OrderedDict[Tuple, RagChain]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_llm_client(self, provider: str, api_key: Optional[str], model_name: str) -> LLMClient:
+        """
+        Get a warm LLM client, creating it on first use.
+
+        Args:
+            provider (str): Provider name for the Hugging Face Inference API
+            api_key (Optional[str]): API key for authentication
+            model_name (str): Name of the model to use
+
+        Returns:
+            LLMClient: Shared LLM client
+        """
+        key = (provider, model_name, hash_api_key(api_key))
+        with self._lock:
+            client = self._get(self._clients, key)
+            if client is None:
+                client = LLMClient(
+                    provider=provider,
+                    api_key=api_key,
+                    model_name=model_name,
+                    base_url=self.llm_base_url
+                )
+                self._put(self._clients, key, client, self.max_clients)
+            return client
+
+    def get_chain(
+        self,
+        db: QdrantDB,
+        embedding_model,
+        provider: str,
+        api_key: Optional[str],
+        model_name: str,
+        collection_name: str,
+        top_k: int,
+        db_url: Optional[str] = None,
+        direct_answer_threshold: Optional[float] = None,
+        direct_answer_margin: float = 0.0
+    ) -> RagChain:
+        """
+        Get a warm RAG chain, creating it on first use.
+        
+        This may load a tokenizer, so call it off the event loop.
+
+        Args:
+            db (QdrantDB): Qdrant database client used if the chain is created
+            embedding_model: Embedding model used if the chain is created
+            provider (str): Provider name for the Hugging Face Inference API
+            api_key (Optional[str]): API key for authentication
+            model_name (str): Name of the LLM model
+            collection_name (str): Name of the collection to query
+            top_k (int): Number of documents to retrieve
+            db_url (Optional[str]): URL of the Qdrant server, None for the default one
+            direct_answer_threshold (Optional[float]): Top-hit score above which the stored answer
+                is returned without calling the LLM, disabled if None
+            direct_answer_margin (float): Minimum score lead of the top hit over the runner-up
+
+        Returns:
+            RagChain: Shared RAG chain
+        """
+        key = (
+            provider, model_name, hash_api_key(api_key), collection_name, top_k, db_url or "",
+            direct_answer_threshold, direct_answer_margin
+        )
+        with self._lock:
+            chain = self._get(self._chains, key)
+        if chain is not None:
+            # Retries a tokenizer that failed to load before; a no-op once it is loaded
+            chain.context_builder.load_tokenizer()
+            return chain
+
+        # Build outside the lock; the client lookup takes it again
+        llm_client = self.get_llm_client(provider, api_key, model_name)
+        chain = RagChain(
+            db=db,
+            embedding_model=embedding_model,
+            llm_client=llm_client,
+            collection_name=collection_name,
+            top_k=top_k,
+            direct_answer_threshold=direct_answer_threshold,
+            direct_answer_margin=direct_answer_margin,
+            # Count tokens with the tokenizer of the model the prompt is sent to
+            context_builder=ContextBuilder(
+                tokenizer_name=model_name,
+                max_tokens=self.context_max_tokens,
+                min_score=self.context_min_score,
+                max_similarity=self.context_max_similarity
+            )
+        )
+        chain.context_builder.load_tokenizer()
+
+        with self._lock:
+            existing = self._get(self._chains, key)
+            if existing is not None:
+                return existing
+            self._put(self._chains, key, chain, self.max_chains)
+            return chain
+
+    async def aclose(self):
+        """
+        Close the HTTP sessions of the cached LLM clients and drop every entry.
+
+        Clients already evicted but still used by a cached chain are closed too;
+        other evicted clients close their session once they are unreferenced.
+        """
+        with self._lock:
+            clients = {id(client): client for client in self._clients.values()}
+            clients.update((id(chain.llm_client), chain.llm_client) for chain in self._chains.values())
+            self._clients.clear()
+            self._chains.clear()
+        for client in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing LLM client for model {client.model_name}: {str(e)}")
+
+    def clear(self):
+        """Drop all cached clients and chains."""
+        with self._lock:
+            self._clients.clear()
+            self._chains.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dict[str, Any]: Number of cached clients and chains with their limits
+        """
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "max_clients": self.max_clients,
+                "chains": len(self._chains),
+                "max_chains": self.max_chains
+            }
+
+    @staticmethod
+    def _get(entries: OrderedDict, key: Tuple):
+        """Look up an entry and mark it as recently used."""
+        value = entries.get(key)
+        if value is not None:
+            entries.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _put(entries: OrderedDict, key: Tuple, value, max_size: int):
+        """Insert an entry, evicting the least recently used ones past the limit."""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max(1, max_size):
+            evicted_key, _ = entries.popitem(last=False)
+            logger.info(f"Evicted cached entry for model {evicted_key[1]}")
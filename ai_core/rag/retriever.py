@@ -5,8 +5,9 @@ Retrieval functionality for RAG pipeline.
 from typing import List, Dict, Any, Optional
 import logging
 
-from ai_core.database import QdrantDB
-from ai_core.models import EmbeddingModel
+from database import QdrantDB, create_vector_db
+from models import EmbeddingModel
+from .context import ContextBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,8 @@ class VectorRetriever:
         db: Optional[QdrantDB] = None,
         embedding_model: Optional[EmbeddingModel] = None,
         collection_name: str = "qa_collection",
-        db_url: str = "http://localhost:6333"
+        db_url: str = "http://localhost:6333",
+        context_builder: Optional[ContextBuilder] = None
     ):
         """
         Initialize the vector retriever.
@@ -28,14 +30,16 @@ class VectorRetriever:
             embedding_model (Optional[EmbeddingModel]): Embedding model
             collection_name (str): Name of the collection
             db_url (str): URL of the Qdrant server
+            context_builder (Optional[ContextBuilder]): Selects and formats retrieved contexts
         """
         # Initialize database client if not provided
-        self.db = db if db else QdrantDB(url=db_url)
+        self.db = db if db else create_vector_db(db_url)
         
         # Initialize embedding model if not provided
         self.model = embedding_model if embedding_model else EmbeddingModel()
         
         self.collection_name = collection_name
+        self.context_builder = context_builder or ContextBuilder()
         logger.info(f"Vector retriever initialized with collection: {collection_name}")
     
     def retrieve(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
@@ -81,9 +85,4 @@ class VectorRetriever:
         Returns:
             str: Formatted context string
         """
-        formatted_contexts = []
-        for i, ctx in enumerate(contexts, 1):
-            formatted_contexts.append(
-                f"[Context {i}]\nQuestion: {ctx['question']}\nAnswer: {ctx['answer']}\nRelevance Score: {ctx['score']:.4f}"
-            )
-        return "\n\n".join(formatted_contexts)
\ No newline at end of file
+        return self.context_builder.build(contexts)
\ No newline at end of file
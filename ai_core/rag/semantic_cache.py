@@ -0,0 +1,164 @@
+"""
+Semantic answer cache for RAG responses.
+"""
+
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from monitoring import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Capped in-process cache that serves answers for paraphrased queries.
+
+    Answers are only shared between requests with the same collection, model
+    and answer settings, such as the number of retrieved documents and the
+    provider and API key the answer was generated with.
+    """
+
+    def __init__(self, max_entries: int = 1000, threshold: float = 0.95):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            max_entries (int): Maximum number of cached answers across all collections
+            threshold (float): Minimum cosine similarity for a query to count as a hit
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._ids = itertools.count()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._by_key: Dict[Tuple[str, str, Tuple], Dict[int, None]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, collection: str, model: str, query_vector, settings: Tuple = ()) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a semantically similar query.
+
+        Args:
+            collection (str): Name of the collection the answer was retrieved from
+            model (str): Name of the LLM that generated the answer
+            query_vector: Embedding of the new query
+            settings (Tuple): Other settings the answer depends on, compared for equality
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached query, answer and similarity, or None on a miss
+        """
+        vector = self._normalize(query_vector)
+        with self._lock:
+            entry_ids = list(self._by_key.get((collection, model, settings), ()))
+            if not entry_ids:
+                self.misses += 1
+                record_cache("semantic", misses=1)
+                return None
+
+            matrix = np.stack([self._entries[entry_id]["vector"] for entry_id in entry_ids])
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                record_cache("semantic", misses=1)
+                return None
+
+            entry_id = entry_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            record_cache("semantic", hits=1)
+            entry = self._entries[entry_id]
+            return {
+                "query": entry["query"],
+                "answer": entry["answer"],
+                "similarity": float(similarities[best])
+            }
+
+    def store(self, collection: str, model: str, query: str, query_vector, answer: str, settings: Tuple = ()):
+        """
+        Cache an answer, evicting the least recently used entry if full.
+
+        Args:
+            collection (str): Name of the collection the answer was retrieved from
+            model (str): Name of the LLM that generated the answer
+            query (str): The query text
+            query_vector: Embedding of the query
+            answer (str): The generated answer
+            settings (Tuple): Other settings the answer depends on, as passed to `lookup`
+        """
+        if self.max_entries <= 0:
+            return
+
+        key = (collection, model, settings)
+        vector = self._normalize(query_vector)
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = {"key": key, "query": query, "vector": vector, "answer": answer}
+            self._by_key.setdefault(key, {})[entry_id] = None
+
+            while len(self._entries) > self.max_entries:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._discard(evicted["key"], evicted_id)
+
+    def invalidate(self, collection: str) -> int:
+        """
+        Drop every cached answer for a collection.
+
+        Args:
+            collection (str): Name of the collection
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._by_key if key[0] == collection]
+            removed = 0
+            for key in keys:
+                for entry_id in self._by_key.pop(key):
+                    del self._entries[entry_id]
+                    removed += 1
+
+        if removed:
+            logger.info(f"Invalidated {removed} cached answers for collection: {collection}")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Size, capacity, threshold, hit and miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _discard(self, key: Tuple[str, str, Tuple], entry_id: int):
+        """Remove an entry ID from the per-key index."""
+        ids = self._by_key.get(key)
+        if ids is None:
+            return
+        ids.pop(entry_id, None)
+        if not ids:
+            del self._by_key[key]
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        """Convert a vector to a unit-length float32 array."""
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -10,16 +10,21 @@ setup(
     install_requires=[
         "fastapi>=0.68.0",
         "uvicorn>=0.15.0",
-        "qdrant-client>=1.1.1",
+        "qdrant-client>=1.7.0",
         "numpy>=1.21.0",
         "transformers>=4.20.0",
         "torch>=1.10.0",
         "tqdm>=4.62.0",
         "python-multipart>=0.0.5",
-        "huggingface-hub>=0.19.0",
+        "huggingface-hub>=1.0.0",
         "langchain>=0.1.0",
         "rich>=13.0.0",
+        "prometheus-client>=0.17.0",
     ],
+    extras_require={
+        "onnx": ["onnx>=1.14.0", "onnxruntime>=1.16.0"],
+        "test": ["pytest>=7.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "ai-core=ai_core.main:main",
@@ -0,0 +1,11 @@
+"""
+Shared pytest configuration.
+
+The modules import each other as top-level packages (`database`, `models`,
+...), so the package directory is put on the path the way the server runs.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,112 @@
+"""
+Tests for the embedding micro-batcher.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from models.batcher import EmbeddingBatcher
+
+
+class FakeModel:
+    model_name = "fake"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def get_embeddings(self, texts, batch_size=32):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+    def get_embedding(self, text):
+        return self.get_embeddings([text])[0]
+
+
+def test_concurrent_requests_share_one_batch():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 5)))
+        finally:
+            await batcher.stop()
+
+    vectors = asyncio.run(run())
+    assert [vector[0] for vector in vectors] == [1.0, 2.0, 3.0, 4.0]
+    assert model.batches == [["x", "xx", "xxx", "xxxx"]]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=2, max_wait_ms=50)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(batcher.embed(str(n)) for n in range(5)))
+        finally:
+            await batcher.stop()
+
+    asyncio.run(run())
+    assert [len(batch) for batch in model.batches] == [2, 2, 1]
+
+
+def test_model_errors_fail_every_caller_in_the_batch():
+    batcher = EmbeddingBatcher(FakeModel(fail=True), max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        try:
+            return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_get_embedding_from_worker_thread_goes_through_the_loop():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=1)
+    results = []
+
+    async def run():
+        await batcher.embed("warm")
+        thread = threading.Thread(target=lambda: results.append(batcher.get_embedding("abc")))
+        thread.start()
+        await asyncio.to_thread(thread.join)
+        await batcher.stop()
+
+    asyncio.run(run())
+    assert results[0][0] == 3.0
+    assert model.batches == [["warm"], ["abc"]]
+
+
+def test_get_embedding_without_a_loop_uses_the_model():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model)
+
+    assert batcher.get_embedding("abcd")[0] == 4.0
+    assert model.batches == [["abcd"]]
+
+
+def test_stop_fails_pending_requests():
+    batcher = EmbeddingBatcher(FakeModel(), max_batch_size=4, max_wait_ms=1000)
+
+    async def run():
+        batcher._ensure_started()
+        # Leave a request in the queue that the worker never picks up
+        batcher._worker.cancel()
+        future = batcher._loop.create_future()
+        await batcher._queue.put(("pending", future))
+        await batcher.stop()
+        return future
+
+    future = asyncio.run(run())
+    with pytest.raises(RuntimeError, match="stopped"):
+        future.result()
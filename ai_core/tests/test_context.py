@@ -0,0 +1,98 @@
+"""
+Tests for token-budgeted context assembly.
+"""
+
+from rag import context as context_module
+from rag.context import ContextBuilder, CHARS_PER_TOKEN
+
+
+def _ctx(question, answer, score=0.9):
+    return {"question": question, "answer": answer, "score": score}
+
+
+def _tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def test_without_budget_keeps_every_context():
+    builder = ContextBuilder()
+    text = builder.build([_ctx("q1", "a1"), _ctx("q2", "a2")])
+
+    assert text == "[Context 1]\nQuestion: q1\nAnswer: a1\n\n[Context 2]\nQuestion: q2\nAnswer: a2"
+
+
+def test_include_scores():
+    text = ContextBuilder(include_scores=True).build([_ctx("q", "a", score=0.51234)])
+    assert text.endswith("Relevance Score: 0.5123")
+
+
+def test_drops_low_scores():
+    builder = ContextBuilder(min_score=0.5)
+    kept = builder.select([_ctx("q1", "a1", 0.9), _ctx("q2", "a2", 0.4), _ctx("q3", "a3", 0.6)])
+
+    assert [ctx["question"] for ctx in kept] == ["q1", "q3"]
+
+
+def test_drops_near_duplicate_answers():
+    builder = ContextBuilder(max_similarity=0.8)
+    kept = builder.select([
+        _ctx("q1", "Open an account at any branch with your ID"),
+        _ctx("q2", "open an account at any branch with your id!"),
+        _ctx("q3", "Cards are blocked from the mobile app"),
+    ])
+
+    assert [ctx["question"] for ctx in kept] == ["q1", "q3"]
+
+
+def test_stays_within_budget_and_skips_contexts_that_do_not_fit():
+    short = _ctx("q1", "short")
+    long = _ctx("q2", "x" * 400)
+    small = _ctx("q3", "tiny")
+    first = "[Context 1]\nQuestion: q1\nAnswer: short"
+    second = "[Context 2]\nQuestion: q3\nAnswer: tiny"
+    budget = _tokens(first) + _tokens("\n\n") + _tokens(second)
+
+    builder = ContextBuilder(max_tokens=budget)
+    text = builder.build([short, long, small])
+
+    assert text == first + "\n\n" + second
+    assert builder.count_tokens(text) <= budget
+
+
+def test_truncates_best_context_when_nothing_fits():
+    builder = ContextBuilder(max_tokens=5)
+    text = builder.build([_ctx("q", "x" * 400)])
+
+    assert len(text) == 5 * CHARS_PER_TOKEN
+    assert text.startswith("[Context 1]")
+
+
+def test_estimates_tokens_without_tokenizer():
+    builder = ContextBuilder()
+    assert builder.tokenizer is None
+    assert builder.count_tokens("abcde") == 2
+
+
+def test_failed_tokenizer_load_is_retried_after_interval(monkeypatch):
+    attempts = []
+
+    class FakeAutoTokenizer:
+        @staticmethod
+        def from_pretrained(name):
+            attempts.append(name)
+            raise OSError("offline")
+
+    import transformers
+    monkeypatch.setattr(transformers, "AutoTokenizer", FakeAutoTokenizer)
+    clock = [100.0]
+    monkeypatch.setattr(context_module.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(context_module, "_tokenizer_failures", {})
+
+    builder = ContextBuilder(tokenizer_name="fake/model")
+    assert builder.load_tokenizer() is None
+    assert builder.load_tokenizer() is None
+    assert attempts == ["fake/model"]
+
+    clock[0] += context_module.TOKENIZER_RETRY_SECONDS + 1
+    assert builder.load_tokenizer() is None
+    assert attempts == ["fake/model", "fake/model"]
@@ -0,0 +1,85 @@
+"""
+Tests for the embedding cache.
+"""
+
+import numpy as np
+import pytest
+
+from models import cache as cache_module
+from models.cache import EmbeddingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+def test_embedding_cache_hit_and_miss():
+    cache = EmbeddingCache(max_size=10)
+    assert cache.get("model", "hello") is None
+
+    cache.put("model", "hello", np.array([1.0, 2.0]))
+    assert np.array_equal(cache.get("model", "  Hello "), [1.0, 2.0])
+    assert cache.get("other-model", "hello") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_embedding_cache_returns_frozen_copy():
+    cache = EmbeddingCache()
+    vector = np.array([1.0, 2.0])
+    cache.put("model", "text", vector)
+    vector[0] = 5.0
+
+    cached = cache.get("model", "text")
+    assert cached[0] == 1.0
+    with pytest.raises(ValueError):
+        cached[0] = 3.0
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(max_size=2)
+    cache.put("model", "a", np.zeros(2))
+    cache.put("model", "b", np.zeros(2))
+    cache.get("model", "a")
+    cache.put("model", "c", np.zeros(2))
+
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "a") is not None
+    assert cache.get("model", "c") is not None
+
+
+def test_embedding_cache_expires_entries(clock):
+    cache = EmbeddingCache(ttl=10)
+    cache.put("model", "text", np.zeros(2))
+
+    clock.now += 9
+    assert cache.get("model", "text") is not None
+    clock.now += 2
+    assert cache.get("model", "text") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_embedding_cache_without_ttl_never_expires(clock):
+    cache = EmbeddingCache(ttl=0)
+    cache.put("model", "text", np.zeros(2))
+
+    clock.now += 10 ** 6
+    assert cache.get("model", "text") is not None
+
+
+def test_embedding_cache_disabled():
+    cache = EmbeddingCache(max_size=0)
+    cache.put("model", "text", np.zeros(2))
+    assert cache.get("model", "text") is None
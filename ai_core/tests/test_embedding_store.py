@@ -0,0 +1,120 @@
+"""
+Tests for the on-disk embedding store.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from models.store import DiskEmbeddingStore
+
+
+def _vectors(*rows):
+    return np.array(rows, dtype=np.float32)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskEmbeddingStore(str(tmp_path), "model", backend="torch", max_length=256)
+
+
+def test_put_and_get_round_trip(store):
+    store.put_many(["a", "b"], _vectors([1, 0], [0, 1]))
+
+    a, missing, b = store.get_many(["a", "c", "b"])
+    assert a.tolist() == [1, 0]
+    assert missing is None
+    assert b.tolist() == [0, 1]
+
+
+def test_existing_and_repeated_texts_are_stored_once(store):
+    store.put_many(["a", "a"], _vectors([1, 0], [2, 0]))
+    store.put_many(["a", "b"], _vectors([3, 0], [0, 1]))
+
+    assert len(store) == 2
+    assert store.get_many(["a"])[0].tolist() == [1, 0]
+
+
+def test_vector_size_must_match(store):
+    store.put_many(["a"], _vectors([1, 0]))
+
+    with pytest.raises(ValueError):
+        store.put_many(["b"], _vectors([1, 0, 0]))
+
+
+def test_vectors_persist_across_opens(tmp_path, store):
+    store.put_many(["a"], _vectors([1, 2]))
+
+    reopened = DiskEmbeddingStore(str(tmp_path), "model", backend="torch", max_length=256)
+    assert len(reopened) == 1
+    assert reopened.get_many(["a"])[0].tolist() == [1, 2]
+
+
+def test_each_model_configuration_has_its_own_store(tmp_path, store):
+    store.put_many(["a"], _vectors([1, 2]))
+
+    onnx = store.reopen("model", "onnx", 256)
+    assert not onnx.matches("model", "torch", 256)
+    assert onnx.get_many(["a"]) == [None]
+    assert store.reopen("model", "torch", 128).get_many(["a"]) == [None]
+
+
+def test_writers_pick_up_rows_of_other_writers(tmp_path, store):
+    other = DiskEmbeddingStore(str(tmp_path), "model", backend="torch", max_length=256)
+    store.put_many(["a"], _vectors([1, 0]))
+    other.put_many(["a", "b"], _vectors([9, 9], [0, 1]))
+
+    reopened = DiskEmbeddingStore(str(tmp_path), "model", backend="torch", max_length=256)
+    assert len(reopened) == 2
+    assert reopened.get_many(["a"])[0].tolist() == [1, 0]
+
+
+def test_read_only_store_never_writes(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path), "model", read_only=True)
+    store.put_many(["a"], _vectors([1, 0]))
+
+    assert store.get_many(["a"]) == [None]
+    assert not os.path.exists(store.path)
+
+
+def test_torn_tail_is_dropped_on_open(tmp_path, store):
+    store.put_many(["a", "b"], _vectors([1, 0], [0, 1]))
+    # Simulate a crash after the vectors of a third row were only half written
+    with open(os.path.join(store.path, store.VECTORS_FILE), "ab") as f:
+        f.write(b"\x00" * 4)
+
+    reopened = DiskEmbeddingStore(str(tmp_path), "model", backend="torch", max_length=256)
+    assert len(reopened) == 2
+    assert os.path.getsize(os.path.join(store.path, store.VECTORS_FILE)) == 2 * 2 * 4
+    reopened.put_many(["c"], _vectors([5, 5]))
+    assert reopened.get_many(["c"])[0].tolist() == [5, 5]
+
+
+def test_read_only_store_picks_up_appended_rows(tmp_path):
+    reader = DiskEmbeddingStore(str(tmp_path), "model", read_only=True)
+    writer = DiskEmbeddingStore(str(tmp_path), "model")
+    assert reader.get_many(["a"]) == [None]
+
+    writer.put_many(["a"], _vectors([1, 0]))
+    assert reader.get_many(["a"])[0].tolist() == [1, 0]
+
+    writer.put_many(["b"], _vectors([0, 1]))
+    assert [vector.tolist() for vector in reader.get_many(["a", "b"])] == [[1, 0], [0, 1]]
+    assert len(reader) == 2
+
+
+def test_catch_up_ignores_rows_without_vectors(tmp_path, store):
+    reader = DiskEmbeddingStore(str(tmp_path), "model", read_only=True)
+    store.put_many(["a"], _vectors([1, 0]))
+    # Simulate a crashed writer that indexed a row before its vectors were complete
+    with open(os.path.join(store.path, store.INDEX_FILE), "a") as f:
+        f.write(DiskEmbeddingStore.text_key("b") + "\n" + "c" * 10)
+
+    assert reader.get_many(["a", "b"])[1] is None
+    assert len(reader) == 1
+
+    # The next writer drops the torn rows before appending its own
+    store.put_many(["c"], _vectors([5, 5]))
+    assert len(store) == 2
+    assert reader.get_many(["c"])[0].tolist() == [5, 5]
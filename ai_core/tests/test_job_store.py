@@ -0,0 +1,200 @@
+"""
+Tests for the SQLite job store.
+"""
+
+import pytest
+
+from jobs.store import JobStore, QUEUED, PROCESSING, COMPLETED, FAILED, CANCELLED
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_claims_oldest_job_first(store):
+    first = store.create({"n": 1})
+    second = store.create({"n": 2})
+
+    job = store.claim(max_running=2)
+    assert job["task_id"] == first
+    assert job["params"] == {"n": 1}
+    assert job["attempts"] == 1
+    assert store.claim(max_running=2)["task_id"] == second
+    assert store.claim(max_running=2) is None
+
+
+def test_claim_respects_running_limit(store):
+    store.create({})
+    store.create({})
+
+    assert store.claim(max_running=1) is not None
+    assert store.claim(max_running=1) is None
+
+
+def test_limit_holds_across_store_instances(store):
+    other = JobStore(store.path)
+    store.create({})
+    store.create({})
+
+    assert store.claim(max_running=1) is not None
+    assert other.claim(max_running=1) is None
+
+
+def test_jobs_of_the_same_collection_run_one_at_a_time(store):
+    first = store.create({"db_url": "local:///data", "collection_name": "qa"})
+    second = store.create({"db_url": "local:///data", "collection_name": "qa"})
+    other = store.create({"db_url": "local:///data", "collection_name": "faq"})
+
+    assert store.claim(max_running=3)["task_id"] == first
+    assert store.claim(max_running=3)["task_id"] == other
+    assert store.claim(max_running=3) is None
+
+    store.finish(first, COMPLETED)
+    assert store.claim(max_running=3)["task_id"] == second
+
+
+def test_finish_only_moves_running_jobs(store):
+    job_id = store.create({})
+    assert not store.finish(job_id, COMPLETED)
+
+    store.claim(max_running=1)
+    assert store.finish(job_id, COMPLETED, result={"vectors_count": 3})
+    assert not store.finish(job_id, FAILED, error="late")
+
+    job = store.get(job_id)
+    assert job["status"] == COMPLETED
+    assert job["vectors_count"] == 3
+    assert "error" not in job
+
+
+def test_finish_rejects_non_final_status(store):
+    with pytest.raises(ValueError):
+        store.finish(store.create({}), QUEUED)
+
+
+def test_requeue_returns_job_to_queue(store):
+    job_id = store.create({})
+    store.claim(max_running=1)
+
+    store.requeue(job_id)
+    assert store.get(job_id)["status"] == QUEUED
+
+    job = store.claim(max_running=1)
+    assert job["task_id"] == job_id
+    assert job["attempts"] == 2
+
+
+def test_cancel_queued_job_immediately(store):
+    job_id = store.create({})
+
+    assert store.cancel(job_id)["status"] == CANCELLED
+    assert store.claim(max_running=1) is None
+
+
+def test_cancel_running_job_sets_flag(store):
+    job_id = store.create({})
+    store.claim(max_running=1)
+
+    job = store.cancel(job_id)
+    assert job["status"] == PROCESSING
+    assert job["cancel_requested"] is True
+    assert store.is_cancel_requested(job_id)
+    assert store.update_progress(job_id, 1, 10, 1.0)
+
+
+def test_progress_and_eta(store):
+    job_id = store.create({})
+    store.claim(max_running=1)
+
+    assert not store.update_progress(job_id, 25, 100, 5.0)
+    job = store.get(job_id)
+    assert job["progress"] == 0.25
+    assert job["eta_seconds"] == 15.0
+
+
+def test_progress_with_unknown_total(store):
+    job_id = store.create({})
+    store.claim(max_running=1)
+
+    store.update_progress(job_id, 25, None, 5.0)
+    job = store.get(job_id)
+    assert job["progress"] == 0
+    assert "eta_seconds" not in job
+
+
+def test_stale_job_is_requeued_then_failed(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), stale_after=0.0, max_attempts=2)
+    job_id = store.create({})
+
+    assert store.claim(max_running=1)["attempts"] == 1
+    # No heartbeat since the claim, so the next claim recovers the job and starts it again
+    assert store.claim(max_running=1)["attempts"] == 2
+    assert store.claim(max_running=1) is None
+
+    job = store.get(job_id)
+    assert job["status"] == FAILED
+    assert "2 attempts" in job["error"]
+
+
+def test_stale_job_with_cancel_request_is_cancelled(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), stale_after=0.0)
+    job_id = store.create({})
+    store.claim(max_running=1)
+    store.cancel(job_id)
+
+    store.claim(max_running=1)
+    assert store.get(job_id)["status"] == CANCELLED
+
+
+def test_finished_jobs_bump_the_generation_of_their_collection(store):
+    params = {"db_url": "local:///data", "collection_name": "qa"}
+    store.create(params)
+    store.create(params)
+    assert store.generation("local:///data", "qa") == 0
+
+    first = store.claim(max_running=2)["task_id"]
+    store.finish(first, COMPLETED)
+    second = store.claim(max_running=2)["task_id"]
+    store.finish(second, FAILED, error="boom")
+    # Only the first move to a final status counts
+    store.finish(second, FAILED, error="boom")
+    assert store.generation("local:///data", "qa") == 2
+    assert store.generations() == {("local:///data", "qa"): 2}
+
+
+def test_bump_generation_per_collection(store):
+    assert store.bump_generation("http://qdrant:6333", "qa") == 1
+    assert store.bump_generation("http://qdrant:6333", "qa") == 2
+    assert store.bump_generation("http://qdrant:6333", "other") == 1
+    assert store.generation("http://other:6333", "qa") == 0
+
+
+def test_lost_job_bumps_the_generation_once_final(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), stale_after=-1, max_attempts=1)
+    store.create({"db_url": "local:///data", "collection_name": "qa"})
+    store.claim(max_running=1)
+
+    store.claim(max_running=1)
+    assert store.generation("local:///data", "qa") == 1
+
+
+def test_prune_deletes_old_finished_jobs(store):
+    finished = store.create({"file_path": "a.json"})
+    store.claim(max_running=1)
+    store.finish(finished, COMPLETED)
+    queued = store.create({"file_path": "b.json"})
+
+    assert store.prune(max_age=3600) == []
+    assert store.prune(max_age=0) == [{"file_path": "a.json"}]
+    assert store.get(finished) is None
+    assert store.get(queued) is not None
+
+
+def test_list_jobs_filters_by_status(store):
+    queued = store.create({})
+    cancelled = store.create({})
+    store.cancel(cancelled)
+
+    assert [job["task_id"] for job in store.list_jobs()] == [cancelled, queued]
+    assert [job["task_id"] for job in store.list_jobs(status=QUEUED)] == [queued]
@@ -0,0 +1,68 @@
+"""
+Tests for the incremental JSON and JSON Lines reader.
+"""
+
+import json
+
+import pytest
+
+from processors.json_stream import iter_json_records
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_reads_json_array(tmp_path):
+    records = [{"i": i, "text": "x" * i} for i in range(50)]
+    path = _write(tmp_path, "data.json", json.dumps(records))
+
+    assert list(iter_json_records(path)) == records
+
+
+def test_reads_records_split_across_chunks(tmp_path):
+    records = [{"question": f"q{i}", "answer": "a, [b] {c}" * 5} for i in range(20)]
+    path = _write(tmp_path, "data.json", json.dumps(records, indent=2))
+
+    assert list(iter_json_records(path, chunk_size=7)) == records
+
+
+def test_reads_json_lines_and_skips_blank_lines(tmp_path):
+    path = _write(tmp_path, "data.jsonl", '{"i": 1}\n\n  \n{"i": 2}\n')
+
+    assert list(iter_json_records(path)) == [{"i": 1}, {"i": 2}]
+
+
+def test_skips_byte_order_mark_and_leading_whitespace(tmp_path):
+    path = _write(tmp_path, "data.json", '﻿ \n [{"i": 1}, {"i": 2}]')
+
+    assert list(iter_json_records(path)) == [{"i": 1}, {"i": 2}]
+
+
+def test_empty_file_and_empty_array(tmp_path):
+    assert list(iter_json_records(_write(tmp_path, "empty.json", "  \n"))) == []
+    assert list(iter_json_records(_write(tmp_path, "array.json", "[ ]"))) == []
+
+
+def test_reads_from_open_file(tmp_path):
+    path = _write(tmp_path, "data.jsonl", '{"i": 1}\n{"i": 2}\n')
+
+    with open(path, encoding="utf-8") as f:
+        assert list(iter_json_records(f)) == [{"i": 1}, {"i": 2}]
+        assert not f.closed
+
+
+def test_invalid_line_reports_line_number(tmp_path):
+    path = _write(tmp_path, "data.jsonl", '{"i": 1}\n{"i": \n')
+
+    with pytest.raises(ValueError, match="line 2"):
+        list(iter_json_records(path))
+
+
+def test_unclosed_array_is_an_error(tmp_path):
+    path = _write(tmp_path, "data.json", '[{"i": 1}, {"i": 2}')
+
+    with pytest.raises(ValueError):
+        list(iter_json_records(path, chunk_size=4))
@@ -0,0 +1,162 @@
+"""
+Tests for the in-process NumPy vector index.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from database.local_index import LocalVectorDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = LocalVectorDB(str(tmp_path / "index"))
+    db.create_collection("qa", vector_size=3)
+    return db
+
+
+def _upload(db, ids, vectors, collection="qa"):
+    db.upload_batch(collection, vectors, [{"id": point_id} for point_id in ids], ids=ids)
+
+
+def test_search_ranks_by_cosine_similarity(db):
+    _upload(db, ["a", "b", "c"], [[1, 0, 0], [0, 1, 0], [1, 1, 0]])
+
+    hits = db.search("qa", [2, 0.1, 0], limit=2)
+    assert [hit.id for hit in hits] == ["a", "c"]
+    assert hits[0].score == pytest.approx(0.9988, abs=1e-3)
+    assert hits[0].payload == {"id": "a"}
+
+
+def test_search_batch_and_limits(db):
+    _upload(db, [1, 2], [[1, 0, 0], [0, 1, 0]])
+
+    results = db.search_batch("qa", [[0, 1, 0], [1, 0, 0]], limit=5)
+    assert [[hit.id for hit in hits] for hits in results] == [[2, 1], [1, 2]]
+    assert db.search("qa", [1, 0, 0], limit=0) == []
+    assert db.search_batch("qa", [], limit=3) == []
+
+
+def test_upsert_overwrites_existing_points(db):
+    _upload(db, ["a"], [[1, 0, 0]])
+    db.upload_batch("qa", [[0, 1, 0]], [{"v": 2}], ids=["a"])
+
+    hits = db.search("qa", [0, 1, 0], limit=1)
+    assert hits[0].id == "a"
+    assert hits[0].payload == {"v": 2}
+    assert db.get_collection_info("qa").points_count == 1
+
+
+def test_overwrite_payload_and_delete(db):
+    _upload(db, ["a", "b"], [[1, 0, 0], [0, 1, 0]])
+    db.overwrite_payload("qa", "a", {"answer": "new"})
+    db.overwrite_payload("qa", "missing", {"answer": "ignored"})
+    db.delete_points("qa", ["b"])
+
+    assert db.get_payload_values("qa", "answer") == {"a": "new"}
+    assert [hit.id for hit in db.search("qa", [0, 1, 0], limit=3)] == ["a"]
+
+
+def test_changes_survive_reopen(db):
+    _upload(db, ["a", "b"], [[1, 0, 0], [0, 1, 0]])
+    db.overwrite_payload("qa", "a", {"answer": "new"})
+    db.delete_points("qa", ["b"])
+
+    reopened = LocalVectorDB(db.path)
+    assert reopened.get_payload_values("qa", "answer") == {"a": "new"}
+    assert reopened.get_collection_info("qa").points_count == 1
+
+
+def test_batched_payload_overwrite_survives_reopen(db):
+    _upload(db, [1, 2, 3], [[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    db.overwrite_payloads("qa", [1, 3, 9], [{"answer": "x"}, {"answer": "z"}, {"answer": "ignored"}])
+
+    reopened = LocalVectorDB(db.path)
+    assert reopened.get_payload_values("qa", "answer") == {1: "x", 2: None, 3: "z"}
+
+
+def test_writes_are_journaled_until_compaction(db):
+    db.COMPACT_MIN_POINTS = 4
+    collection_dir = os.path.join(db.path, "collections", "qa")
+    journal = os.path.join(collection_dir, "journal.jsonl")
+
+    for i in range(3):
+        _upload(db, [i], [[1, i, 0]])
+    assert os.path.exists(journal)
+    assert len(np.load(os.path.join(collection_dir, "vectors.npy"))) == 0
+
+    _upload(db, [3], [[1, 3, 0]])
+    assert not os.path.exists(journal)
+    assert len(np.load(os.path.join(collection_dir, "vectors.npy"))) == 4
+
+
+def test_close_compacts_journal(db):
+    _upload(db, ["a"], [[1, 0, 0]])
+    db.close()
+
+    assert not os.path.exists(os.path.join(db.path, "collections", "qa", "journal.jsonl"))
+    assert LocalVectorDB(db.path).get_collection_info("qa").points_count == 1
+
+
+def test_writers_pick_up_each_others_changes(db):
+    other = LocalVectorDB(db.path)
+    _upload(db, ["a"], [[1, 0, 0]])
+    _upload(other, ["b"], [[0, 1, 0]])
+    db.delete_points("qa", ["b"])
+
+    other.reload()
+    assert set(other.get_payload_values("qa", "id")) == {"a"}
+
+
+def test_writer_catches_up_after_another_compacts(db):
+    other = LocalVectorDB(db.path)
+    _upload(other, ["a"], [[1, 0, 0]])
+    other.close()
+
+    _upload(db, ["b"], [[0, 1, 0]])
+    assert set(db.get_payload_values("qa", "id")) == {"a", "b"}
+
+
+def test_torn_journal_entry_is_dropped(db):
+    _upload(db, ["a"], [[1, 0, 0]])
+    with open(os.path.join(db.path, "collections", "qa", "journal.jsonl"), "ab") as f:
+        f.write(b'{"op": "delete", "ids": ["a"')
+
+    reopened = LocalVectorDB(db.path)
+    assert reopened.get_collection_info("qa").points_count == 1
+    _upload(reopened, ["b"], [[0, 1, 0]])
+    assert LocalVectorDB(db.path).get_collection_info("qa").points_count == 2
+
+
+def test_aliases_and_versions(db):
+    first = db.create_version("faq", vector_size=3)
+    _upload(db, ["a"], [[1, 0, 0]], collection=first)
+    db.switch_alias("faq", first)
+    second = db.create_version("faq", vector_size=3)
+    db.switch_alias("faq", second)
+
+    assert db.resolve_alias("faq") == second
+    assert db.get_collection_info("faq").points_count == 0
+    assert db.rollback("faq") == first
+    assert db.get_collection_info("faq").points_count == 1
+
+
+def test_alias_switches_from_other_processes_are_kept(db):
+    other = LocalVectorDB(db.path)
+    db.switch_alias("one", "qa")
+    other.switch_alias("two", "qa")
+
+    db.reload()
+    assert db.resolve_alias("one") == "qa"
+    assert db.resolve_alias("two") == "qa"
+
+
+def test_missing_collection_and_invalid_names(db):
+    with pytest.raises(ValueError):
+        db.search("missing", [1, 0, 0])
+    with pytest.raises(ValueError):
+        db.create_collection("../escape")
+    assert not db.collection_exists("missing")
+    assert db.collection_exists("qa")
@@ -0,0 +1,25 @@
+"""
+Tests for multi-process embedding.
+"""
+
+from processors import parallel
+
+
+class FakeEmbeddingModel:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def test_workers_load_the_full_model_configuration(monkeypatch):
+    monkeypatch.setattr(parallel, "EmbeddingModel", FakeEmbeddingModel)
+    monkeypatch.setattr(parallel, "_worker_model", None)
+    config = {
+        "model_name": "model",
+        "backend": "onnx",
+        "onnx_cache_dir": "/tmp/onnx",
+        "parity_tolerance": 0.02,
+        "max_length": 128
+    }
+
+    parallel._init_worker(config, num_threads=1)
+    assert parallel._worker_model.kwargs == config
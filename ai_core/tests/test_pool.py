@@ -0,0 +1,94 @@
+"""
+Tests for the pool of vector database clients.
+"""
+
+import gc
+
+import pytest
+
+from database import pool as pool_module
+from database.pool import QdrantPool
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+class FakeQdrantDB:
+    def __init__(self, url):
+        self.url = url
+        self.client = FakeClient()
+
+
+@pytest.fixture
+def fake_qdrant(monkeypatch):
+    monkeypatch.setattr(pool_module, "QdrantDB", FakeQdrantDB)
+    monkeypatch.setattr(pool_module, "create_vector_db", lambda url, **kwargs: FakeQdrantDB(url))
+
+
+def test_get_reuses_clients_per_url(fake_qdrant):
+    pool = QdrantPool(max_size=4)
+
+    first = pool.get("http://a:6333")
+    assert pool.get("http://a:6333") is first
+    assert pool.get("http://b:6333") is not first
+
+
+def test_least_recently_used_client_is_evicted(fake_qdrant):
+    pool = QdrantPool(max_size=2)
+    a = pool.get("http://a:6333")
+    pool.get("http://b:6333")
+    pool.get("http://a:6333")
+
+    pool.get("http://c:6333")
+    assert list(pool._clients) == ["http://a:6333", "http://c:6333"]
+    assert pool.get("http://a:6333") is a
+
+
+def test_pinned_clients_are_never_evicted(fake_qdrant):
+    pool = QdrantPool(max_size=2)
+    default = pool.get("http://default:6333", pin=True)
+
+    pool.get("http://a:6333")
+    pool.get("http://b:6333")
+    pool.get("http://c:6333")
+    assert pool.get("http://default:6333") is default
+    assert set(pool._clients) == {"http://default:6333", "http://c:6333"}
+
+
+def test_evicted_client_is_closed_once_unreferenced(fake_qdrant):
+    pool = QdrantPool(max_size=1)
+    held = pool.get("http://a:6333")
+    client = held.client
+
+    pool.get("http://b:6333")
+    assert client.closed == 0
+
+    del held
+    gc.collect()
+    assert client.closed == 1
+
+
+def test_close_all_closes_each_client_once(fake_qdrant):
+    pool = QdrantPool(max_size=4)
+    a = pool.get("http://a:6333")
+    b = pool.get("http://b:6333")
+
+    pool.close_all()
+    del a
+    gc.collect()
+    assert b.client.closed == 1
+    assert pool._clients == {}
+
+
+def test_local_urls_open_local_indexes(tmp_path):
+    pool = QdrantPool(max_size=1)
+    url = f"local://{tmp_path / 'index'}"
+
+    db = pool.get(url)
+    assert db.url == f"local://{tmp_path / 'index'}"
+    assert pool.get(url) is db
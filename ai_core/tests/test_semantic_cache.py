@@ -0,0 +1,69 @@
+"""
+Tests for the semantic answer cache.
+"""
+
+from rag.semantic_cache import SemanticCache
+
+
+def test_semantic_cache_matches_similar_query():
+    cache = SemanticCache(threshold=0.9)
+    cache.store("qa", "llm", "How do I open an account?", [1.0, 0.0, 0.0], "Visit a branch.")
+
+    hit = cache.lookup("qa", "llm", [0.99, 0.05, 0.0])
+    assert hit["answer"] == "Visit a branch."
+    assert hit["query"] == "How do I open an account?"
+    assert hit["similarity"] > 0.9
+
+    assert cache.lookup("qa", "llm", [0.0, 1.0, 0.0]) is None
+
+
+def test_semantic_cache_is_scoped_by_collection_and_model():
+    cache = SemanticCache(threshold=0.9)
+    cache.store("qa", "llm", "query", [1.0, 0.0], "answer")
+
+    assert cache.lookup("other", "llm", [1.0, 0.0]) is None
+    assert cache.lookup("qa", "other-llm", [1.0, 0.0]) is None
+
+
+def test_semantic_cache_returns_best_match():
+    cache = SemanticCache(threshold=0.5)
+    cache.store("qa", "llm", "first", [1.0, 0.0], "first answer")
+    cache.store("qa", "llm", "second", [0.6, 0.8], "second answer")
+
+    assert cache.lookup("qa", "llm", [0.5, 0.9])["answer"] == "second answer"
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    cache = SemanticCache(max_entries=2, threshold=0.99)
+    cache.store("qa", "llm", "a", [1.0, 0.0, 0.0], "A")
+    cache.store("qa", "llm", "b", [0.0, 1.0, 0.0], "B")
+    cache.lookup("qa", "llm", [1.0, 0.0, 0.0])
+    cache.store("qa", "llm", "c", [0.0, 0.0, 1.0], "C")
+
+    assert cache.lookup("qa", "llm", [0.0, 1.0, 0.0]) is None
+    assert cache.lookup("qa", "llm", [1.0, 0.0, 0.0])["answer"] == "A"
+    assert cache.stats()["size"] == 2
+
+
+def test_semantic_cache_invalidates_collection():
+    cache = SemanticCache(threshold=0.9)
+    cache.store("qa", "llm", "a", [1.0, 0.0], "A")
+    cache.store("qa", "other-llm", "a", [1.0, 0.0], "A")
+    cache.store("faq", "llm", "a", [1.0, 0.0], "A")
+
+    assert cache.invalidate("qa") == 2
+    assert cache.lookup("qa", "llm", [1.0, 0.0]) is None
+    assert cache.lookup("faq", "llm", [1.0, 0.0]) is not None
+
+
+def test_semantic_cache_is_scoped_by_answer_settings():
+    cache = SemanticCache(threshold=0.9)
+    settings = ("novita", "key-hash", 3, 0.9, 0.0)
+    cache.store("qa", "llm", "query", [1.0, 0.0], "answer", settings)
+
+    assert cache.lookup("qa", "llm", [1.0, 0.0], settings)["answer"] == "answer"
+    assert cache.lookup("qa", "llm", [1.0, 0.0]) is None
+    assert cache.lookup("qa", "llm", [1.0, 0.0], ("novita", "key-hash", 5, 0.9, 0.0)) is None
+    assert cache.lookup("qa", "llm", [1.0, 0.0], ("novita", "other-key", 3, 0.9, 0.0)) is None
+
+    assert cache.invalidate("qa") == 1
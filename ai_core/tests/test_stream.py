@@ -0,0 +1,93 @@
+"""
+Tests for the event stream of RAG answers.
+"""
+
+import asyncio
+
+import pytest
+
+from rag import chain as chain_module
+from rag.chain import RagChain
+
+
+class Hit:
+    def __init__(self, question, answer, score):
+        self.payload = {"question": question, "answer": answer}
+        self.score = score
+
+
+class FakeDB:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def search(self, collection_name, query_vector, limit=3):
+        if self.fail:
+            raise ConnectionError("vector database unavailable")
+        return [Hit("How do I open an account?", "Visit a branch.", 0.8)]
+
+
+class FakeLLM:
+    ERROR_MESSAGE = "LLM failed"
+
+    def __init__(self, tokens, fail_after=None):
+        self.tokens = tokens
+        self.fail_after = fail_after
+
+    def generate_answer(self, messages):
+        return "".join(self.tokens)
+
+    async def astream_answer(self, messages, raise_on_error=False):
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield token
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(chain_module, "record_answer", recorded.append)
+    return recorded
+
+
+def _events(chain):
+    async def collect():
+        return [event async for event in chain.astream_answer("open account", query_vector=[1.0, 0.0])]
+    return asyncio.run(collect())
+
+
+def _chain(db, llm, **kwargs):
+    return RagChain(db=db, embedding_model=None, llm_client=llm, **kwargs)
+
+
+def test_streams_contexts_then_tokens(sources):
+    events = _events(_chain(FakeDB(), FakeLLM(["Visit ", "a branch."])))
+
+    assert events[0]["type"] == "contexts"
+    assert events[0]["source"] == RagChain.SOURCE_LLM
+    assert [event["text"] for event in events[1:]] == ["Visit ", "a branch."]
+    assert all(event["type"] == "token" for event in events[1:])
+    assert sources == [RagChain.SOURCE_LLM]
+
+
+def test_llm_failure_mid_stream_ends_with_error_event(sources):
+    events = _events(_chain(FakeDB(), FakeLLM(["Visit ", "a branch."], fail_after=1)))
+
+    assert [event["type"] for event in events] == ["contexts", "token", "error"]
+    assert events[-1]["text"] == RagChain.ERROR_MESSAGE
+    assert sources == [RagChain.SOURCE_ERROR]
+
+
+def test_retrieval_failure_is_an_error_event(sources):
+    events = _events(_chain(FakeDB(fail=True), FakeLLM(["unused"])))
+
+    assert events == [{"type": "error", "text": RagChain.ERROR_MESSAGE}]
+    assert sources == [RagChain.SOURCE_ERROR]
+
+
+def test_direct_answer_is_a_single_token(sources):
+    events = _events(_chain(FakeDB(), FakeLLM(["unused"]), direct_answer_threshold=0.5))
+
+    assert events[0]["source"] == RagChain.SOURCE_DIRECT
+    assert events[1:] == [{"type": "token", "text": "Visit a branch."}]
+    assert sources == [RagChain.SOURCE_DIRECT]
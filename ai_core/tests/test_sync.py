@@ -0,0 +1,106 @@
+"""
+Tests for incremental collection sync.
+"""
+
+import numpy as np
+import pytest
+
+from database.local_index import LocalVectorDB
+from processors.data_processor import sync_qa_data, qa_point_id
+
+
+class FakeModel:
+    """Embeds each text into a deterministic vector and records what it embedded."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def get_embeddings(self, texts, batch_size=32):
+        self.embedded.extend(texts)
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = LocalVectorDB(str(tmp_path / "index"))
+    db.create_collection("qa", vector_size=3)
+    return db
+
+
+def _qa(question, answer):
+    return {"question": question, "answer": answer}
+
+
+def _answers(db):
+    return db.get_payload_values("qa", "answer")
+
+
+def test_adds_updates_and_deletes(db):
+    model = FakeModel()
+    sync_qa_data(db, [_qa("q1", "a1"), _qa("q2", "a2")], model, "qa", show_progress=False)
+
+    stats = sync_qa_data(db, [_qa("q1", "a1"), _qa("q2", "b2"), _qa("q3", "a3")], model, "qa", show_progress=False)
+    assert stats == {"added": 1, "updated": 1, "unchanged": 1, "deleted": 0}
+
+    stats = sync_qa_data(db, [_qa("q3", "a3")], model, "qa", show_progress=False)
+    assert stats == {"added": 0, "updated": 0, "unchanged": 1, "deleted": 2}
+    assert _answers(db) == {qa_point_id("q3"): "a3"}
+    assert model.embedded == ["q1", "q2", "q3"]
+
+
+def test_duplicates_across_flush_are_embedded_once(db):
+    model = FakeModel()
+    data = [_qa("q1", "a1"), _qa("q2", "a2"), _qa("q1", "a1"), _qa("q2", "b2"), _qa("q3", "a3")]
+
+    stats = sync_qa_data(db, data, model, "qa", batch_size=2, show_progress=False)
+
+    assert stats == {"added": 3, "updated": 0, "unchanged": 0, "deleted": 0}
+    assert model.embedded == ["q1", "q2", "q3"]
+    # A later duplicate replaces the earlier one, as in a full load
+    assert _answers(db)[qa_point_id("q2")] == "b2"
+
+
+def test_duplicates_within_pending_batch_keep_last_answer(db):
+    model = FakeModel()
+    data = [_qa("q1", "a1"), _qa("q1", "b1")]
+
+    stats = sync_qa_data(db, data, model, "qa", batch_size=10, show_progress=False)
+
+    assert stats["added"] == 1
+    assert model.embedded == ["q1"]
+    assert _answers(db) == {qa_point_id("q1"): "b1"}
+
+
+def test_duplicate_of_changed_pair_counts_once(db):
+    model = FakeModel()
+    sync_qa_data(db, [_qa("q1", "a1")], model, "qa", show_progress=False)
+
+    stats = sync_qa_data(db, [_qa("q1", "b1"), _qa("q1", "c1")], model, "qa", show_progress=False)
+
+    assert stats == {"added": 0, "updated": 1, "unchanged": 0, "deleted": 0}
+    assert _answers(db) == {qa_point_id("q1"): "c1"}
+
+
+def test_reports_final_progress(db):
+    calls = []
+    data = [_qa(f"q{i}", "a") for i in range(5)]
+
+    sync_qa_data(db, data, FakeModel(), "qa", batch_size=2, show_progress=False,
+                 progress_callback=lambda processed, throughput: calls.append(processed))
+
+    assert calls == [2, 4, 5]
+
+
+def test_changed_answers_are_written_in_batches(db, monkeypatch):
+    model = FakeModel()
+    sync_qa_data(db, [_qa(f"q{i}", "a") for i in range(5)], model, "qa", show_progress=False)
+    calls = []
+    overwrite_payloads = db.overwrite_payloads
+    monkeypatch.setattr(db, "overwrite_payloads", lambda *args: calls.append(args[1]) or overwrite_payloads(*args))
+
+    stats = sync_qa_data(db, [_qa(f"q{i}", "b") for i in range(5)], model, "qa", batch_size=2, show_progress=False)
+
+    assert stats["updated"] == 5
+    assert [len(ids) for ids in calls] == [2, 2, 1]
+    assert set(_answers(db).values()) == {"b"}
+    assert model.embedded == [f"q{i}" for i in range(5)]
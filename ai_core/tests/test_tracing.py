@@ -0,0 +1,92 @@
+"""
+Tests for request tracing and the Server-Timing header.
+"""
+
+import re
+
+import pytest
+
+from monitoring import tracing
+from monitoring.tracing import Span, Trace, parse_traceparent, server_timing, start_span
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class RecordingExporter(tracing.SpanExporter):
+    def __init__(self):
+        self.exports = []
+
+    def export(self, spans):
+        self.exports.append(list(spans))
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = RecordingExporter()
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    return exporter
+
+
+def _span(name, duration_ms, span_id="0" * 16):
+    return Span(name=name, trace_id=TRACE_ID, span_id=span_id, parent_id=None, start_ns=0, end_ns=int(duration_ms * 1e6))
+
+
+def test_parse_valid_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent(f" 00-{TRACE_ID.upper()}-{PARENT_ID}-00 ") == (TRACE_ID, PARENT_ID)
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    "garbage",
+    f"00-{TRACE_ID}-{PARENT_ID}",
+    f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{PARENT_ID}z-01",
+])
+def test_parse_invalid_traceparent(header):
+    assert parse_traceparent(header) == (None, None)
+
+
+def test_server_timing_sums_spans_with_the_same_name():
+    trace = Trace(TRACE_ID)
+    trace.add(_span("embed", 1.25))
+    trace.add(_span("vectordb search", 2.0))
+    trace.add(_span("embed", 0.5))
+
+    assert server_timing(trace) == "embed;dur=1.8, vectordb_search;dur=2.0"
+
+
+def test_server_timing_reports_the_root_as_total():
+    trace = Trace(TRACE_ID)
+    root = _span("request", 10.0, span_id="1" * 16)
+    trace.add(_span("llm", 7.0))
+    trace.add(root)
+
+    assert server_timing(trace, root) == "llm;dur=7.0, total;dur=10.0"
+
+
+def test_server_timing_without_a_trace():
+    assert server_timing(None) == ""
+
+
+def test_root_span_continues_a_remote_trace(exporter):
+    with start_span("request", trace_id=TRACE_ID, parent_id=PARENT_ID) as root:
+        with start_span("retrieve") as child:
+            assert tracing.current_trace().trace_id == TRACE_ID
+
+    assert tracing.current_trace() is None
+    assert root.parent_id == PARENT_ID
+    assert child.parent_id == root.span_id
+    assert [[span.name for span in spans] for spans in exporter.exports] == [["retrieve", "request"]]
+
+
+def test_failed_span_records_the_error(exporter):
+    with pytest.raises(KeyError):
+        with start_span("request"):
+            raise KeyError("missing")
+
+    span, = exporter.exports[0]
+    assert span.error == "KeyError"
+    assert re.fullmatch(r"[0-9a-f]{32}", span.trace_id)
@@ -0,0 +1,84 @@
+"""
+Tests for the bulk embedding and upload pipeline.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from processors.data_processor import process_and_upload_data, qa_point_id
+
+
+class FakeModel:
+    """Embeds each text into a deterministic vector and records what it embedded."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def get_embeddings(self, texts, batch_size=32):
+        self.embedded.extend(texts)
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    def padding_stats(self):
+        return {"efficiency": 1.0}
+
+
+class SlowFirstDB:
+    """Applies upserts to a dict, holding the first one back so uploaders race."""
+
+    def __init__(self):
+        self.points = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def upload_batch(self, collection_name, vectors, payloads, ids=None, wait=True):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            time.sleep(0.2)
+        with self._lock:
+            for point_id, payload in zip(ids, payloads):
+                self.points[point_id] = payload["answer"]
+
+
+def _qa(question, answer):
+    return {"question": question, "answer": answer}
+
+
+def _upload(db, model, data, **kwargs):
+    return process_and_upload_data(
+        db, data, model, "qa", batch_size=2, show_progress=False, upload_workers=4, **kwargs
+    )
+
+
+def test_last_duplicate_wins_across_batches():
+    db = SlowFirstDB()
+    data = [_qa("q1", "a1"), _qa("q2", "a2"), _qa("q1", "b1"), _qa("q3", "a3"), _qa("q2", "b2"), _qa("q4", "a4"), _qa("q5", "a5")]
+
+    count = _upload(db, FakeModel(), data)
+
+    assert count == 5
+    assert db.points == {
+        qa_point_id("q1"): "b1",
+        qa_point_id("q2"): "b2",
+        qa_point_id("q3"): "a3",
+        qa_point_id("q4"): "a4",
+        qa_point_id("q5"): "a5",
+    }
+
+
+def test_duplicates_within_a_batch_are_embedded_once():
+    db = SlowFirstDB()
+    model = FakeModel()
+    progress = []
+
+    count = _upload(db, model, [_qa("q1", "a1"), _qa("q1", "b1"), _qa("q2", "a2")],
+                    progress_callback=lambda processed, throughput: progress.append(processed))
+
+    assert count == 2
+    assert model.embedded == ["q1", "q2"]
+    assert db.points[qa_point_id("q1")] == "b1"
+    # Progress counts every record read, duplicates included
+    assert progress == [2, 3]
@@ -0,0 +1,109 @@
+"""
+Tests for blue/green collection versions behind aliases.
+"""
+
+import pytest
+
+from database import versioning
+from database.local_index import LocalVectorDB
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(versioning.time, "time", FakeClock())
+    return LocalVectorDB(str(tmp_path / "index"))
+
+
+def _load_version(db, alias, vector):
+    version = db.create_version(alias, vector_size=2)
+    db.upload_batch(version, [vector], [{"version": version}], ids=[1])
+    db.switch_alias(alias, version)
+    return version
+
+
+def test_switch_serves_the_new_version(db):
+    first = _load_version(db, "qa", [1, 0])
+    second = _load_version(db, "qa", [0, 1])
+
+    assert db.list_versions("qa") == [first, second]
+    assert db.resolve_alias("qa") == second
+    assert db.search("qa", [0, 1], limit=1)[0].payload == {"version": second}
+
+
+def test_switch_replaces_an_unversioned_collection(db):
+    db.create_collection("qa", vector_size=2)
+
+    version = _load_version(db, "qa", [1, 0])
+    assert "qa" not in db.list_collections()
+    assert db.resolve_alias("qa") == version
+
+
+def test_rollback_points_at_the_previous_version(db):
+    first = _load_version(db, "qa", [1, 0])
+    _load_version(db, "qa", [0, 1])
+
+    assert db.rollback("qa") == first
+    assert db.resolve_alias("qa") == first
+    with pytest.raises(ValueError):
+        db.rollback("qa")
+
+
+def test_prune_keeps_the_newest_versions(db):
+    versions = [_load_version(db, "qa", [1, 0]) for _ in range(4)]
+
+    assert db.prune_versions("qa", keep=2) == versions[:2]
+    assert db.list_versions("qa") == versions[2:]
+
+
+def test_prune_keeps_the_current_target_and_newer_versions(db):
+    versions = [_load_version(db, "qa", [1, 0]) for _ in range(4)]
+    db.switch_alias("qa", versions[1])
+
+    assert db.prune_versions("qa", keep=1) == [versions[0]]
+    assert db.list_versions("qa") == versions[1:]
+    assert db.search("qa", [1, 0], limit=1)[0].payload == {"version": versions[1]}
+
+
+def test_prune_never_deletes_a_version_still_loading(db):
+    live = _load_version(db, "qa", [1, 0])
+    loading = db.create_version("qa", vector_size=2)
+    _load_version(db, "qa", [0, 1])
+    db.switch_alias("qa", live)
+
+    assert db.prune_versions("qa", keep=0) == []
+    assert loading in db.list_versions("qa")
+
+
+def test_promote_never_switches_back_to_older_data(db):
+    older = db.create_version("qa", vector_size=2)
+    newer = db.create_version("qa", vector_size=2)
+
+    assert db.promote_version("qa", newer)
+    assert not db.promote_version("qa", older)
+    assert db.resolve_alias("qa") == newer
+
+
+def test_version_names_keep_increasing_when_the_clock_does_not(db, monkeypatch):
+    monkeypatch.setattr(versioning.time, "time", lambda: 1_700_000_000.0)
+
+    first = db.create_version("qa", vector_size=2)
+    second = db.create_version("qa", vector_size=2)
+    assert db.list_versions("qa") == [first, second]
+
+
+def test_versions_of_other_aliases_are_ignored(db):
+    _load_version(db, "qa", [1, 0])
+    other = _load_version(db, "qa_other", [1, 0])
+    db.create_collection("qa__vlatest", vector_size=2)
+
+    assert db.prune_versions("qa", keep=0) == []
+    assert db.list_versions("qa_other") == [other]
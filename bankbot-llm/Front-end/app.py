@@ -33,10 +33,10 @@ with st.form("chat_form"):
         elif not user_input.strip():
             st.warning("⚠️ Please enter your question.")
         else:
-            with st.spinner("Getting answer from LLM..."):
-                response = get_llm_response(user_input, st.session_state.collection_name)
-                st.session_state.chat_history.append(("You", user_input))
-                st.session_state.chat_history.append(("Assistant", response))
+            # Render tokens as they stream in, then keep the full answer in history
+            response = st.write_stream(get_llm_response(user_input, st.session_state.collection_name))
+            st.session_state.chat_history.append(("You", user_input))
+            st.session_state.chat_history.append(("Assistant", response))
 
 # Display conversation
 if st.session_state.chat_history:
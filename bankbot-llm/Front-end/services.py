@@ -1,9 +1,15 @@
+import json
+import logging
 import requests
 
+logger = logging.getLogger(__name__)
+
 CHAT_API_URL = "http://localhost:8080/api/v1/rag/answer"
+CHAT_STREAM_API_URL = "http://localhost:8080/api/v1/rag/answer/stream"
 UPLOAD_API_URL = "http://localhost:8080/api/v1/vectordb/load"
 
 def get_llm_response(prompt, collection_name):
+    """Yield answer tokens from the streaming chat endpoint as they arrive."""
     try:
         query = {
             "text": prompt
@@ -14,12 +20,28 @@ def get_llm_response(prompt, collection_name):
             "top_k": 3
         }
 
-        response = requests.post(CHAT_API_URL, json=query, params=params)
-        result = response.json()
+        with requests.post(CHAT_STREAM_API_URL, json=query, params=params, stream=True) as response:
+            response.raise_for_status()
 
-        return result['answer']
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):].strip())
+                    if event == "token":
+                        yield data
+                    elif event == "error":
+                        yield f"❌ Chat API error: {data.get('detail')}"
+                    elif event == "done":
+                        logger.info(
+                            "Chat API timing: %s; streamed stages: %s",
+                            response.headers.get("Server-Timing"),
+                            data.get("server_timing")
+                        )
+                        return
     except requests.exceptions.RequestException as e:
-        return f"❌ Chat API error: {str(e)}"
+        yield f"❌ Chat API error: {str(e)}"
 
 def upload_document(file, collection_name):
     try: